@@ -0,0 +1,62 @@
+"""
+Compare the compiled config lookup tables with the layered resolution lux used before.
+
+Run with `python benchmarks/config_resolution.py [key count]`.
+"""
+from sys import argv
+from timeit import repeat
+from typing import Any
+
+from lux.config import CogConfig, DictOfStrAnyValidator, RootConfigData, RootConfigDataValidator, RootConfigKey
+from lux.context_var import is_production
+
+
+def build_data(key_count: int) -> RootConfigData:
+    return RootConfigData(
+        RootConfigDataValidator.validate_python(
+            {
+                RootConfigKey.GLOBAL: {f"global_{i}": i for i in range(key_count)},
+                RootConfigKey.DEVELOPMENT: {
+                    RootConfigKey.GLOBAL: {f"mode_global_{i}": i for i in range(key_count)},
+                    **{f"Cog{i}": {"value": i} for i in range(key_count)},
+                },
+                RootConfigKey.PRODUCTION: {},
+            }
+        )
+    )
+
+
+def layered_get_data(data: RootConfigData, cog_name: str) -> dict[str, Any]:
+    return DictOfStrAnyValidator.validate_python(data.find(cog_name, {}))
+
+
+def bench(name: str, statement, number: int) -> None:
+    best = min(repeat(statement, number=number, repeat=5))
+    print(f"{name:<32} {best / number * 1e9:>10.1f} ns/call")
+
+
+def main() -> None:
+    key_count = int(argv[1]) if len(argv) > 1 else 1000
+    number = 100_000
+    is_production.set(False)
+    data = build_data(key_count)
+    cog_config = CogConfig(data)
+    key = f"global_{key_count // 2}"
+    cog_name = f"Cog{key_count // 2}"
+
+    # Mode GLOBAL used to be validated once and cached, so the layered path is measured without that pass.
+    mode_global = DictOfStrAnyValidator.validate_python(data.development.get(RootConfigKey.GLOBAL, {}))
+
+    def layered_find_cached() -> Any:
+        mode = data.production if is_production.get() else data.development
+        return mode.get(key, mode_global.get(key, data.root_global.get(key)))
+
+    print(f"{key_count} keys per layer")
+    bench("layered CogConfig.find", layered_find_cached, number)
+    bench("compiled CogConfig.find", lambda: cog_config.find(key), number)
+    bench("layered CogConfig.get_data", lambda: layered_get_data(data, cog_name), number // 10)
+    bench("compiled CogConfig.get_data", lambda: cog_config.get_data(cog_name), number // 10)
+
+
+if __name__ == "__main__":
+    main()
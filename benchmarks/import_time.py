@@ -0,0 +1,62 @@
+"""
+Measure the import time of lux modules with `python -X importtime`, and fail when one is over its budget or imports
+a heavy dependency it should only import on first use.
+
+Run with `python benchmarks/import_time.py [runs]`, it exits with status 1 on a regression.
+"""
+from subprocess import run
+from sys import argv, executable, exit
+
+# Cumulative import time budgets in milliseconds, with room for slower machines.
+BUDGETS = {
+    "lux": 60.0,
+    "lux.config": 400.0,
+}
+# Modules that must stay out of `sys.modules` after importing the key.
+FORBIDDEN_IMPORTS = {
+    "lux": ("disnake", "pydantic", "click"),
+    "lux.config": ("disnake", "click"),
+}
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """Cumulative import time of `module` in milliseconds, and the names of all modules it imported."""
+    result = run(
+        [executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    imported = set[str]()
+    cumulative = 0.0
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        imported.add(name.strip())
+        if name.strip() == module:
+            cumulative = int(cumulative_us) / 1000
+    return cumulative, imported
+
+
+def main() -> None:
+    runs = int(argv[1]) if len(argv) > 1 else 5
+    failed = False
+
+    for module, budget in BUDGETS.items():
+        # The first run also measures writing bytecode caches, the best run is the one that matters.
+        samples = [measure(module) for _ in range(runs + 1)][1:]
+        best = min(cumulative for cumulative, _ in samples)
+        leaked = [name for name in FORBIDDEN_IMPORTS.get(module, ()) if name in samples[0][1]]
+
+        status = "ok"
+        if best > budget or leaked:
+            status = "FAIL"
+            failed = True
+        print(f"{module:<16} {best:>8.1f} ms (budget {budget:.0f} ms) {status}")
+        if leaked:
+            print(f"{'':<16} imports {', '.join(leaked)} eagerly")
+
+    exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
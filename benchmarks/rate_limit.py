@@ -0,0 +1,84 @@
+"""
+Measure the memory per tracked key and the checks per second of the lux rate limiters, next to a dict of per-key
+objects like cogs used to keep by hand.
+
+Run with `python benchmarks/rate_limit.py [key count]`.
+"""
+from random import Random
+from sys import argv
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+
+from lux.rate_limiter import FixedWindow, RateLimit, RateLimiter, TokenBucket
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float) -> None:
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class DictLimiter:
+    """The hand written baseline, a token bucket object per key that is never dropped."""
+
+    def __init__(self, settings: RateLimit) -> None:
+        self._settings = settings
+        self._buckets = dict[int, _Bucket]()
+
+    def hit(self, key: int, now: float) -> float:
+        settings = self._settings
+        if (bucket := self._buckets.get(key)) is None:
+            bucket = self._buckets[key] = _Bucket(settings.rate, now)
+
+        refill = settings.rate / settings.per
+        bucket.tokens = min(settings.rate, bucket.tokens + (now - bucket.updated_at) * refill)
+        bucket.updated_at = now
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return 0.0
+        return (1.0 - bucket.tokens) / refill
+
+
+def bench(name: str, limiter: RateLimiter | DictLimiter, keys: list[int]) -> None:
+    start()
+    now = 1000.0
+    for key in keys:
+        limiter.hit(key, now)
+    memory = get_traced_memory()[0]
+    stop()
+
+    # Every key is hit again in a shuffled order, within the same second so the timing wheel keeps them.
+    shuffled = keys.copy()
+    Random(0).shuffle(shuffled)
+    begin = perf_counter()
+    for key in shuffled:
+        limiter.hit(key, now + 0.5)
+    elapsed = perf_counter() - begin
+
+    print(f"{name:<16} {memory / len(keys):>8.1f} B/key {len(keys) / elapsed / 1e6:>8.2f} M checks/s")
+
+
+def main() -> None:
+    key_count = int(argv[1]) if len(argv) > 1 else 1_000_000
+    settings = RateLimit(5, 60)
+    # Snowflake-like ids, large enough that every key is its own int object.
+    keys = [(1 << 50) + i * 7919 for i in range(key_count)]
+
+    print(f"{key_count} keys")
+    bench("dict of objects", DictLimiter(settings), keys)
+    bench("TokenBucket", TokenBucket(settings), keys)
+    bench("FixedWindow", FixedWindow(settings), keys)
+
+    # Expiry drops the keys once they recovered, only the slots passed since the previous hit are looked at.
+    limiter = TokenBucket(settings)
+    for key in keys:
+        limiter.hit(key, 1000.0)
+    begin = perf_counter()
+    limiter.hit(keys[0], 1000.0 + settings.per + 1)
+    print(f"expired {key_count - len(limiter) + 1} keys in {(perf_counter() - begin) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
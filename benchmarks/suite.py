@@ -0,0 +1,301 @@
+"""
+Benchmark suite of the lux hot paths, using fake interactions and no network.
+
+Run with `python benchmarks/suite.py run -o results.json`, then compare two runs with
+`python benchmarks/suite.py compare baseline.json results.json`, which exits with status 1 on a regression.
+"""
+import sys
+from asyncio import new_event_loop
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from json import dumps, loads
+from logging import WARNING
+from os import chdir, getcwd
+from pathlib import Path
+from platform import python_version
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from timeit import repeat
+from typing import Any, Awaitable, Callable
+
+from click import Path as PathType
+from click import argument, echo, group, option
+from disnake import ApplicationCommandInteraction
+from disnake.ext.commands import slash_command
+
+from lux import GeneralCog, Lux
+from lux.auto_complete import AutoCompleteIndex, dict_, list_
+from lux.config import BotConfig, CogConfig, RootConfigData, RootConfigDataValidator, RootConfigKey
+from lux.config_cache import LUX_VERSION
+from lux.context_var import bot, is_production
+from lux.logger import default_logger
+
+REPEAT = 5
+DEFAULT_THRESHOLD = 0.15
+CONFIG_KEY_COUNT = 1000
+AUTO_COMPLETE_SIZES = (10_000, 100_000)
+EXTENSION_COUNT = 50
+
+_benchmarks = dict[str, Callable[[], float]]()
+
+
+def benchmark(name: str) -> Callable[[Callable[[], float]], Callable[[], float]]:
+    def decorator(func: Callable[[], float]) -> Callable[[], float]:
+        _benchmarks[name] = func
+        return func
+
+    return decorator
+
+
+def time_call(func: Callable[[], Any], number: int) -> float:
+    """Best time of one call over `REPEAT` rounds of `number` calls, in seconds."""
+    return min(repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def time_coroutine(func: Callable[[], Awaitable[Any]], number: int) -> float:
+    loop = new_event_loop()
+
+    async def round_() -> float:
+        start = perf_counter()
+        for _ in range(number):
+            await func()
+        return perf_counter() - start
+
+    try:
+        return min(loop.run_until_complete(round_()) for _ in range(REPEAT)) / number
+    finally:
+        loop.close()
+
+
+def make_bot(cog_config: CogConfig | None = None) -> Lux:
+    bot_ = Lux(
+        production=False,
+        bot_config=BotConfig.default(),
+        cog_config=cog_config or CogConfig.default(),
+        config_watch_interval=None,
+        command_sync_cache=False,
+    )
+    bot.set(bot_)
+    return bot_
+
+
+def make_config_data(key_count: int = CONFIG_KEY_COUNT) -> RootConfigData:
+    return RootConfigData(
+        RootConfigDataValidator.validate_python(
+            {
+                RootConfigKey.GLOBAL: {f"global_{i}": i for i in range(key_count)},
+                RootConfigKey.DEVELOPMENT: {
+                    RootConfigKey.GLOBAL: {f"mode_global_{i}": i for i in range(key_count)},
+                    **{f"Cog{i}": {"value": i, "name": f"cog {i}"} for i in range(key_count)},
+                },
+                RootConfigKey.PRODUCTION: {},
+            }
+        )
+    )
+
+
+@benchmark("config.root_find")
+def root_find() -> float:
+    data = make_config_data()
+    return time_call(lambda: data.find("global_500"), 100_000)
+
+
+@benchmark("config.cog_find")
+def cog_find() -> float:
+    cog_config = CogConfig(make_config_data())
+    return time_call(lambda: cog_config.find("mode_global_500"), 100_000)
+
+
+@benchmark("config.get_data_cold")
+def get_data_cold() -> float:
+    data = make_config_data()
+    # A new `CogConfig` has not validated any section yet.
+    return time_call(lambda: CogConfig(data).get_data("Cog500"), 2_000)
+
+
+@benchmark("config.get_data_warm")
+def get_data_warm() -> float:
+    cog_config = CogConfig(make_config_data())
+    return time_call(lambda: cog_config.get_data("Cog500"), 100_000)
+
+
+@dataclass
+class _BenchConfig:
+    value: int
+    name: str
+    global_1: int = 0
+
+
+class _BenchCog(GeneralCog):
+    config: _BenchConfig
+
+
+@benchmark("cog.config")
+def cog_config() -> float:
+    data = make_config_data()
+    make_bot(CogConfig(data))
+
+    def construct() -> Any:
+        cog = _BenchCog.__new__(_BenchCog)
+        cog._bot = bot.get()
+        cog._config_data = {"value": 1, "name": "bench"}
+        cog.logger = default_logger
+        return cog.config
+
+    return time_call(construct, 20_000)
+
+
+def _auto_complete_benchmarks() -> None:
+    for size in AUTO_COMPLETE_SIZES:
+        # The input only matches the last candidates, so the plain functions can not stop early.
+        user_input = f"module_{size - 1}"
+
+        # The size is bound as a default, every closure keeps its own.
+        @benchmark(f"auto_complete.list_{size}")
+        def list_benchmark(size: int = size, user_input: str = user_input) -> float:
+            candidates = [f"extension.group_{i % 97}.module_{i}" for i in range(size)]
+            return time_call(lambda: list_(candidates, user_input), 10)
+
+        @benchmark(f"auto_complete.dict_{size}")
+        def dict_benchmark(size: int = size, user_input: str = user_input) -> float:
+            mapping = {f"extension.group_{i % 97}.module_{i}": str(i) for i in range(size)}
+            return time_call(lambda: dict_(mapping, user_input), 10)
+
+        @benchmark(f"auto_complete.index_{size}")
+        def index_benchmark(size: int = size, user_input: str = user_input) -> float:
+            index = AutoCompleteIndex(f"extension.group_{i % 97}.module_{i}" for i in range(size))
+            return time_call(lambda: list_(index, user_input), 1_000)
+
+
+_auto_complete_benchmarks()
+
+_EXTENSION_SOURCE = """
+from lux import GeneralCog, slash_command
+
+
+class Cog{index}(GeneralCog):
+    @slash_command(name="command_{index}", description="Benchmark command {index}.")
+    async def command(self, inter):
+        return None
+
+
+def setup(bot):
+    bot.add_cog(Cog{index}())
+"""
+
+
+@benchmark(f"bot.load_extensions_{EXTENSION_COUNT}")
+def load_extensions() -> float:
+    cwd = getcwd()
+
+    with TemporaryDirectory() as directory:
+        package = Path(directory, "bench_extensions")
+        package.mkdir()
+        for index in range(EXTENSION_COUNT):
+            (package / f"extension_{index}.py").write_text(_EXTENSION_SOURCE.format(index=index))
+
+        chdir(directory)
+        sys.path.insert(0, directory)
+        try:
+            # The modules are dropped before every round, so importing them is measured too.
+            def load() -> None:
+                for name in [name for name in sys.modules if name.startswith("bench_extensions")]:
+                    del sys.modules[name]
+                make_bot().load_extensions("bench_extensions")
+
+            return time_call(load, 1)
+        finally:
+            sys.path.remove(directory)
+            chdir(cwd)
+
+
+def _interaction_payload(name: str, value: int) -> dict[str, Any]:
+    return {
+        "id": "1",
+        "application_id": "2",
+        "type": 2,
+        "token": "token",
+        "version": 1,
+        "locale": "en-US",
+        "app_permissions": "0",
+        "channel_id": "4",
+        "guild_id": None,
+        "user": {"id": "5", "username": "bench", "discriminator": "0", "avatar": None, "global_name": None},
+        "data": {"id": "3", "name": name, "type": 1, "options": [{"name": "value", "type": 4, "value": value}]},
+    }
+
+
+class _DispatchCog(GeneralCog):
+    @slash_command(description="Benchmark command.")
+    async def bench(self, inter: ApplicationCommandInteraction, value: int = 0):
+        return None
+
+
+@benchmark("bot.dispatch")
+def dispatch() -> float:
+    bot_ = make_bot()
+    bot_.add_cog(_DispatchCog())
+    payload = _interaction_payload("bench", 1)
+
+    async def handle() -> None:
+        await bot_.on_application_command(ApplicationCommandInteraction(data=payload, state=bot_._connection))
+
+    return time_coroutine(handle, 2_000)
+
+
+@group()
+def main() -> None:
+    is_production.set(False)
+    default_logger.setLevel(WARNING)
+
+
+@main.command()
+@option("-o", "--output", type=PathType(dir_okay=False, path_type=Path), help="Save the results as JSON.")
+@option("-k", "--select", "pattern", default="*", help="Only run benchmarks matching this glob pattern.")
+def run(output: Path | None, pattern: str) -> None:
+    results = dict[str, float]()
+
+    for name, func in _benchmarks.items():
+        if fnmatch(name, pattern):
+            results[name] = func()
+            echo(f"{name:<36} {results[name] * 1e6:>12.2f} us")
+
+    if output is not None:
+        output.write_text(
+            dumps(
+                {
+                    "time": datetime.now(timezone.utc).isoformat(),
+                    "python": python_version(),
+                    "lux": LUX_VERSION,
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+
+
+@main.command()
+@argument("baseline", type=PathType(exists=True, dir_okay=False, path_type=Path))
+@argument("current", type=PathType(exists=True, dir_okay=False, path_type=Path))
+@option("--threshold", default=DEFAULT_THRESHOLD, show_default=True, help="Allowed slowdown, as a fraction.")
+def compare(baseline: Path, current: Path, threshold: float) -> None:
+    before = loads(baseline.read_text())["results"]
+    after = loads(current.read_text())["results"]
+    regressions = list[str]()
+
+    for name in before.keys() & after.keys():
+        ratio = after[name] / before[name]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        echo(f"{name:<36} {before[name] * 1e6:>12.2f} us {after[name] * 1e6:>12.2f} us {ratio:>7.2f}x {flag}")
+
+    if regressions:
+        echo(f"{len(regressions)} benchmarks slower by more than {threshold:.0%}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,48 @@
-from disnake import AppCmdInter
-from disnake.ext.commands import slash_command
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from .bot import Lux
-from .cli import default_entry
-from .cog import GeneralCog
-from .utility import send_ephemeral
+if TYPE_CHECKING:
+    from disnake import AppCmdInter
+    from disnake.ext.commands import slash_command
+
+    from .bot import Lux, ShardedLux
+    from .cache import cached
+    from .cli import default_entry, loadtest_entry
+    from .cog import GeneralCog
+    from .executor import offload
+    from .rate_limiter import rate_limit
+    from .scheduler import scheduled
+    from .tracing import trace
+    from .utility import send_ephemeral
+
+# Public names and the modules they live in, imported on first access so `import lux` stays cheap.
+_LAZY_ATTRIBUTES = {
+    "AppCmdInter": "disnake",
+    "slash_command": "disnake.ext.commands",
+    "Lux": ".bot",
+    "ShardedLux": ".bot",
+    "cached": ".cache",
+    "default_entry": ".cli",
+    "loadtest_entry": ".cli",
+    "GeneralCog": ".cog",
+    "offload": ".executor",
+    "rate_limit": ".rate_limiter",
+    "scheduled": ".scheduler",
+    "send_ephemeral": ".utility",
+    "trace": ".tracing",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _LAZY_ATTRIBUTES.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(globals().keys() | _LAZY_ATTRIBUTES.keys())
@@ -0,0 +1,291 @@
+from asyncio import CancelledError, get_running_loop
+from bisect import bisect_right, insort
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+from pydantic import ConfigDict, Field
+from pydantic.dataclasses import dataclass
+
+from .logger import default_logger
+from .metrics import Histogram
+
+if TYPE_CHECKING:
+    from asyncio import Future, TimerHandle
+    from logging import Logger
+
+    from .config import CogConfig
+
+# Key of the GLOBAL sections of the cog config holding the `AdmissionSettings`.
+ADMISSION_KEY = "admission"
+# Keys of a cog config section holding the `ConcurrencyLimit` of the whole cog, and a table of them by command name.
+CONCURRENCY_KEY = "concurrency"
+COMMAND_CONCURRENCY_KEY = "command_concurrency"
+DEFAULT_ADMISSION_QUEUE_SIZE = 100
+# Discord expects a response within 3 seconds, the busy reply needs some of them.
+DEFAULT_ADMISSION_DEADLINE = 2.0
+DEFAULT_BUSY_MESSAGE = "The bot is busy right now, please try again in a moment."
+# Weight of the latest run in the moving average of the run time of each limit.
+RUN_TIME_WEIGHT = 0.1
+
+
+class ShedReason(StrEnum):
+    QUEUE_FULL = "queue_full"
+    DEADLINE = "deadline"
+    # Pushed out of a full queue by an interaction of higher priority.
+    EVICTED = "evicted"
+
+
+@dataclass(frozen=True, config=ConfigDict(defer_build=True))
+class AdmissionSettings:
+    # Interactions running at once over all commands, unlimited if omitted.
+    max_concurrency: int | None = Field(default=None, ge=1)
+    queue_size: int = Field(default=DEFAULT_ADMISSION_QUEUE_SIZE, ge=0)
+    # Seconds after receiving an interaction until which it may wait for its turn.
+    deadline: float = Field(default=DEFAULT_ADMISSION_DEADLINE, gt=0, lt=3)
+    busy_message: str = DEFAULT_BUSY_MESSAGE
+
+
+@dataclass(frozen=True, config=ConfigDict(defer_build=True))
+class ConcurrencyLimit:
+    max_concurrency: int | None = Field(default=None, ge=1)
+    # Waiting interactions of higher priority are admitted first, commands inherit the priority of their cog.
+    priority: int | None = None
+
+
+class _Slots:
+    """Interactions running under one limit, counted whether or not the limit is set."""
+
+    __slots__ = ("limit", "active", "run_time")
+
+    def __init__(self, limit: int | None = None) -> None:
+        self.limit = limit
+        self.active = 0
+        self.run_time = 0.0
+
+    @property
+    def full(self) -> bool:
+        return self.limit is not None and self.active >= self.limit
+
+
+class _Route:
+    __slots__ = ("slots", "priority")
+
+    def __init__(self, slots: "tuple[_Slots, ...]", priority: int) -> None:
+        self.slots = slots
+        self.priority = priority
+
+
+class _Waiter:
+    __slots__ = ("order", "command", "route", "future", "timer", "queued_at")
+
+    def __init__(self, order: tuple[int, int], command: str, route: _Route, future: "Future[bool]", now: float):
+        # Highest priority first, then first come first served.
+        self.order = order
+        self.command = command
+        self.route = route
+        self.future = future
+        self.timer: "TimerHandle | None" = None
+        self.queued_at = now
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.order < other.order
+
+
+class AdmissionStats:
+    __slots__ = ("admitted", "queued", "shed", "wait")
+
+    def __init__(self) -> None:
+        self.admitted = 0
+        self.queued = 0
+        self.shed = dict.fromkeys(ShedReason, 0)
+        self.wait = Histogram()
+
+
+class AdmissionController:
+    """
+    Limit how many application commands run at once, globally, per cog and per command.
+
+    Interactions over a limit wait in a bounded queue, by priority, until a slot frees up. Those that can not start
+    before the deadline, by the run times seen so far, are shed right away instead of timing out in the queue.
+    Limits apply to the top-level command, its subcommands share them.
+    """
+
+    def __init__(self, logger: "Logger" = default_logger) -> None:
+        self._logger = logger
+        self._settings = AdmissionSettings()
+        self._cog_config: "CogConfig | None" = None
+        self._global = _Slots()
+        self._cogs = dict[str, _Slots]()
+        self._commands = dict[str, _Slots]()
+        self._routes = dict[tuple[str, str | None], _Route]()
+        self._waiters = list[_Waiter]()
+        self._sequence = 0
+        self._stats = AdmissionStats()
+
+    @property
+    def settings(self) -> AdmissionSettings:
+        return self._settings
+
+    @property
+    def stats(self) -> AdmissionStats:
+        return self._stats
+
+    @property
+    def depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def active(self) -> int:
+        return self._global.active
+
+    @property
+    def waiting(self) -> list[tuple[str, int, float]]:
+        """Command, priority and seconds waited of the queued interactions, in admission order."""
+        now = get_running_loop().time()
+        return [(waiter.command, -waiter.order[0], now - waiter.queued_at) for waiter in self._waiters]
+
+    def configure(self, cog_config: "CogConfig") -> None:
+        """Apply the limits of `cog_config`, interactions already running keep counting against them."""
+        try:
+            settings = AdmissionSettings(**(cog_config.find(ADMISSION_KEY) or {}))
+        except Exception as e:
+            self._logger.exception(f"Failed while validating cog config data '{ADMISSION_KEY}'.", exc_info=e)
+            raise e
+
+        self._settings, self._cog_config = settings, cog_config
+        self._global.limit = settings.max_concurrency
+        # Limits are only read for the commands used so far, cached routes are built again right away so the limits
+        # of slots shared with queued interactions are up to date.
+        for slots in (*self._cogs.values(), *self._commands.values()):
+            slots.limit = None
+        self._routes = {key: self._build_route(*key) for key in self._routes}
+        self._wake()
+
+    def _limit(self, cog_name: str, key: str, command: str | None = None) -> ConcurrencyLimit:
+        assert self._cog_config is not None
+        data = self._cog_config.get_data(cog_name).get(key) or {}
+        if command is not None:
+            data = data.get(command) or {}
+
+        try:
+            return ConcurrencyLimit(**data)
+        except Exception as e:
+            self._logger.exception(f"Failed while validating concurrency limit {data} of cog '{cog_name}'.", exc_info=e)
+            return ConcurrencyLimit()
+
+    def _build_route(self, command: str, cog_name: str | None) -> _Route:
+        if (command_slots := self._commands.get(command)) is None:
+            command_slots = self._commands[command] = _Slots()
+        if cog_name is None or self._cog_config is None:
+            return _Route((self._global, command_slots), 0)
+
+        if (cog_slots := self._cogs.get(cog_name)) is None:
+            cog_slots = self._cogs[cog_name] = _Slots()
+        cog_limit = self._limit(cog_name, CONCURRENCY_KEY)
+        command_limit = self._limit(cog_name, COMMAND_CONCURRENCY_KEY, command)
+        cog_slots.limit = cog_limit.max_concurrency
+        command_slots.limit = command_limit.max_concurrency
+
+        priority = command_limit.priority if command_limit.priority is not None else cog_limit.priority
+        return _Route((self._global, cog_slots, command_slots), priority or 0)
+
+    def _route(self, command: str, cog_name: str | None) -> _Route:
+        if (route := self._routes.get(key := (command, cog_name))) is None:
+            route = self._routes[key] = self._build_route(command, cog_name)
+        return route
+
+    def _shed(self, reason: ShedReason) -> None:
+        self._stats.shed[reason] += 1
+
+    def _expected_wait(self, route: _Route, position: int) -> float:
+        """Seconds until a slot of every full limit of `route` frees up for the waiter at `position`."""
+        expected = 0.0
+        for slots in route.slots:
+            if slots.full:
+                ahead = sum(slots in waiter.route.slots for waiter in self._waiters[:position])
+                expected = max(expected, (ahead + 1) * slots.run_time / slots.limit)  # type: ignore[operator]
+        return expected
+
+    async def admit(self, command: str, cog_name: str | None, received_at: float) -> "tuple[_Slots, ...] | None":
+        """
+        Wait for the turn of an interaction received at `received_at` (loop time), return the ticket to `release`
+        once it finished running, or `None` if it was shed.
+        """
+        route = self._route(command, cog_name)
+        stats = self._stats
+        if not any(slots.full for slots in route.slots):
+            # Queued interactions are admitted as soon as they could be, none of them could run instead of this one.
+            for slots in route.slots:
+                slots.active += 1
+            stats.admitted += 1
+            return route.slots
+
+        loop = get_running_loop()
+        now = loop.time()
+        self._sequence += 1
+        waiter = _Waiter((-route.priority, self._sequence), command, route, loop.create_future(), now)
+        position = bisect_right(self._waiters, waiter)
+        if position >= self._settings.queue_size:
+            self._shed(ShedReason.QUEUE_FULL)
+            return None
+        if now + self._expected_wait(route, position) > received_at + self._settings.deadline:
+            self._shed(ShedReason.DEADLINE)
+            return None
+
+        if len(self._waiters) >= self._settings.queue_size:
+            self._evict(self._waiters.pop())
+        insort(self._waiters, waiter)
+        waiter.timer = loop.call_at(received_at + self._settings.deadline, self._expire, waiter)
+        stats.queued += 1
+
+        try:
+            admitted = await waiter.future
+        except CancelledError:
+            if not waiter.future.cancelled() and waiter.future.result():
+                self.release(route.slots)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                waiter.timer.cancel()
+            raise
+
+        if not admitted:
+            return None
+        stats.wait.observe(loop.time() - now)
+        return route.slots
+
+    def _evict(self, waiter: _Waiter) -> None:
+        if waiter.timer is not None:
+            waiter.timer.cancel()
+        waiter.future.set_result(False)
+        self._shed(ShedReason.EVICTED)
+
+    def _expire(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            waiter.future.set_result(False)
+            self._shed(ShedReason.DEADLINE)
+
+    def _wake(self) -> None:
+        waiters = self._waiters
+        index = 0
+        while index < len(waiters) and not self._global.full:
+            waiter = waiters[index]
+            if any(slots.full for slots in waiter.route.slots):
+                index += 1
+                continue
+
+            del waiters[index]
+            if waiter.timer is not None:
+                waiter.timer.cancel()
+            for slots in waiter.route.slots:
+                slots.active += 1
+            self._stats.admitted += 1
+            waiter.future.set_result(True)
+
+    def release(self, ticket: "tuple[_Slots, ...]", run_time: float | None = None) -> None:
+        """Free the slots `admit` took, `run_time` feeds the estimate of how long waiting interactions will wait."""
+        for slots in ticket:
+            slots.active -= 1
+            if run_time is not None:
+                slots.run_time += (run_time - slots.run_time) * RUN_TIME_WEIGHT
+        self._wake()
@@ -1,3 +1,6 @@
+from bisect import bisect_left, insort
+from heapq import nsmallest
+from itertools import islice
 from typing import TYPE_CHECKING
 
 from .context_var import bot
@@ -7,22 +10,155 @@ if TYPE_CHECKING:
 
     from disnake import AppCmdInter
 
+# Discord accepts at most 25 autocomplete choices.
+MAX_CHOICES = 25
+_GRAM_SIZE = 3
 
-def list_(iterable: "Iterable[str]", user_input: str | None):
+
+def _grams(folded: str) -> set[str]:
+    return {folded[i : i + size] for size in range(1, _GRAM_SIZE + 1) for i in range(len(folded) - size + 1)}
+
+
+class AutoCompleteIndex:
+    """
+    Case-insensitive autocomplete index over a set of candidates.
+
+    Candidates are indexed once by their casefolded prefix order and by their 1 to 3 character grams,
+    so a query only touches the candidates that can match. Results are ranked prefix matches first,
+    then matches on a word boundary, then any other substring match, and are capped at `limit`.
+    """
+
+    __slots__ = ("_limit", "_values", "_folded", "_sorted", "_grams")
+
+    def __init__(self, candidates: "Iterable[str] | Mapping[str, str]" = (), *, limit: int = MAX_CHOICES) -> None:
+        self._limit = limit
+        self._values = dict[str, str]()
+        self._folded = dict[str, str]()
+        self._sorted = list[tuple[str, str]]()
+        self._grams = dict[str, set[str]]()
+        self.update(candidates)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def add(self, key: str, value: str | None = None) -> None:
+        if key in self._values:
+            self._values[key] = key if value is None else value
+            return
+
+        folded = key.casefold()
+        self._values[key] = key if value is None else value
+        self._folded[key] = folded
+        insort(self._sorted, (folded, key))
+
+        for gram in _grams(folded):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def update(self, candidates: "Iterable[str] | Mapping[str, str]") -> None:
+        if hasattr(candidates, "items"):
+            for key, value in candidates.items():  # type: ignore[union-attr]
+                self.add(key, value)
+        else:
+            for key in candidates:
+                self.add(key)
+
+    def remove(self, key: str) -> None:
+        if (folded := self._folded.pop(key, None)) is None:
+            return
+
+        del self._values[key]
+        del self._sorted[bisect_left(self._sorted, (folded, key))]
+
+        for gram in _grams(folded):
+            if (keys := self._grams.get(gram)) is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._folded.clear()
+        self._sorted.clear()
+        self._grams.clear()
+
+    def _search(self, user_input: str | None) -> list[str]:
+        limit = self._limit
+
+        if not user_input:
+            return [key for _, key in islice(self._sorted, limit)]
+
+        query = user_input.casefold()
+        result = list[str]()
+
+        index = bisect_left(self._sorted, (query, ""))
+        for folded, key in islice(self._sorted, index, None):
+            if len(result) >= limit or not folded.startswith(query):
+                break
+            result.append(key)
+
+        if len(result) >= limit:
+            return result
+
+        if len(query) <= _GRAM_SIZE:
+            candidates = self._grams.get(query, set())
+        else:
+            postings = sorted(
+                (self._grams.get(query[i : i + _GRAM_SIZE], set()) for i in range(len(query) - _GRAM_SIZE + 1)),
+                key=len,
+            )
+            candidates = postings[0].intersection(*postings[1:])
+
+        ranked = list[tuple[int, str, str]]()
+        for key in candidates:
+            folded = self._folded[key]
+            if (position := folded.find(query)) <= 0:
+                # Not a match, or a prefix match which is already in the result.
+                continue
+            ranked.append((0 if not folded[position - 1].isalnum() else 1, folded, key))
+
+        result.extend(key for _, _, key in nsmallest(limit - len(result), ranked))
+        return result
+
+    def query(self, user_input: str | None) -> list[str]:
+        return [self._values[key] for key in self._search(user_input)]
+
+    def query_items(self, user_input: str | None) -> dict[str, str]:
+        return {key: self._values[key] for key in self._search(user_input)}
+
+
+def list_(iterable: "Iterable[str]", user_input: str | None, *, limit: int = MAX_CHOICES):
+    if isinstance(iterable, AutoCompleteIndex):
+        return iterable.query(user_input)
     if not user_input:
-        return list(iterable)
-    return [element for element in iterable if user_input.lower() in element]
+        return list(islice(iterable, limit))
 
+    user_input = user_input.casefold()
+    return list(islice((element for element in iterable if user_input in element.casefold()), limit))
 
-def dict_(mapping: "Mapping[str, str]", user_input: str | None):
+
+def dict_(mapping: "Mapping[str, str]", user_input: str | None, *, limit: int = MAX_CHOICES):
+    if isinstance(mapping, AutoCompleteIndex):
+        return mapping.query_items(user_input)
     if not user_input:
-        return dict(mapping)
-    return {key: value for key, value in mapping.items() if user_input.lower() in key}
+        return dict(islice(mapping.items(), limit))
+
+    user_input = user_input.casefold()
+    return dict(islice(((key, value) for key, value in mapping.items() if user_input in key.casefold()), limit))
 
 
 async def loaded_extension(inter: "AppCmdInter", user_input: str | None = None):
-    return list_(bot.get().cogs.keys(), user_input)
+    return bot.get().loaded_extension_index.query(user_input)
 
 
 async def unloaded_extension(inter: "AppCmdInter", user_input: str | None = None):
-    return list_(bot.get().unloaded_extensions, user_input)
+    return bot.get().unloaded_extension_index.query(user_input)
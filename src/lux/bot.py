@@ -1,7 +1,13 @@
+from asyncio import sleep, to_thread
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from importlib import reload
+from multiprocessing import get_context
 from pathlib import Path
+from time import perf_counter, time
 from typing import TYPE_CHECKING
 
-from disnake.ext.commands import InteractionBot
+from disnake import ApplicationCommandType, HTTPException
+from disnake.ext.commands import AutoShardedInteractionBot, InteractionBot
 from disnake.ext.commands.errors import (
     ExtensionAlreadyLoaded,
     ExtensionFailed,
@@ -9,16 +15,39 @@ from disnake.ext.commands.errors import (
     ExtensionNotLoaded,
     NoEntryPointError,
 )
+from disnake.ext.commands.interaction_bot_base import _app_commands_diff
+from disnake.utils import search_directory
 
+from .admission import AdmissionController
+from .auto_complete import AutoCompleteIndex
+from .cache import CacheSettings
+from .cog import GeneralCog
+from .command_sync import CommandSyncCache, fingerprint, in_sync
+from .config_watcher import DEFAULT_CONFIG_WATCH_INTERVAL, ConfigWatcher, changed_keys
 from .context_var import bot, env, interaction
-from .logger import default_logger
-from .utility import Development
+from .extension_loader import ExtensionLoader, ImportResult, import_extensions, order_by_dependencies
+from .gateway_session import GUILD_PAGE_SIZE, RESUMABLE_CLOSE_CODE, GatewaySession, GatewaySessionStore
+from .guild_config import GuildConfigs
+from .hot_reload import DEFAULT_HOT_RELOAD_INTERVAL, HotReloader
+from .lazy_extension import ExtensionManifest, LazyApplicationCommand
+from .logger import default_logger, default_queue_handler, rate_limit_filter
+from .loop_monitor import LoopMonitor
+from .metrics import Metrics, MetricsExporter, PrometheusExporter, time_first_response
+from .persistence import Persistence, backend_from_config
+from .scheduler import Scheduler
+from .tracing import JsonLinesExporter, RingBufferExporter, Tracer, trace
+from .utility import Development, send_ephemeral
 
 if TYPE_CHECKING:
+    from importlib.machinery import ModuleSpec
     from logging import Logger
+    from types import ModuleType
     from typing import Any, Callable, Self
 
-    from disnake import AppCmdInter
+    from disnake import AppCmdInter, Guild
+    from disnake.gateway import DiscordWebSocket
+    from disnake.http import Route
+    from disnake.ext.commands import Cog, CommandError
 
     from .config import BotConfig, CogConfig
 
@@ -32,20 +61,210 @@ class Lux(InteractionBot):
         cog_config: "CogConfig",
         logger: "Logger" = default_logger,
         disable_debug_extra_init: bool = False,
+        config_watch_interval: float | None = DEFAULT_CONFIG_WATCH_INTERVAL,
+        hot_reload_interval: float | None = DEFAULT_HOT_RELOAD_INTERVAL,
+        command_sync_cache: bool | None = None,
+        force_command_sync: bool = False,
         **options,
     ):
+        # `HotReloader` replaces the reload watchdog of disnake, which re-imports whole extensions.
         super().__init__(
-            reload=not production,
+            reload=False,
             test_guilds=None if production else bot_config.test_guilds,
             intents=bot_config.intents,
+            member_cache_flags=bot_config.member_cache_flags,
+            max_messages=bot_config.max_messages,
+            chunk_guilds_at_startup=bot_config.chunk_guilds_at_startup,
             **options,
         )
         self._production = production
         self._bot_config = bot_config
         self._cog_config = cog_config
         self._logger = logger
+        self._guild_configs = GuildConfigs(
+            cog_config,
+            logger.getChild("guild_config"),
+            settings=CacheSettings(bot_config.guild_config_cache_size, bot_config.guild_config_cache_ttl),
+        )
         self._disable_debug_extra_init = disable_debug_extra_init
         self._unloaded_extensions = list[str]()
+        self._reloading = False
+        self._loaded_extension_index = AutoCompleteIndex()
+        self._unloaded_extension_index = AutoCompleteIndex()
+        self._imported_extensions = dict[str, "ImportResult"]()
+        self._extension_manifest = ExtensionManifest() if bot_config.lazy_extensions else None
+        self._lazy_extensions = dict[str, list[LazyApplicationCommand]]()
+        self._metrics = Metrics()
+        self._time_first_responses = True
+        self._metrics_exporters = list[MetricsExporter]()
+        self._admission = AdmissionController(logger.getChild("admission"))
+        self._admission.configure(cog_config)
+        self._metrics.gauges["admission_queue_depth"] = lambda: self._admission.depth
+        self._metrics.gauges["admission_active"] = lambda: self._admission.active
+        self._thread_pool = ThreadPoolExecutor(bot_config.thread_pool_size, thread_name_prefix="lux-offload")
+        self._process_pool: ProcessPoolExecutor | None = None
+        if command_sync_cache is None:
+            command_sync_cache = bot_config.command_sync_cache
+        self._command_sync_cache = CommandSyncCache() if command_sync_cache else None
+        # Scopes whose fetch was skipped at startup, fetched once after the first sync.
+        self._unverified_scopes = list[int | None]()
+        self._force_command_sync = force_command_sync
+        self._loop_monitor = (
+            LoopMonitor(logger.getChild("loop"), threshold=bot_config.loop_block_threshold)
+            if (enabled := bot_config.loop_monitor) or (enabled is None and not production)
+            else None
+        )
+        self._config_watcher = (
+            ConfigWatcher(self, cog_config.path, config_watch_interval, cog_config.digest)
+            if cog_config.path and config_watch_interval
+            else None
+        )
+        self._hot_reloader = (
+            HotReloader(self, hot_reload_interval, logger.getChild("reload"))
+            if hot_reload_interval and not production
+            else None
+        )
+        if (limit := bot_config.chunk_guild_member_limit) is not None:
+            self._limit_chunking(limit)
+        self._persistence = (
+            Persistence(
+                backend,
+                bot_config.persistence_flush_interval,
+                bot_config.persistence_batch_size,
+                logger.getChild("persistence"),
+            )
+            if (backend := backend_from_config(bot_config)) is not None
+            else None
+        )
+        self._gateway_sessions = GatewaySessionStore() if bot_config.resume_gateway_sessions else None
+        # Shards whose stored session was tried, those still resuming it, and those whose guilds are still fetched.
+        self._restored_shards = set[int]()
+        self._resuming_shards = set[int]()
+        self._restoring_shards = set[int]()
+        if self._gateway_sessions is not None:
+            self._resume_gateway_sessions()
+
+        sample_rate = bot_config.trace_sample_rate
+        self._tracer = Tracer(sample_rate if sample_rate is not None else 0.0 if production else 1.0)
+        self._trace_buffer: RingBufferExporter | None = None
+        if self._tracer.sample_rate:
+            self._trace_buffer = RingBufferExporter(bot_config.trace_buffer_size)
+            self._tracer.add_exporter(self._trace_buffer)
+            if (trace_file := bot_config.trace_file) is not None:
+                self._tracer.add_exporter(JsonLinesExporter(trace_file))
+            self._trace_http()
+        self._scheduler = Scheduler(self._tracer, logger.getChild("scheduler"))
+
+    def _limit_chunking(self, limit: int) -> None:
+        # Chunking fetches every member of a guild, guilds over `limit` members are left to `Guild.chunk` instead.
+        state = self._connection
+        needs_chunking = state._guild_needs_chunking
+
+        def guild_needs_chunking(guild: "Guild") -> bool:
+            return needs_chunking(guild) and (guild.member_count or 0) <= limit
+
+        state._guild_needs_chunking = guild_needs_chunking  # type: ignore[method-assign]
+
+    def _resume_gateway_sessions(self) -> None:
+        # The first connection of each shard resumes the session stored for it instead of identifying. Discord sends
+        # no READY and no guilds for a resumed session, what disnake does on READY is done once the guilds of the shard
+        # are fetched. A session Discord refuses is invalidated, and disnake identifies again.
+        state = self._connection
+        update_references = state._update_references
+        parse_ready = state.parsers["READY"]
+        parse_resumed = state.parsers["RESUMED"]
+
+        def resume_stored_session(ws: "DiscordWebSocket") -> None:
+            update_references(ws)
+            if (shard_id := ws.shard_id or 0) in self._restored_shards or self._gateway_sessions is None:
+                return
+            self._restored_shards.add(shard_id)
+
+            session = self._gateway_sessions.load(shard_id)
+            if session is None or session.user_id != self.user.id or session.shard_count != (ws.shard_count or 1):
+                return
+            ws.session_id, ws.sequence, ws.resume_gateway = session.session_id, session.sequence, session.resume_url
+            ws.identify = ws.resume  # type: ignore[method-assign]
+            if state.application_id is None:
+                state.application_id = session.application_id
+            self._resuming_shards.add(shard_id)
+            self._logger.info(f"Resuming session of shard {shard_id} saved {time() - session.saved_at:.1f}s ago.")
+
+        def ready(data: "Any") -> None:
+            if (shard_id := data.get("__shard_id__") or 0) in self._resuming_shards:
+                self._resuming_shards.discard(shard_id)
+                self._logger.info(f"Could not resume session of shard {shard_id}, identified instead.")
+            parse_ready(data)
+
+        def resumed(data: "Any") -> None:
+            parse_resumed(data)
+            if (shard_id := data.get("__shard_id__") or 0) not in self._resuming_shards:
+                return
+            self._resuming_shards.discard(shard_id)
+            self._restoring_shards.add(shard_id)
+            self._logger.info(f"Resumed session of shard {shard_id}.")
+
+            state.dispatch("connect")
+            # Prepares application commands, as on the first READY.
+            state.call_handlers("connect_internal")
+            self.loop.create_task(finish_resume(shard_id))
+
+        async def finish_resume(shard_id: int) -> None:
+            try:
+                await self._restore_guilds(shard_id, state.shard_count or 1)
+            except Exception as e:
+                self._logger.exception(f"Failed while fetching guilds of shard {shard_id}.", exc_info=e)
+
+            self._restoring_shards.discard(shard_id)
+            if not (self._resuming_shards or self._restoring_shards or self.is_ready()):
+                state.call_handlers("ready")
+                state.dispatch("ready")
+
+        state._update_references = resume_stored_session  # type: ignore[method-assign]
+        state.parsers["READY"] = ready
+        state.parsers["RESUMED"] = resumed
+
+    async def before_identify_hook(self, shard_id: int | None, *, initial: bool = False) -> None:
+        # Identifying after a refused stored session is the first identify of the shard, it is not delayed as a retry.
+        await super().before_identify_hook(shard_id, initial=initial or (shard_id or 0) in self._resuming_shards)
+
+    async def _restore_guilds(self, shard_id: int, shard_count: int) -> None:
+        # Guilds come with their channels and the member of the bot, members and threads are left to chunking and
+        # later events. Guilds already received again since resuming are kept.
+        state = self._connection
+        guild_ids = list[int]()
+        after: int | None = None
+        while partial_guilds := await self.http.get_guilds(GUILD_PAGE_SIZE, after=after):
+            guild_ids.extend(
+                guild_id
+                for data in partial_guilds
+                if ((guild_id := int(data["id"])) >> 22) % shard_count == shard_id
+            )
+            if len(partial_guilds) < GUILD_PAGE_SIZE:
+                break
+            after = int(partial_guilds[-1]["id"])
+
+        for guild_id in guild_ids:
+            if state._get_guild(guild_id) is not None:
+                continue
+            data: "Any" = await self.http.get_guild(guild_id)
+            data["channels"] = await self.http.get_all_guild_channels(guild_id)
+            data["members"] = [await self.http.get_member(guild_id, self.user.id)]
+            guild = state._add_guild_from_data(data)
+            if state._guild_needs_chunking(guild):
+                await state.chunk_guild(guild, wait=False)
+            state.dispatch("guild_available", guild)
+        self._logger.info(f"Fetched {len(guild_ids)} guilds of shard {shard_id}.")
+
+    def _trace_http(self) -> None:
+        # Routes are named by their path template, so spans of the same endpoint share a name.
+        request = self.http.request
+
+        async def traced_request(route: "Route", **kwargs: "Any") -> "Any":
+            with trace(f"http {route.method} {route.path}"):
+                return await request(route, **kwargs)
+
+        self.http.request = traced_request  # type: ignore[method-assign]
 
     @property
     def production(self) -> bool:
@@ -71,11 +290,340 @@ class Lux(InteractionBot):
     def unloaded_extensions(self) -> list[str]:
         return self._unloaded_extensions
 
-    def _try_extension(self, operation: "Callable", name: str, *, package: str | None = None):
+    @property
+    def loaded_extension_index(self) -> AutoCompleteIndex:
+        return self._loaded_extension_index
+
+    @property
+    def unloaded_extension_index(self) -> AutoCompleteIndex:
+        return self._unloaded_extension_index
+
+    @property
+    def extension_manifest(self) -> ExtensionManifest | None:
+        return self._extension_manifest
+
+    @property
+    def lazy_extensions(self) -> "dict[str, list[LazyApplicationCommand]]":
+        return self._lazy_extensions
+
+    def _application_command_registry(self, command_type: ApplicationCommandType) -> "dict[str, Any]":
+        if command_type is ApplicationCommandType.user:
+            return self.all_user_commands
+        if command_type is ApplicationCommandType.message:
+            return self.all_message_commands
+        return self.all_slash_commands
+
+    def _add_lazy_extension(self, name: str, commands: list[LazyApplicationCommand]) -> None:
+        self._lazy_extensions[name] = commands
+        for command in commands:
+            self._application_command_registry(command.type)[command.name] = command
+
+    def _remove_lazy_extension(self, name: str) -> list[LazyApplicationCommand]:
+        commands = self._lazy_extensions.pop(name, [])
+        for command in commands:
+            registry = self._application_command_registry(command.type)
+            if registry.get(command.name) is command:
+                del registry[command.name]
+        return commands
+
+    def _load_lazy_command(self, inter: "AppCmdInter") -> None:
+        command = self._application_command_registry(inter.data.type).get(inter.data.name)
+
+        if isinstance(command, LazyApplicationCommand):
+            self._logger.info(f"Command '{command.name}' used, loading its extension '{command.extension}'.")
+            self.load_extension(command.extension)
+
+    @property
+    def loop_monitor(self) -> LoopMonitor | None:
+        return self._loop_monitor
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        # Worker processes are only spawned once something is offloaded to them.
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                self._bot_config.process_pool_size, mp_context=get_context("spawn")
+            )
+        return self._process_pool
+
+    @property
+    def tracer(self) -> Tracer:
+        return self._tracer
+
+    @property
+    def trace_buffer(self) -> RingBufferExporter | None:
+        return self._trace_buffer
+
+    @property
+    def scheduler(self) -> Scheduler:
+        return self._scheduler
+
+    @property
+    def persistence(self) -> Persistence | None:
+        return self._persistence
+
+    @property
+    def metrics(self) -> Metrics:
+        return self._metrics
+
+    @property
+    def admission(self) -> AdmissionController:
+        return self._admission
+
+    @property
+    def guild_configs(self) -> GuildConfigs:
+        """Cog configs resolved per guild, set its `provider` to add overrides from outside the cog config."""
+        return self._guild_configs
+
+    def add_metrics_exporter(self, exporter: MetricsExporter) -> None:
+        self._metrics_exporters.append(exporter)
+
+    async def _start_metrics_exporters(self) -> None:
+        for exporter in self._metrics_exporters:
+            try:
+                await exporter.start(self._metrics)
+            except Exception as e:
+                self._logger.exception(f"Failed while starting metrics exporter '{exporter}'.", exc_info=e)
+            else:
+                self._logger.info(f"Started metrics exporter '{exporter.__class__.__name__}'.")
+
+    def _record_first_response(self, inter: "AppCmdInter", delay: float) -> None:
+        if command := inter.application_command:
+            self._metrics.record_first_response(command.qualified_name, command.cog_name, delay)
+
+    def _record_command_error(self, inter: "AppCmdInter") -> None:
+        if command := inter.application_command:
+            self._metrics.record_error(command.qualified_name, command.cog_name)
+
+    @property
+    def command_sync_cache(self) -> CommandSyncCache | None:
+        return self._command_sync_cache
+
+    def _command_scopes(self) -> "dict[int | None, list[Any]]":
+        global_commands, guild_commands = self._ordered_unsynced_commands(self._test_guilds)
+        return {None: global_commands} | guild_commands
+
+    async def _cache_application_commands(self) -> None:
+        if (cache := self._command_sync_cache) is None:
+            return await super()._cache_application_commands()
+
+        connection = self._connection
+        skipped = 0
+
+        for guild_id, commands in self._command_scopes().items():
+            synced = None
+            if not self._force_command_sync:
+                synced = cache.get(self.application_id, guild_id, fingerprint(commands))
+
+            try:
+                if synced is not None:
+                    skipped += 1
+                    self._unverified_scopes.append(guild_id)
+                elif guild_id is None:
+                    synced = await self.fetch_global_commands(with_localizations=True)
+                else:
+                    synced = await self.fetch_guild_commands(guild_id, with_localizations=True)
+            except (HTTPException, TypeError):
+                continue
+
+            if guild_id is None:
+                connection._global_application_commands = {command.id: command for command in synced}
+            elif synced:
+                connection._guild_application_commands[guild_id] = {command.id: command for command in synced}
+
+        self._force_command_sync = False
+        self._logger.info(f"Skipped fetching application commands of {skipped} unchanged scopes.")
+
+    async def _prepare_application_commands(self) -> None:
+        await super()._prepare_application_commands()
+        if self._unverified_scopes:
+            # Startup does not wait for the check, the cache saves its fetches.
+            self.loop.create_task(self._verify_cached_commands())
+
+    async def _verify_cached_commands(self) -> None:
+        """
+        Fetch the scopes skipped at startup once the bot is ready, syncing them again if their commands were changed
+        elsewhere.
+        """
+        await self.wait_until_ready()
+        if not (scopes := self._unverified_scopes):
+            return
+
+        self._unverified_scopes = []
+        connection = self._connection
+        stale = list[int | None]()
+
+        async with self._sync_queued:
+            local_scopes = self._command_scopes()
+            for guild_id in scopes:
+                try:
+                    if guild_id is None:
+                        synced = await self.fetch_global_commands(with_localizations=True)
+                    else:
+                        synced = await self.fetch_guild_commands(guild_id, with_localizations=True)
+                except (HTTPException, TypeError):
+                    continue
+
+                if guild_id is None:
+                    connection._global_application_commands = {command.id: command for command in synced}
+                else:
+                    connection._guild_application_commands[guild_id] = {command.id: command for command in synced}
+                if not in_sync(local_scopes.get(guild_id, []), synced):
+                    stale.append(guild_id)
+
+            if not stale:
+                # IDs may still have changed, the cache keeps the commands as Discord returned them.
+                return self._cache_synced_commands()
+            self._logger.warning(f"Application commands of scopes {stale} were changed elsewhere, syncing them again.")
+            await self._sync_application_commands()
+
+    async def _sync_application_commands(self) -> None:
+        await super()._sync_application_commands()
+        self._cache_synced_commands()
+
+    def _cache_synced_commands(self) -> None:
+        if (cache := self._command_sync_cache) is None or self.application_id is None:
+            return
+
+        connection = self._connection
+        for guild_id, commands in self._command_scopes().items():
+            if guild_id is None:
+                synced = list(connection._global_application_commands.values())
+            else:
+                synced = list(connection._guild_application_commands.get(guild_id, {}).values())
+
+            # A scope whose sync failed is not cached, so it is fetched and synced again next time.
+            if in_sync(commands, synced):
+                cache.set(self.application_id, guild_id, fingerprint(commands), synced)
+            else:
+                cache.discard(self.application_id, guild_id)
+        cache.save()
+
+    async def sync_changed_commands(self) -> int:
+        """
+        Sync the application commands that differ from the synced ones one by one, instead of overwriting every
+        command of their scope, returning how many were sent.
+        """
+        if not self._command_sync_flags._sync_enabled or not self.is_ready():
+            return 0
+
+        sent = 0
+        # Waits for a full sync already running, and makes one scheduled meanwhile skip.
+        async with self._sync_queued:
+            for guild_id, commands in self._command_scopes().items():
+                if guild_id is None:
+                    if not self._command_sync_flags.sync_global_commands:
+                        continue
+                    synced = self._connection._global_application_commands
+                else:
+                    if not self._command_sync_flags.sync_guild_commands:
+                        continue
+                    synced = self._connection._guild_application_commands.get(guild_id, {})
+
+                ids = {(command.name, command.type): command_id for command_id, command in synced.items()}
+                diff = _app_commands_diff(commands, synced.values())
+                if not self._command_sync_flags.allow_command_deletion:
+                    diff["delete"] = []
+
+                try:
+                    for command in diff["upsert"] + diff["edit"]:
+                        if guild_id is None:
+                            await self.create_global_command(command)
+                        else:
+                            await self.create_guild_command(guild_id, command)
+                    for command in diff["delete"]:
+                        if guild_id is None:
+                            await self.delete_global_command(ids[command.name, command.type])
+                        else:
+                            await self.delete_guild_command(guild_id, ids[command.name, command.type])
+                except HTTPException as e:
+                    self._logger.exception(f"Failed while syncing changed commands of scope {guild_id}.", exc_info=e)
+                    continue
+                sent += len(diff["upsert"]) + len(diff["edit"]) + len(diff["delete"])
+
+        if sent:
+            self._cache_synced_commands()
+        return sent
+
+    @property
+    def gateway_sessions(self) -> GatewaySessionStore | None:
+        return self._gateway_sessions
+
+    def _gateway_sockets(self) -> "dict[int, DiscordWebSocket]":
+        return {self.shard_id or 0: self.ws} if self.ws is not None else {}
+
+    def save_gateway_sessions(self) -> None:
+        if (store := self._gateway_sessions) is None or self.user is None:
+            return
+
+        for shard_id, ws in self._gateway_sockets().items():
+            if ws.session_id is not None and ws.sequence is not None:
+                session = GatewaySession(
+                    session_id=ws.session_id,
+                    sequence=ws.sequence,
+                    resume_url=ws.resume_gateway,
+                    user_id=self.user.id,
+                    application_id=self.application_id,
+                    shard_count=ws.shard_count or 1,
+                    saved_at=time(),
+                )
+                store.save(shard_id, session)
+
+    async def _save_gateway_sessions_periodically(self) -> None:
+        # A crash loses the events since the last save, they are received again when the session is resumed.
+        while not self.is_closed():
+            await sleep(self._bot_config.gateway_session_save_interval)
+            self.save_gateway_sessions()
+
+    @property
+    def config_watcher(self) -> ConfigWatcher | None:
+        return self._config_watcher
+
+    @property
+    def hot_reloader(self) -> HotReloader | None:
+        return self._hot_reloader
+
+    async def apply_cog_config(self, cog_config: "CogConfig") -> None:
+        previous, self._cog_config = self._cog_config, cog_config
+        self._guild_configs.cog_config = cog_config
+        keys = changed_keys(previous.resolved, cog_config.resolved)
+        try:
+            self._admission.configure(cog_config)
+        except Exception:
+            self._logger.warning("Keep using the previous admission settings.")
+
+        for cog in list(self.cogs.values()):
+            if not isinstance(cog, GeneralCog):
+                continue
+
+            name = cog.__class__.__name__
+            try:
+                if previous.get_data(name) == cog_config.get_data(name) and not (cog.config_keys & keys):
+                    continue
+            except Exception as e:
+                self._logger.exception(f"Failed while applying changed config of cog '{name}'.", exc_info=e)
+                self._logger.warning(f"Keep using the previous config of cog '{name}'.")
+                continue
+
+            self._logger.info(f"Reconfiguring cog '{name}'.")
+            if not cog.reload_config():
+                continue
+
+            try:
+                await cog.cog_config_update()
+            except Exception as e:
+                self._logger.exception(f"Cog '{name}' failed while handling config update.", exc_info=e)
+
+    def _try_extension(self, operation: "Callable", name: str, *, package: str | None = None) -> bool:
         logger = self._logger
 
         try:
             operation(name, package=package)
+            return True
         except ExtensionNotFound:
             logger.error(f"Extension '{name}' not found.")
         except ExtensionNotLoaded:
@@ -86,32 +634,162 @@ class Lux(InteractionBot):
             logger.error(f"Extension '{name}' has no entry point ('setup' function).")
         except ExtensionFailed as e:
             logger.exception(f"Extension '{name}' failed to load.", exc_info=e)
+        return False
 
     def load_extension(self, name: str, *, package: str | None = None) -> None:
+        if self._reloading:
+            # `reload_extension` restores the previous module when loading fails, the error has to reach it.
+            return super().load_extension(name, package=package)
+
         self._logger.info(f"Loading extension '{name}'")
-        self._try_extension(super().load_extension, name, package=package)
+        lazy_commands = self._remove_lazy_extension(name)
 
-    def load_extensions(self, path: str) -> None:
+        if self._try_extension(super().load_extension, name, package=package):
+            name = self._resolve_name(name, package)
+            self._loaded_extension_index.add(name)
+            self._unloaded_extension_index.remove(name)
+            if name in self._unloaded_extensions:
+                self._unloaded_extensions.remove(name)
+            if self._extension_manifest is not None:
+                self._extension_manifest.record(name, self)
+        elif lazy_commands:
+            self._add_lazy_extension(name, lazy_commands)
+
+    def _load_from_module_spec(self, spec: "ModuleSpec", key: str) -> None:
+        loader = ExtensionLoader(spec, *self._imported_extensions.pop(key, (None, None, 0.0)))
+        start = perf_counter()
+        super()._load_from_module_spec(loader.wrap(), key)
+        setup_duration = perf_counter() - start - (0 if loader.preimported else loader.duration)
+        self._logger.info(
+            f"Extension '{key}' imported in {loader.duration * 1000:.1f} ms, set up in {setup_duration * 1000:.1f} ms."
+        )
+
+    def load_extensions(self, path: str, *, workers: int | None = None) -> None:
         if not (path_ := Path(path).resolve()).exists():
             return self._logger.warning(f"Path '{path_}' does not exist. Skip loading extension from this path.")
 
         self._logger.info(f"Loading extensions from '{path_}'.")
-        super().load_extensions(path)
+        names = list(search_directory(path))
+
+        if (manifest := self._extension_manifest) is not None:
+            for name in names:
+                if (commands := manifest.lazy_commands(name)) is not None:
+                    self._add_lazy_extension(name, commands)
+                    self._unloaded_extension_index.add(name)
+
+            self._logger.info(f"Deferred {len(self._lazy_extensions)} extensions until their commands are used.")
+            names = [name for name in names if name not in self._lazy_extensions]
+
+        if (workers := workers or self._bot_config.extension_import_workers) > 1:
+            self._logger.info(f"Importing {len(names)} extensions with {workers} threads.")
+            start = perf_counter()
+            self._imported_extensions = import_extensions(names, workers)
+            self._logger.info(f"Imported extensions in {(perf_counter() - start) * 1000:.1f} ms.")
+            modules = {name: module for name, (module, _, _) in self._imported_extensions.items()}
+            names = order_by_dependencies(names, modules, self._logger)
+
+        try:
+            for name in names:
+                self.load_extension(name)
+        finally:
+            self._imported_extensions.clear()
+
+        if manifest is not None:
+            manifest.save()
 
-    def reload_extension(self, name: str, *, package: str | None = None) -> None:
+    def reload_extension(self, name: str, *, package: str | None = None) -> bool:
         self._logger.info(f"Reloading extension '{name}'.")
-        self._try_extension(super().reload_extension, name, package=package)
+        self._reloading = True
+        try:
+            reloaded = self._try_extension(super().reload_extension, name, package=package)
+        finally:
+            self._reloading = False
+
+        if reloaded and self._extension_manifest is not None:
+            self._extension_manifest.record(self._resolve_name(name, package), self)
+        return reloaded
+
+    def reload_extension_modules(self, names: list[str], modules: "list[ModuleType]") -> int:
+        """
+        Tear down the loaded extensions `names`, reload `modules` in place in that order and set the extensions up
+        again, returning how many were. Unlike `reload_extension`, the other modules of their packages stay imported.
+        """
+        extensions = self.extensions
+        for name in reversed(names):
+            self._logger.info(f"Reloading extension '{name}'.")
+            self._remove_module_references(name)
+            if (teardown := getattr(extensions[name], "teardown", None)) is not None:
+                try:
+                    teardown(self)
+                except Exception as e:
+                    self._logger.exception(f"Extension '{name}' failed to tear down.", exc_info=e)
+
+        # A module that fails to import again keeps its previous content, the extensions set up with it keep working.
+        for module in modules:
+            try:
+                reload(module)
+            except Exception as e:
+                self._logger.exception(f"Failed while reloading module '{module.__name__}'.", exc_info=e)
+
+        reloaded = 0
+        for name in names:
+            try:
+                extensions[name].setup(self)
+            except Exception as e:
+                # The extension stays loaded without its commands, so saving a fix reloads it.
+                self._remove_module_references(name)
+                self._logger.exception(f"Extension '{name}' failed to load.", exc_info=e)
+                continue
+            reloaded += 1
+            if self._extension_manifest is not None:
+                self._extension_manifest.record(name, self)
+        return reloaded
 
     def unload_extension(self, name: str, *, package: str | None = None) -> None:
         self._logger.info(f"Unloading extension '{name}'.")
-        self._unloaded_extensions.append(name)
-        self._try_extension(super().unload_extension, name, package=package)
+        if self._try_extension(super().unload_extension, name, package=package):
+            name = self._resolve_name(name, package)
+            self._loaded_extension_index.remove(name)
+            self._unloaded_extension_index.add(name)
+            self._unloaded_extensions.append(name)
+
+    def add_cog(self, cog: "Cog", *, override: bool = False) -> None:
+        super().add_cog(cog, override=override)
+        if isinstance(cog, GeneralCog):
+            cog.schedule_decorated_jobs()
+
+    def remove_cog(self, name: str) -> "Cog | None":
+        # Unloading and reloading an extension remove its cogs, whatever their caches hold may be stale afterwards.
+        if isinstance(cog := super().remove_cog(name), GeneralCog):
+            cog.clear_caches()
+        if cog is not None:
+            self._scheduler.cancel_owner(cog.qualified_name)
+        return cog
 
     def init(self) -> "Self":
         logger = self._logger
         logger.info("Start initialization.")
         bot.set(self)
+
+        for name, limit in self._bot_config.log_limits.items():
+            rate_limit_filter.set_limit(name, limit.rate, limit.burst, limit.sample)
         self.load_extensions(self._bot_config.extension_directory)
+
+        if self._loop_monitor:
+            self.loop.create_task(self._loop_monitor.run())
+        if self._config_watcher:
+            self.loop.create_task(self._config_watcher.run())
+        if self._hot_reloader:
+            self.loop.create_task(self._hot_reloader.run())
+        self.loop.create_task(self._scheduler.run())
+        if self._gateway_sessions is not None:
+            self.loop.create_task(self._save_gateway_sessions_periodically())
+        if self._persistence is not None:
+            self.loop.create_task(self._persistence.run())
+        if (metrics_port := self._bot_config.metrics_port) is not None:
+            self.add_metrics_exporter(PrometheusExporter(metrics_port))
+        if self._metrics_exporters:
+            self.loop.create_task(self._start_metrics_exporters())
         logger.info("Finish initialization.")
 
         if not (self._production or self._disable_debug_extra_init):
@@ -129,6 +807,38 @@ class Lux(InteractionBot):
             raise ValueError("No bot token provided.")
         return super().run(token, *args, **kwargs)
 
+    async def close(self) -> None:
+        self._scheduler.close()
+        if self._extension_manifest is not None:
+            self._extension_manifest.save()
+        for exporter in self._metrics_exporters:
+            await exporter.stop()
+        if self._persistence is not None:
+            await self._persistence.close()
+        if self._loop_monitor is not None:
+            self._loop_monitor.stop()
+        if self._gateway_sessions is not None:
+            self.save_gateway_sessions()
+            for ws in self._gateway_sockets().values():
+                self._keep_session_on_close(ws)
+        await super().close()
+        self._tracer.close()
+
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                await to_thread(pool.shutdown, wait=True, cancel_futures=True)
+        default_queue_handler.stop()
+
+    @staticmethod
+    def _keep_session_on_close(ws: "DiscordWebSocket") -> None:
+        # disnake closes with 1000, which would end the session saved for the next run.
+        close = ws.close
+
+        async def close_resumable(code: int = RESUMABLE_CLOSE_CODE) -> None:
+            await close(RESUMABLE_CLOSE_CODE)
+
+        ws.close = close_resumable  # type: ignore[method-assign]
+
     async def on_ready(self) -> None:
         self._logger.info("The bot is ready.")
         self._logger.info(f"User: {self.user}")
@@ -136,4 +846,66 @@ class Lux(InteractionBot):
 
     async def on_application_command(self, inter: "AppCmdInter"):
         interaction.set(inter)
-        await self.process_application_commands(inter)
+        if self._loop_monitor is not None:
+            self._loop_monitor.track(inter)
+        received_at = self.loop.time()
+        self._load_lazy_command(inter)
+        # The time to first response includes waiting for admission, the command could not respond before.
+        if self._time_first_responses and not time_first_response(
+            inter, lambda delay: self._record_first_response(inter, delay)
+        ):
+            self._time_first_responses = False
+            self._logger.warning("Can not time interaction responses with this disnake version.")
+        if (ticket := await self._admit(inter, received_at)) is None:
+            return
+        start = perf_counter()
+
+        with self._tracer.start(inter.data.name, guild_id=inter.guild_id, user_id=inter.author.id) as span:
+            try:
+                await self.process_application_commands(inter)
+            finally:
+                self._admission.release(ticket, perf_counter() - start)
+                if command := inter.application_command:
+                    self._metrics.record(command.qualified_name, command.cog_name, perf_counter() - start)
+                if span is not None and command:
+                    span.name = command.qualified_name
+                # Command errors are handled before reaching here, the span only learns that one happened.
+                if span is not None and inter.command_failed:
+                    span.error = "command failed"
+
+    async def _admit(self, inter: "AppCmdInter", received_at: float) -> "tuple[Any, ...] | None":
+        name = inter.data.name
+        command = self._application_command_registry(inter.data.type).get(name)
+        cog_name = cog.__class__.__name__ if (cog := getattr(command, "cog", None)) is not None else None
+        if (ticket := await self._admission.admit(name, cog_name, received_at)) is not None:
+            return ticket
+
+        self._metrics.record_shed(name, getattr(command, "cog_name", None))
+        try:
+            await send_ephemeral(self._admission.settings.busy_message)
+        except HTTPException as e:
+            self._logger.debug(f"Failed while replying busy to '{name}': {e}")
+        return None
+
+    async def on_slash_command_error(self, interaction: "AppCmdInter", exception: "CommandError") -> None:
+        self._record_command_error(interaction)
+        await super().on_slash_command_error(interaction, exception)
+
+    async def on_user_command_error(self, interaction: "AppCmdInter", exception: "CommandError") -> None:
+        self._record_command_error(interaction)
+        await super().on_user_command_error(interaction, exception)
+
+    async def on_message_command_error(self, interaction: "AppCmdInter", exception: "CommandError") -> None:
+        self._record_command_error(interaction)
+        await super().on_message_command_error(interaction, exception)
+
+    async def on_application_command_autocomplete(self, inter: "AppCmdInter"):
+        self._load_lazy_command(inter)
+        await self.process_app_command_autocompletion(inter)
+
+
+class ShardedLux(Lux, AutoShardedInteractionBot):
+    """`Lux` running several shards in one process, pass `shard_count` and `shard_ids` to choose them."""
+
+    def _gateway_sockets(self) -> "dict[int, DiscordWebSocket]":
+        return {shard_id: shard._parent.ws for shard_id, shard in self.shards.items()}
@@ -0,0 +1,190 @@
+from asyncio import CancelledError, current_task, get_running_loop, shield
+from collections import OrderedDict
+from functools import wraps
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+from pydantic import ConfigDict, Field
+from pydantic.dataclasses import dataclass
+
+from .tracing import trace
+
+if TYPE_CHECKING:
+    from asyncio import Future
+    from typing import Awaitable, Callable, Hashable
+
+DEFAULT_CACHE_SIZE = 128
+# Keys of a cog config section overriding the settings of every cache of that cog.
+CACHE_SIZE_KEY = "cache_size"
+CACHE_TTL_KEY = "cache_ttl"
+CACHE_NEGATIVE_TTL_KEY = "cache_negative_ttl"
+
+
+@dataclass(frozen=True, config=ConfigDict(defer_build=True))
+class CacheSettings:
+    maxsize: int = Field(default=DEFAULT_CACHE_SIZE, ge=1)
+    ttl: float | None = Field(default=None, gt=0)
+    # `None` results are kept for `negative_ttl` instead of `ttl`, exceptions are only kept when it is set.
+    negative_ttl: float | None = Field(default=None, gt=0)
+
+
+class CacheStats:
+    __slots__ = ("hits", "misses", "coalesced", "evictions", "expirations")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+class _Entry:
+    __slots__ = ("value", "error", "traceback", "expires_at")
+
+    def __init__(self, value: Any, error: BaseException | None, expires_at: float | None) -> None:
+        self.value = value
+        self.error = error
+        # Raising the same exception again appends to its traceback, it is reset to the original one every time.
+        self.traceback = error.__traceback__ if error is not None else None
+        self.expires_at = expires_at
+
+
+class AsyncCache:
+    """
+    LRU cache of coroutine results with TTL and negative caching.
+
+    Concurrent calls with the same key share one call (single-flight), so an expired entry does not stampede.
+    """
+
+    def __init__(self, settings: CacheSettings = CacheSettings()) -> None:
+        self._settings = settings
+        self._entries = OrderedDict["Hashable", _Entry]()
+        self._inflight = dict["Hashable", "Future[Any]"]()
+        self._generation = 0
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def settings(self) -> CacheSettings:
+        return self._settings
+
+    @settings.setter
+    def settings(self, settings: CacheSettings) -> None:
+        self._settings = settings
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._settings.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _store(self, key: "Hashable", value: Any, error: BaseException | None) -> None:
+        settings = self._settings
+        if error is not None and settings.negative_ttl is None:
+            return
+
+        negative = error is not None or value is None
+        ttl = settings.negative_ttl if negative and settings.negative_ttl is not None else settings.ttl
+        self._entries[key] = _Entry(value, error, monotonic() + ttl if ttl is not None else None)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    async def get_or_call(self, key: "Hashable", call: "Callable[[], Awaitable[Any]]") -> Any:
+        if (entry := self._entries.get(key)) is not None:
+            if entry.expires_at is None or entry.expires_at > monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                if entry.error is not None:
+                    raise entry.error.with_traceback(entry.traceback)
+                return entry.value
+
+            del self._entries[key]
+            self.stats.expirations += 1
+
+        if (future := self._inflight.get(key)) is not None:
+            self.stats.coalesced += 1
+            try:
+                # Shielded, a cancelled waiter must not cancel the call the other callers are waiting for.
+                return await shield(future)
+            except CancelledError:
+                # The caller running the call was cancelled, not this one, which makes the call itself instead.
+                if not future.cancelled() or current_task().cancelling():  # type: ignore[union-attr]
+                    raise
+                return await self.get_or_call(key, call)
+
+        self.stats.misses += 1
+        future = self._inflight[key] = get_running_loop().create_future()
+        generation = self._generation
+
+        try:
+            value = await call()
+        except Exception as e:
+            if generation == self._generation and self._inflight.get(key) is future:
+                self._store(key, None, e)
+            future.set_exception(e)
+            # Nobody may be waiting for it, the caller gets the exception anyway.
+            future.exception()
+            raise
+        else:
+            # Results of calls started before a `clear`, or a `set` of their key, belong to the old data.
+            if generation == self._generation and self._inflight.get(key) is future:
+                self._store(key, value, None)
+            future.set_result(value)
+            return value
+        finally:
+            if not future.done():
+                future.cancel()
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def set(self, key: "Hashable", value: Any) -> None:
+        """Store `value` as if a call returned it, a call of `key` already running is not stored."""
+        self._inflight.pop(key, None)
+        self._store(key, value, None)
+
+    def invalidate(self, key: "Hashable") -> None:
+        """Drop `key`, a call of it already running is not stored either."""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+
+
+def make_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> "Hashable":
+    return (args, frozenset(kwargs.items())) if kwargs else args
+
+
+def cached(
+    func: Any = None,
+    /,
+    *,
+    maxsize: int = DEFAULT_CACHE_SIZE,
+    ttl: float | None = None,
+    negative_ttl: float | None = None,
+) -> Any:
+    """
+    Cache the results of an async `GeneralCog` method, per cog instance and per arguments.
+
+    The arguments are the defaults, the `cache_size`, `cache_ttl` and `cache_negative_ttl` keys of the cog config
+    section override them for every cache of the cog.
+    """
+
+    def decorator(func: "Callable[..., Awaitable[Any]]") -> "Callable[..., Awaitable[Any]]":
+        settings = CacheSettings(maxsize, ttl, negative_ttl)
+        name = func.__name__
+
+        @wraps(func)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            cache: AsyncCache = self.get_cache(name, settings)
+            with trace(f"cache {name}"):
+                return await cache.get_or_call(make_key(args, kwargs), lambda: func(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator if func is None else decorator(func)
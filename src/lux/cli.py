@@ -1,14 +1,22 @@
+from asyncio import all_tasks, current_task
+from collections import Counter
+from json import dumps
 from logging import DEBUG
 from pathlib import Path as PathType
 
-from click import Path, command, option
+from click import BadParameter, FloatRange, IntRange, Path, UsageError, command, echo, group, option
 
-from .bot import Lux
+from .bot import Lux, ShardedLux
+from .cluster import Cluster, ClusterSupervisor, split_shards
 from .config import DEFAULT_BOT_CONFIG_PATH, DEFAULT_COG_CONFIG_PATH, BotConfig, CogConfig
+from .config_cache import DEFAULT_CONFIG_CACHE_DIRECTORY, ConfigCache
+from .config_watcher import DEFAULT_CONFIG_WATCH_INTERVAL
 from .context_var import env as env_var
 from .context_var import is_production as is_production_var
 from .env import Env
-from .logger import default_logger
+from .hot_reload import DEFAULT_HOT_RELOAD_INTERVAL
+from .loadtest import DEFAULT_LOADTEST_USERS, LoadTest, LoadTestReport, LocalDiscord, load_payloads, synthesize_payloads
+from .logger import default_logger, use_json_formatter
 
 try:
     import dotenv  # type: ignore
@@ -55,6 +63,170 @@ disable_debug_extra_init = option(
     default=False,
     show_default=True,
 )
+config_cache = option(
+    "--config-cache",
+    "config_cache",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Cache validated config data on disk and reuse it while the config files are unchanged.",
+)
+config_cache_directory = option(
+    "--config-cache-dir",
+    "config_cache_directory",
+    type=Path(file_okay=False, resolve_path=True, path_type=PathType),
+    default=DEFAULT_CONFIG_CACHE_DIRECTORY,
+    show_default=True,
+)
+clear_config_cache = option(
+    "--clear-config-cache",
+    "clear_config_cache",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Remove cached config data before loading the config files.",
+)
+config_watch_interval = option(
+    "--config-watch-interval",
+    "config_watch_interval",
+    type=float,
+    default=DEFAULT_CONFIG_WATCH_INTERVAL,
+    show_default=True,
+    help="Seconds between checks of the cog config file for changes, 0 disables reloading.",
+)
+hot_reload_interval = option(
+    "--hot-reload-interval",
+    "hot_reload_interval",
+    type=float,
+    default=DEFAULT_HOT_RELOAD_INTERVAL,
+    show_default=True,
+    help="Seconds between checks of the extension modules for changes outside production, 0 disables reloading.",
+)
+force_command_sync = option(
+    "--force-command-sync",
+    "force_command_sync",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Fetch and sync application commands even if they are unchanged since the last sync.",
+)
+
+json_log = option(
+    "--json-log",
+    "json_log",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Write log records as JSON lines, with the fields of the interaction being handled.",
+)
+
+
+def parse_shard_ids(_, __, value: str | None) -> list[int] | None:
+    if value is None:
+        return None
+
+    result = list[int]()
+    for part in value.split(","):
+        start, separator, end = part.strip().partition("-")
+        try:
+            first, last = int(start), int(end if separator else start)
+        except ValueError:
+            raise BadParameter("Expected a comma separated list of shard ids or ranges, such as '0-3,8'.")
+        if first > last:
+            raise BadParameter(f"Range '{part.strip()}' is reversed, write it as '{last}-{first}'.")
+        result.extend(range(first, last + 1))
+
+    if duplicates := sorted(shard_id for shard_id, count in Counter(result).items() if count > 1):
+        raise BadParameter(f"Shard ids given more than once: {', '.join(map(str, duplicates))}.")
+    return result
+
+
+shards = option(
+    "--shards",
+    "shards",
+    type=IntRange(min=1),
+    default=None,
+    help="Total number of shards, run the bot sharded when set.",
+)
+shard_ids = option(
+    "--shard-ids",
+    "shard_ids",
+    callback=parse_shard_ids,
+    default=None,
+    help="Shards to run in this launcher, such as '0-3,8'. Defaults to all shards.",
+)
+processes = option(
+    "--processes",
+    "processes",
+    type=IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Split the shards across this many supervised processes.",
+)
+
+
+payloads_path = option(
+    "--payloads",
+    "payloads_path",
+    type=Path(exists=True, dir_okay=False, resolve_path=True, path_type=PathType),
+    default=None,
+    help="Replay recorded INTERACTION_CREATE payloads (JSON lines) instead of synthetic ones.",
+)
+loadtest_commands = option(
+    "-c",
+    "--command",
+    "loadtest_commands",
+    multiple=True,
+    help="Only send synthetic interactions of this command, can be repeated.",
+)
+interaction_count = option(
+    "-n",
+    "--count",
+    "interaction_count",
+    type=IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help="Number of interactions to send.",
+)
+interaction_rate = option(
+    "--rate",
+    "interaction_rate",
+    type=FloatRange(min=0),
+    default=0,
+    show_default=True,
+    help="Interactions sent per second, 0 sends them as fast as the concurrency allows.",
+)
+concurrency = option(
+    "--concurrency",
+    "concurrency",
+    type=IntRange(min=1),
+    default=50,
+    show_default=True,
+    help="Maximum number of interactions handled at once.",
+)
+loadtest_users = option(
+    "--users",
+    "loadtest_users",
+    type=IntRange(min=1),
+    default=DEFAULT_LOADTEST_USERS,
+    show_default=True,
+    help="Number of distinct users sending synthetic interactions.",
+)
+loadtest_output = option(
+    "-o",
+    "--output",
+    "loadtest_output",
+    type=Path(dir_okay=False, resolve_path=True, path_type=PathType),
+    default=None,
+    help="Save the report as JSON.",
+)
+min_throughput = option(
+    "--min-throughput",
+    "min_throughput",
+    type=FloatRange(min=0),
+    default=None,
+    help="Exit with status 1 when fewer interactions per second are handled.",
+)
 
 
 def process_is_production(is_production: bool):
@@ -66,24 +238,55 @@ def process_is_production(is_production: bool):
     return is_production
 
 
-def process_bot_config_path(bot_config_path: PathType) -> BotConfig:
+def process_config_cache(
+    config_cache: bool, config_cache_directory: PathType, clear_config_cache: bool
+) -> ConfigCache | None:
+    cache = ConfigCache(config_cache_directory)
+
+    if clear_config_cache:
+        default_logger.info(f"Cleared {cache.clear()} config cache entries in '{config_cache_directory}'.")
+
+    if not config_cache:
+        return None
+
+    default_logger.info(f"Using config cache directory '{config_cache_directory}'.")
+    return cache
+
+
+def process_bot_config_path(bot_config_path: PathType, cache: ConfigCache | None = None) -> BotConfig:
     if bot_config_path.exists():
         default_logger.info(f"Using bot config file '{bot_config_path}'.")
-        return BotConfig.load_from_path(bot_config_path)
+        return BotConfig.load_from_path(bot_config_path, cache)
 
     default_logger.warning(f"File '{bot_config_path}' does not exist. Use default bot config data.")
     return BotConfig.default()
 
 
-def process_cog_config_path(cog_config_path: PathType) -> CogConfig:
+def process_cog_config_path(cog_config_path: PathType, cache: ConfigCache | None = None) -> CogConfig:
     if cog_config_path.exists():
         default_logger.info(f"Using cog config file '{cog_config_path}'.")
-        return CogConfig.load_from_path(cog_config_path)
+        return CogConfig.load_from_path(cog_config_path, cache)
 
     default_logger.warning(f"File '{cog_config_path}' does not exist. Use default cog config data.")
     return CogConfig.default()
 
 
+def process_shards(shards: int | None, shard_ids: list[int] | None, processes: int) -> list[Cluster] | None:
+    if shards is None:
+        if shard_ids is not None or processes > 1:
+            raise UsageError("'--shard-ids' and '--processes' require '--shards'.")
+        return None
+
+    if shard_ids is None:
+        shard_ids = list(range(shards))
+    elif invalid := [shard_id for shard_id in shard_ids if not 0 <= shard_id < shards]:
+        raise UsageError(f"Shard ids {invalid} are out of range for {shards} shards.")
+
+    clusters = [Cluster(index, ids, shards) for index, ids in enumerate(split_shards(shard_ids, processes))]
+    default_logger.info(f"Running shards {shard_ids} of {shards} in {len(clusters)} processes.")
+    return clusters
+
+
 def process_env_path(env_path: PathType) -> None:
     if not env_path.exists():
         default_logger.warning(f"File '{env_path}' does not exist. Skip loading .env file.")
@@ -102,21 +305,141 @@ def process_env_path(env_path: PathType) -> None:
 @cog_config_path
 @env_path
 @disable_debug_extra_init
+@config_cache
+@config_cache_directory
+@clear_config_cache
+@config_watch_interval
+@hot_reload_interval
+@force_command_sync
+@shards
+@shard_ids
+@processes
+@json_log
 def default_entry(
     is_production: bool,
     bot_config_path: PathType,
     cog_config_path: PathType,
     env_path: PathType,
     disable_debug_extra_init: bool,
+    config_cache: bool,
+    config_cache_directory: PathType,
+    clear_config_cache: bool,
+    config_watch_interval: float,
+    hot_reload_interval: float,
+    force_command_sync: bool,
+    shards: int | None,
+    shard_ids: list[int] | None,
+    processes: int,
+    json_log: bool,
 ) -> None:
+    if json_log:
+        use_json_formatter()
+    production = process_is_production(is_production)
+    clusters = process_shards(shards, shard_ids, processes)
+    cache = process_config_cache(config_cache, config_cache_directory, clear_config_cache)
+    bot_config = process_bot_config_path(bot_config_path, cache)
+    cog_config = process_cog_config_path(cog_config_path, cache)
+    process_env_path(env_path)
+    options = {
+        "disable_debug_extra_init": disable_debug_extra_init,
+        "config_watch_interval": config_watch_interval or None,
+        "hot_reload_interval": hot_reload_interval or None,
+        "force_command_sync": force_command_sync,
+    }
+
+    if clusters is None:
+        Lux(production=production, bot_config=bot_config, cog_config=cog_config, **options).init().run()
+    elif len(clusters) == 1:
+        ShardedLux(
+            production=production,
+            bot_config=bot_config,
+            cog_config=cog_config,
+            shard_ids=clusters[0].shard_ids,
+            shard_count=clusters[0].shard_count,
+            **options,
+        ).init().run()
+    else:
+        ClusterSupervisor(
+            clusters, production=production, bot_config=bot_config, cog_config=cog_config, env=env_var.get(), **options
+        ).run()
+
+
+@command
+@is_production
+@bot_config_path
+@cog_config_path
+@env_path
+@payloads_path
+@loadtest_commands
+@interaction_count
+@interaction_rate
+@concurrency
+@loadtest_users
+@loadtest_output
+@min_throughput
+def loadtest_entry(
+    is_production: bool,
+    bot_config_path: PathType,
+    cog_config_path: PathType,
+    env_path: PathType,
+    payloads_path: PathType | None,
+    loadtest_commands: tuple[str, ...],
+    interaction_count: int,
+    interaction_rate: float,
+    concurrency: int,
+    loadtest_users: int,
+    loadtest_output: PathType | None,
+    min_throughput: float | None,
+) -> None:
+    """Load the extensions and send them interactions through a local stand-in for Discord."""
     production = process_is_production(is_production)
     bot_config = process_bot_config_path(bot_config_path)
     cog_config = process_cog_config_path(cog_config_path)
     process_env_path(env_path)
-
-    Lux(
+    bot = Lux(
         production=production,
         bot_config=bot_config,
         cog_config=cog_config,
-        disable_debug_extra_init=disable_debug_extra_init,
-    ).init().run()
+        disable_debug_extra_init=True,
+        config_watch_interval=None,
+        hot_reload_interval=None,
+        command_sync_cache=False,
+    )
+
+    async def run() -> LoadTestReport:
+        discord = LocalDiscord()
+        discord.install(bot)
+        bot.init()
+
+        if payloads_path is not None:
+            payloads = load_payloads(payloads_path)
+        else:
+            payloads = synthesize_payloads(bot, list(loadtest_commands))
+        default_logger.info(f"Sending {interaction_count} interactions from {len(payloads)} payloads.")
+
+        try:
+            return await LoadTest(bot, discord, users=loadtest_users).run(
+                payloads, count=interaction_count, rate=interaction_rate, concurrency=concurrency
+            )
+        finally:
+            await bot.close()
+            # Background tasks started by `init`, such as the loop monitor, end with the load test.
+            for task in all_tasks() - {current_task()}:
+                task.cancel()
+
+    report = bot.loop.run_until_complete(run())
+    echo(report.format())
+
+    if loadtest_output is not None:
+        loadtest_output.write_text(dumps(report.to_dict(), indent=2))
+    if min_throughput is not None and report.throughput < min_throughput:
+        raise SystemExit(1)
+
+
+@group
+def main() -> None:
+    """Run or load-test a lux bot."""
+
+
+main.add_command(default_entry, "run")
+main.add_command(loadtest_entry, "loadtest")
@@ -0,0 +1,155 @@
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing import get_context
+from signal import SIGINT, SIGTERM, signal
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .bot import ShardedLux
+from .context_var import env as env_var
+from .context_var import is_production as is_production_var
+from .logger import default_handler, default_logger, interaction_context_filter, rate_limit_filter
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+    from multiprocessing.queues import Queue
+
+    from .config import BotConfig, CogConfig
+    from .env import Env
+
+# A cluster that crashes sooner than this after starting is restarted with a growing delay.
+STABLE_CLUSTER_UPTIME = 60.0
+MAX_RESTART_DELAY = 60.0
+
+
+class Cluster(NamedTuple):
+    index: int
+    shard_ids: list[int]
+    shard_count: int
+
+
+def split_shards(shard_ids: list[int], processes: int) -> list[list[int]]:
+    """Split `shard_ids` in `processes` contiguous ranges, as even as possible."""
+    size, extra = divmod(len(shard_ids), processes)
+    result, start = list[list[int]](), 0
+
+    for index in range(processes):
+        end = start + size + (index < extra)
+        if shard_ids[start:end]:
+            result.append(shard_ids[start:end])
+        start = end
+    return result
+
+
+def run_cluster(
+    cluster: Cluster,
+    production: bool,
+    bot_config: "BotConfig",
+    cog_config: "CogConfig",
+    env: "Env",
+    log_queue: "Queue",
+    log_level: int,
+    options: dict[str, Any],
+) -> None:
+    # Every record goes through the supervisor, which writes them with the default handler.
+    default_logger.handlers.clear()
+    default_logger.addHandler(handler := QueueHandler(log_queue))
+    handler.addFilter(interaction_context_filter)
+    handler.addFilter(rate_limit_filter)
+    default_logger.setLevel(log_level)
+    is_production_var.set(production)
+    env_var.set(env)
+
+    logger = default_logger.getChild(f"cluster{cluster.index}")
+    logger.info(f"Starting cluster {cluster.index} with shards {cluster.shard_ids} of {cluster.shard_count}.")
+    ShardedLux(
+        production=production,
+        bot_config=bot_config,
+        cog_config=cog_config,
+        logger=logger,
+        shard_ids=cluster.shard_ids,
+        shard_count=cluster.shard_count,
+        **options,
+    ).init().run()
+
+
+class ClusterSupervisor:
+    """Run each cluster of shards in its own process, restart crashed ones and combine their logs."""
+
+    def __init__(
+        self,
+        clusters: list[Cluster],
+        *,
+        production: bool,
+        bot_config: "BotConfig",
+        cog_config: "CogConfig",
+        env: "Env",
+        **options: Any,
+    ) -> None:
+        self._clusters = clusters
+        self._arguments = (production, bot_config, cog_config, env)
+        self._options = options
+        self._context = get_context("spawn")
+        self._log_queue: "Queue" = self._context.Queue()
+        self._processes = dict[int, "BaseProcess"]()
+        self._started_at = dict[int, float]()
+        self._restart_delay = dict[int, float]()
+        self._restart_at = dict[int, float]()
+        self._stopping = False
+
+    def _start(self, cluster: Cluster) -> None:
+        process = self._context.Process(
+            target=run_cluster,
+            args=(cluster, *self._arguments, self._log_queue, default_logger.level, self._options),
+            name=f"lux-cluster{cluster.index}",
+        )
+        process.start()
+        self._processes[cluster.index] = process
+        self._started_at[cluster.index] = monotonic()
+
+    def _stop(self, *_: Any) -> None:
+        self._stopping = True
+
+    def _restart_crashed(self) -> None:
+        now = monotonic()
+
+        for cluster in self._clusters:
+            if self._processes[cluster.index].is_alive():
+                continue
+
+            if (restart_at := self._restart_at.get(cluster.index)) is not None:
+                if now >= restart_at:
+                    del self._restart_at[cluster.index]
+                    self._start(cluster)
+                continue
+
+            if now - self._started_at[cluster.index] >= STABLE_CLUSTER_UPTIME:
+                self._restart_delay[cluster.index] = 1.0
+            delay = self._restart_delay.get(cluster.index, 1.0)
+            self._restart_delay[cluster.index] = min(delay * 2, MAX_RESTART_DELAY)
+            self._restart_at[cluster.index] = now + delay
+
+            exitcode = self._processes[cluster.index].exitcode
+            default_logger.error(f"Cluster {cluster.index} exited with code {exitcode}. Restarting in {delay:.0f}s.")
+
+    def run(self) -> None:
+        listener = QueueListener(self._log_queue, default_handler, respect_handler_level=True)
+        listener.start()
+        signal(SIGINT, self._stop)
+        signal(SIGTERM, self._stop)
+
+        try:
+            for cluster in self._clusters:
+                self._start(cluster)
+            default_logger.info(f"Started {len(self._clusters)} clusters.")
+
+            while not self._stopping:
+                sleep(1)
+                if not self._stopping:
+                    self._restart_crashed()
+        finally:
+            default_logger.info("Stopping clusters.")
+            for process in self._processes.values():
+                process.terminate()
+            for process in self._processes.values():
+                process.join()
+            listener.stop()
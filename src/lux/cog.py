@@ -1,10 +1,26 @@
-from functools import cached_property
+from dataclasses import replace
+from functools import cached_property, partial
 from inspect import signature
-from typing import get_type_hints
+from sys import modules
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, get_type_hints
 
 from disnake.ext.commands import Cog
 
-from .context_var import bot
+from .cache import CACHE_NEGATIVE_TTL_KEY, CACHE_SIZE_KEY, CACHE_TTL_KEY, AsyncCache, CacheSettings
+from .context_var import bot, interaction
+from .executor import DEFAULT_DEFER_AFTER, run_offloaded
+from .rate_limiter import RATE_LIMITS_KEY, RateLimit, RateLimiter, make_rate_limiter
+from .scheduler import MissedRunPolicy
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from typing import Any, Awaitable, Callable, TypeVar
+
+    from .persistence import DocumentStore
+    from .scheduler import Job
+
+    _R = TypeVar("_R")
 
 
 class GeneralCog(Cog):
@@ -13,14 +29,26 @@ class GeneralCog(Cog):
         self._bot = bot.get()
         self._config_data = self._bot.cog_config.get_data(self.__class__.__name__)
         self.logger = self._bot.logger.getChild(self.__class__.__name__)
+        self._caches = dict[str, AsyncCache]()
+        self._cache_defaults = dict[str, CacheSettings]()
+        self._rate_limiters = dict[str, RateLimiter]()
+        self._rate_limit_defaults = dict[str, RateLimit]()
 
-    @cached_property
-    def config(self):
-        if not (config_type := get_type_hints(self).get("config")):
-            return self._config_data
+    @classmethod
+    def _config_type(cls) -> type | None:
+        # Only the `config` annotation is resolved, `Cog` has annotations that can not be evaluated at runtime.
+        for klass in cls.__mro__:
+            if "config" in (annotations := vars(klass).get("__annotations__", {})):
+                holder = SimpleNamespace(__annotations__={"config": annotations["config"]})
+                return get_type_hints(holder, vars(modules[klass.__module__]))["config"]
+        return None
+
+    def _resolve_config(self, config_data: "dict[str, Any]") -> "Any":
+        if not (config_type := self._config_type()):
+            return config_data
 
-        config_data = self._config_data.copy()
-        missing = signature(config_type).parameters.keys() - self._config_data.keys()
+        config_data = config_data.copy()
+        missing = signature(config_type).parameters.keys() - config_data.keys()
         config_data |= {name: value for name in missing if (value := self._bot.cog_config.find(name)) is not None}
 
         try:
@@ -29,6 +57,169 @@ class GeneralCog(Cog):
             self.logger.exception(f"Failed while converting config data to '{config_type}'.", exc_info=e)
             raise e
 
+    @cached_property
+    def config(self):
+        return self._resolve_config(self._config_data)
+
+    def _resolve_guild_config(self, overrides: "dict[str, Any]") -> "Any":
+        return self._resolve_config(self._config_data | overrides) if overrides else self.config
+
+    async def guild_config(self, guild_id: int | None = None) -> "Any":
+        """
+        `config` with the overrides of `guild_id`, by default the guild of the current interaction. Outside a guild it
+        is `config` itself.
+        """
+        if guild_id is None and (inter := interaction.get(None)) is not None:
+            guild_id = inter.guild_id
+        if guild_id is None:
+            return self.config
+
+        config = self.config
+        return await self._bot.guild_configs.view(guild_id, self.__class__.__name__, config, self._resolve_guild_config)
+
+    @property
+    def config_keys(self) -> set[str]:
+        """Keys this cog may inherit from the GLOBAL sections of the cog config."""
+        if not (config_type := self._config_type()):
+            return set()
+        return set(signature(config_type).parameters.keys())
+
+    def reload_config(self) -> bool:
+        """Rebuild `config` from the current cog config, keeping the previous one if the new data is invalid."""
+        previous_data = self._config_data
+        previous_config = self.__dict__.pop("config", None)
+
+        try:
+            self._config_data = self._bot.cog_config.get_data(self.__class__.__name__)
+            self.config
+            cache_settings = {name: self._cache_settings(defaults) for name, defaults in self._cache_defaults.items()}
+            rate_limits = {name: self._rate_limit(name, limit) for name, limit in self._rate_limit_defaults.items()}
+        except Exception:
+            self.logger.warning("Keep using the previous config.")
+            self._config_data = previous_data
+            if previous_config is not None:
+                self.__dict__["config"] = previous_config
+            return False
+
+        for name, settings in cache_settings.items():
+            self._caches[name].settings = settings
+        for name, rate_limit in rate_limits.items():
+            # A changed limit starts over, the state of the old one does not translate to it.
+            if rate_limit != self._rate_limiters[name].settings:
+                self._rate_limiters[name] = make_rate_limiter(rate_limit)
+        return True
+
+    async def cog_config_update(self) -> None:
+        """Called after `config` has been rebuilt because the cog config file changed."""
+        return None
+
+    def _config_value(self, key: str) -> "Any":
+        config = self.config
+        return config.get(key) if isinstance(config, dict) else getattr(config, key, None)
+
+    def _cache_settings(self, defaults: CacheSettings) -> CacheSettings:
+        fields = ((CACHE_SIZE_KEY, "maxsize"), (CACHE_TTL_KEY, "ttl"), (CACHE_NEGATIVE_TTL_KEY, "negative_ttl"))
+        overrides = {field: value for key, field in fields if (value := self._config_value(key)) is not None}
+
+        try:
+            return replace(defaults, **overrides)
+        except Exception as e:
+            self.logger.exception(f"Failed while validating cache settings {overrides}.", exc_info=e)
+            raise e
+
+    @property
+    def caches(self) -> dict[str, AsyncCache]:
+        return self._caches
+
+    def get_cache(self, name: str, defaults: CacheSettings = CacheSettings()) -> AsyncCache:
+        """The cache `name` of this cog, created with `defaults` overridden by the cog config on first use."""
+        if (cache := self._caches.get(name)) is None:
+            cache = self._caches[name] = AsyncCache(self._cache_settings(defaults))
+            self._cache_defaults[name] = defaults
+        return cache
+
+    def clear_caches(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+    def get_documents(self, collection: str, defaults: CacheSettings = CacheSettings()) -> "DocumentStore":
+        """
+        The documents of `collection`, read through a cache created with `defaults` overridden by the cog config.
+
+        Stores belong to `Lux.persistence`, writes still queued survive reloading the cog.
+        """
+        if (persistence := self._bot.persistence) is None:
+            message = "No persistence backend, set 'persistence_backend' in the bot config."
+            self.logger.error(message)
+            raise RuntimeError(message)
+        return persistence.documents(collection, self._cache_settings(defaults))
+
+    def _rate_limit(self, name: str, defaults: RateLimit) -> RateLimit:
+        overrides = (self._config_value(RATE_LIMITS_KEY) or {}).get(name, {})
+
+        try:
+            return replace(defaults, **overrides)
+        except Exception as e:
+            self.logger.exception(f"Failed while validating rate limit '{name}' {overrides}.", exc_info=e)
+            raise e
+
+    @property
+    def rate_limiters(self) -> dict[str, RateLimiter]:
+        return self._rate_limiters
+
+    def get_rate_limiter(self, name: str, defaults: RateLimit) -> RateLimiter:
+        """The rate limiter `name` of this cog, created with `defaults` overridden by the cog config on first use."""
+        if (limiter := self._rate_limiters.get(name)) is None:
+            limiter = self._rate_limiters[name] = make_rate_limiter(self._rate_limit(name, defaults))
+            self._rate_limit_defaults[name] = defaults
+        return limiter
+
+    def schedule(
+        self,
+        name: str,
+        callback: "Callable[[], Awaitable[Any]]",
+        *,
+        every: float | None = None,
+        cron: str | None = None,
+        at: "datetime | float | None" = None,
+        jitter: float = 0.0,
+        max_concurrency: int = 1,
+        missed: MissedRunPolicy = MissedRunPolicy.COALESCE,
+    ) -> "Job":
+        """
+        Run `callback` on a schedule until the cog is removed, see `scheduled`. The job is named `<cog>.<name>`,
+        scheduling the same name again replaces it.
+        """
+        return self._bot.scheduler.schedule(
+            f"{self.qualified_name}.{name}",
+            callback,
+            every=every,
+            cron=cron,
+            at=at,
+            jitter=jitter,
+            max_concurrency=max_concurrency,
+            missed=missed,
+            owner=self.qualified_name,
+        )
+
+    def schedule_decorated_jobs(self) -> None:
+        """Schedule the methods decorated with `scheduled`, `Lux` does it when the cog is added."""
+        for name in dir(type(self)):
+            if (options := getattr(getattr(type(self), name, None), "__lux_schedule__", None)) is not None:
+                self.schedule(name, getattr(self, name), **options)
+
+    async def run_in_executor(
+        self,
+        func: "Callable[..., _R]",
+        *args: "Any",
+        process: bool = False,
+        defer_after: float | None = DEFAULT_DEFER_AFTER,
+        **kwargs: "Any",
+    ) -> "_R":
+        """Run a blocking `func` off the event loop, see `run_offloaded`."""
+        key = f"{func.__module__}.{func.__qualname__}"
+        return await run_offloaded(key, partial(func, *args, **kwargs), process=process, defer_after=defer_after)
+
     @property
     def bot(self):
         return self._bot
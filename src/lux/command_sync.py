@@ -0,0 +1,95 @@
+from hashlib import sha256
+from json import JSONDecodeError, dumps, loads
+from os import replace
+from typing import TYPE_CHECKING
+
+from disnake.app_commands import application_command_factory
+
+from .config_cache import DEFAULT_CONFIG_CACHE_DIRECTORY
+from .logger import default_logger
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any, Iterable
+
+    from disnake.app_commands import APIApplicationCommand, ApplicationCommand
+
+DEFAULT_COMMAND_SYNC_CACHE_PATH = DEFAULT_CONFIG_CACHE_DIRECTORY / "command_sync.json"
+GLOBAL_SCOPE = "global"
+
+
+def fingerprint(commands: "Iterable[ApplicationCommand]") -> str:
+    payloads = sorted((command.to_dict() for command in commands), key=lambda data: (data["type"], data["name"]))
+    return sha256(dumps(payloads, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def in_sync(commands: "list[ApplicationCommand]", synced: "list[APIApplicationCommand]") -> bool:
+    return len(commands) == len(synced) and all(any(command == other for other in synced) for command in commands)
+
+
+def _scope(guild_id: int | None) -> str:
+    return GLOBAL_SCOPE if guild_id is None else str(guild_id)
+
+
+def _dump(command: "APIApplicationCommand") -> dict[str, "Any"]:
+    return command.to_dict() | {
+        "id": command.id,
+        "application_id": command.application_id,
+        "guild_id": command.guild_id,
+        "version": command.version,
+    }
+
+
+class CommandSyncCache:
+    """
+    Fingerprints of the application command tree last synced to each scope (global, or a guild), with the commands
+    Discord returned for it, so an unchanged scope needs neither a fetch nor an overwrite on the next start.
+    """
+
+    def __init__(self, path: "Path" = DEFAULT_COMMAND_SYNC_CACHE_PATH) -> None:
+        self._path = path
+        self._entries = dict[str, dict[str, dict[str, "Any"]]]()
+
+        try:
+            self._entries = loads(path.read_text())
+        except FileNotFoundError:
+            pass
+        except (OSError, JSONDecodeError) as e:
+            default_logger.warning(f"Ignoring unreadable command sync cache '{path}': {e}")
+
+    @property
+    def path(self) -> "Path":
+        return self._path
+
+    def get(self, application_id: int, guild_id: int | None, fingerprint: str) -> "list[APIApplicationCommand] | None":
+        entry = self._entries.get(str(application_id), {}).get(_scope(guild_id))
+
+        if not entry or entry["fingerprint"] != fingerprint:
+            return None
+
+        try:
+            return [application_command_factory(command) for command in entry["commands"]]
+        except (KeyError, TypeError, ValueError) as e:
+            default_logger.warning(f"Ignoring invalid command sync cache entry '{_scope(guild_id)}': {e}")
+            return None
+
+    def set(
+        self, application_id: int, guild_id: int | None, fingerprint: str, commands: "list[APIApplicationCommand]"
+    ) -> None:
+        self._entries.setdefault(str(application_id), {})[_scope(guild_id)] = {
+            "fingerprint": fingerprint,
+            "commands": [_dump(command) for command in commands],
+        }
+
+    def discard(self, application_id: int, guild_id: int | None) -> None:
+        self._entries.get(str(application_id), {}).pop(_scope(guild_id), None)
+
+    def save(self) -> None:
+        temporary_path = self._path.with_suffix(".tmp")
+
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_text(dumps(self._entries))
+            replace(temporary_path, self._path)
+        except OSError as e:
+            default_logger.warning(f"Failed while writing command sync cache '{self._path}': {e}")
@@ -1,28 +1,51 @@
 from enum import StrEnum
 from functools import cached_property
+from hashlib import sha256
 from pathlib import Path
-from tomllib import TOMLDecodeError, load
-from typing import Any, Self, TypeVar, overload
+from types import MappingProxyType
+from tomllib import TOMLDecodeError, loads
+from typing import TYPE_CHECKING, Any, Self, TypeVar, overload
 
-from disnake import Intents
-from pydantic import Field, TypeAdapter, ValidationError
+from pydantic import ConfigDict, Field, TypeAdapter, ValidationError
 from pydantic.dataclasses import dataclass
 
 from .context_var import is_production
 from .logger import default_logger
 
+if TYPE_CHECKING:
+    from typing import Callable
+
+    from disnake import Intents, MemberCacheFlags
+
+    from .config_cache import ConfigCache
+
 # For type hint
 _DEFAULT_TYPE = TypeVar("_DEFAULT_TYPE")
 
 DEFAULT_BOT_CONFIG_PATH = Path("bot_config.toml")
 DEFAULT_COG_CONFIG_PATH = Path("cog_config.toml")
 DEFAULT_EXTENSION_DIRECTORY = "extension"
+DEFAULT_EXTENSION_IMPORT_WORKERS = 1
+DEFAULT_LOOP_BLOCK_THRESHOLD = 0.25
+DEFAULT_MAX_MESSAGES = 1000
+DEFAULT_TRACE_BUFFER_SIZE = 100
+DEFAULT_GATEWAY_SESSION_SAVE_INTERVAL = 5.0
+PERSISTENCE_BACKENDS = ("memory", "sqlite", "mongodb")
+DEFAULT_PERSISTENCE_DATABASE = "lux"
+DEFAULT_PERSISTENCE_POOL_SIZE = 10
+DEFAULT_PERSISTENCE_FLUSH_INTERVAL = 1.0
+DEFAULT_PERSISTENCE_BATCH_SIZE = 100
+DEFAULT_GUILD_CONFIG_CACHE_SIZE = 10000
+# Intent every member cache flag depends on.
+MEMBER_CACHE_FLAG_INTENTS = {"voice": "voice_states", "joined": "members"}
 
 
 class RootConfigKey(StrEnum):
     GLOBAL = "GLOBAL"
     DEVELOPMENT = "DEVELOPMENT"
     PRODUCTION = "PRODUCTION"
+    # Section of a mode holding the overrides of each cog by guild ID, `[DEVELOPMENT.GUILDS.Weather.1234]`.
+    GUILDS = "GUILDS"
 
 
 class BotConfigKey(StrEnum):
@@ -30,38 +53,141 @@ class BotConfigKey(StrEnum):
     TEST_GUILDS = "test_guilds"
     INTENT_TYPE = "intent_type"
     INTENT_FLAG = "intent_flag"
+    EXTENSION_IMPORT_WORKERS = "extension_import_workers"
+    LAZY_EXTENSIONS = "lazy_extensions"
+    COMMAND_SYNC_CACHE = "command_sync_cache"
+    METRICS_PORT = "metrics_port"
+    LOG_LIMITS = "log_limits"
+    THREAD_POOL_SIZE = "thread_pool_size"
+    PROCESS_POOL_SIZE = "process_pool_size"
+    LOOP_MONITOR = "loop_monitor"
+    LOOP_BLOCK_THRESHOLD = "loop_block_threshold"
+    MEMBER_CACHE_TYPE = "member_cache_type"
+    MEMBER_CACHE_FLAG = "member_cache_flag"
+    MAX_MESSAGES = "max_messages"
+    CHUNK_GUILDS_AT_STARTUP = "chunk_guilds_at_startup"
+    CHUNK_GUILD_MEMBER_LIMIT = "chunk_guild_member_limit"
+    TRACE_SAMPLE_RATE = "trace_sample_rate"
+    TRACE_FILE = "trace_file"
+    TRACE_BUFFER_SIZE = "trace_buffer_size"
+    RESUME_GATEWAY_SESSIONS = "resume_gateway_sessions"
+    GATEWAY_SESSION_SAVE_INTERVAL = "gateway_session_save_interval"
+    PERSISTENCE_BACKEND = "persistence_backend"
+    PERSISTENCE_URL = "persistence_url"
+    PERSISTENCE_DATABASE = "persistence_database"
+    PERSISTENCE_POOL_SIZE = "persistence_pool_size"
+    PERSISTENCE_FLUSH_INTERVAL = "persistence_flush_interval"
+    PERSISTENCE_BATCH_SIZE = "persistence_batch_size"
+    GUILD_CONFIG_CACHE_SIZE = "guild_config_cache_size"
+    GUILD_CONFIG_CACHE_TTL = "guild_config_cache_ttl"
 
 
 DEFAULT_RAW_ROOT_DATA = {RootConfigKey.GLOBAL: {}, RootConfigKey.PRODUCTION: {}, RootConfigKey.DEVELOPMENT: {}}
 RootConfigDataType = dict[RootConfigKey, dict[str, Any]]
-RootConfigDataValidator = TypeAdapter(RootConfigDataType)
-ListOfIntValidator = TypeAdapter(list[int])
-DictOfStrAnyValidator = TypeAdapter(dict[str, Any])
-DictOfStrBoolValidator = TypeAdapter(dict[str, bool])
 
 
-@dataclass(frozen=True)
+class LazyTypeAdapter:
+    """`TypeAdapter` built on first use, building every adapter up front is a large part of importing this module."""
+
+    __slots__ = ("_type", "_adapter")
+
+    def __init__(self, type_: Any) -> None:
+        self._type = type_
+        self._adapter: TypeAdapter | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        if (adapter := self._adapter) is None:
+            adapter = self._adapter = TypeAdapter(self._type)
+        return getattr(adapter, name)
+
+
+RootConfigDataValidator = LazyTypeAdapter(RootConfigDataType)
+IntValidator = LazyTypeAdapter(int)
+FloatValidator = LazyTypeAdapter(float)
+BoolValidator = LazyTypeAdapter(bool)
+ListOfIntValidator = LazyTypeAdapter(list[int])
+DictOfStrAnyValidator = LazyTypeAdapter(dict[str, Any])
+DictOfStrBoolValidator = LazyTypeAdapter(dict[str, bool])
+DictOfIntDictValidator = LazyTypeAdapter(dict[int, dict[str, Any]])
+
+
+def read_config_file(path: Path) -> bytes:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError as e:
+        default_logger.exception(f"File '{path.resolve()}' does not exists.", exc_info=e)
+        raise e
+
+
+def _validate(
+    key: str, validator: LazyTypeAdapter, data: Any, check: "Callable[[Any], str | None] | None" = None
+) -> Any:
+    """Validate the bot config `data` of `key`, `check` returns what a valid value still breaks, if anything."""
+    try:
+        value = validator.validate_python(data)
+        if check is not None and (problem := check(value)) is not None:
+            raise ValueError(f"'{key}' {problem}.")
+    except (ValidationError, ValueError) as e:
+        default_logger.exception(f"Failed while validation bot config data '{key}'.", exc_info=e)
+        raise e
+    return value
+
+
+def _at_least(minimum: int) -> "Callable[[int], str | None]":
+    return lambda value: f"must be at least {minimum}, got {value}" if value < minimum else None
+
+
+def _positive(value: float) -> str | None:
+    return f"must be positive, got {value}" if value <= 0 else None
+
+
+def _share(value: float) -> str | None:
+    return f"must be between 0 and 1, got {value}" if not 0.0 <= value <= 1.0 else None
+
+
+@dataclass(frozen=True, config=ConfigDict(defer_build=True))
+class LogLimit:
+    rate: float
+    burst: float | None = None
+    sample: float = Field(default=1.0, ge=0.0, le=1.0)
+
+
+DictOfStrLogLimitValidator = LazyTypeAdapter(dict[str, LogLimit])
+
+
+@dataclass(frozen=True, config=ConfigDict(defer_build=True))
 class RootConfigData:
     all: RootConfigDataType = Field(default_factory=lambda: DEFAULT_RAW_ROOT_DATA)
 
     @classmethod
-    def load_from_path(cls, path: Path) -> Self:
+    def load_from_path(cls, path: Path, cache: "ConfigCache | None" = None) -> Self:
+        return cls.load_from_content(path, read_config_file(path), cache)
+
+    @classmethod
+    def load_from_content(cls, path: Path, content: bytes, cache: "ConfigCache | None" = None) -> Self:
+        if cache is not None and isinstance(cached := cache.load(path, content), cls):
+            return cached
+
         try:
-            with path.open("rb") as file:
-                data = load(file)
-        except FileNotFoundError as e:
-            default_logger.exception(f"File '{path.resolve()}' does not exists.", exc_info=e)
-            raise e
+            data = loads(content.decode())
         except TOMLDecodeError as e:
             default_logger.exception(f"Failed while load config data from path '{path.resolve()}'", exc_info=e)
             raise e
 
         try:
-            return cls(RootConfigDataValidator.validate_python(data))
+            result = cls(RootConfigDataValidator.validate_python(data))
         except ValidationError as e:
             default_logger.exception("Failed while validation root config data structure", exc_info=e)
             raise e
 
+        if cache is not None:
+            cache.store(path, content, result)
+        return result
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Only the validated data is pickled, the compiled tables are rebuilt on demand.
+        return {"all": self.all}
+
     @property
     def root_global(self) -> dict[str, Any]:
         return self.all.get(RootConfigKey.GLOBAL, {})
@@ -78,6 +204,16 @@ class RootConfigData:
     def mode(self) -> dict[str, Any]:
         return self.production if is_production.get() else self.development
 
+    @cached_property
+    def modes(self) -> dict[bool, "MappingProxyType[str, Any]"]:
+        """Mode layer keyed by `is_production`."""
+        return {True: MappingProxyType(self.production), False: MappingProxyType(self.development)}
+
+    @cached_property
+    def compiled(self) -> dict[bool, "MappingProxyType[str, Any]"]:
+        """GLOBAL and mode layers flattened once per mode, keyed by `is_production`."""
+        return {production: MappingProxyType(self.root_global | mode) for production, mode in self.modes.items()}
+
     @overload
     def find(self, key: str) -> Any | None:
         ...
@@ -87,7 +223,7 @@ class RootConfigData:
         ...
 
     def find(self, key: str, default: Any = None) -> Any:
-        return self.mode.get(key, self.root_global.get(key, default))
+        return self.compiled[is_production.get()].get(key, default)
 
     @overload
     def find_all(self, key: str) -> tuple[Any | None, Any | None]:
@@ -98,7 +234,7 @@ class RootConfigData:
         ...
 
     def find_all(self, key: str, default: Any = None) -> tuple[Any, Any]:
-        return self.mode.get(key, default), self.root_global.get(key, default)
+        return self.modes[is_production.get()].get(key, default), self.root_global.get(key, default)
 
 
 class BotConfig:
@@ -117,29 +253,148 @@ class BotConfig:
         return cls(RootConfigData(RootConfigDataValidator.validate_python(data)))
 
     @classmethod
-    def load_from_path(cls, path: Path) -> Self:
-        return cls(RootConfigData.load_from_path(path))
+    def load_from_path(cls, path: Path, cache: "ConfigCache | None" = None) -> Self:
+        return cls(RootConfigData.load_from_path(path, cache))
 
     @property
     def extension_directory(self) -> str:
         return str(self._data.find(BotConfigKey.EXTENSION_DIRECTORY, DEFAULT_EXTENSION_DIRECTORY))
 
+    @cached_property
+    def extension_import_workers(self) -> int:
+        workers = self._data.find(BotConfigKey.EXTENSION_IMPORT_WORKERS, DEFAULT_EXTENSION_IMPORT_WORKERS)
+        return _validate(BotConfigKey.EXTENSION_IMPORT_WORKERS, IntValidator, workers, _at_least(1))
+
+    @cached_property
+    def lazy_extensions(self) -> bool:
+        enabled = self._data.find(BotConfigKey.LAZY_EXTENSIONS, False)
+        return _validate(BotConfigKey.LAZY_EXTENSIONS, BoolValidator, enabled)
+
+    @cached_property
+    def command_sync_cache(self) -> bool:
+        enabled = self._data.find(BotConfigKey.COMMAND_SYNC_CACHE, False)
+        return _validate(BotConfigKey.COMMAND_SYNC_CACHE, BoolValidator, enabled)
+
+    @cached_property
+    def metrics_port(self) -> int | None:
+        if (port := self._data.find(BotConfigKey.METRICS_PORT)) is None:
+            return None
+        return _validate(BotConfigKey.METRICS_PORT, IntValidator, port)
+
+    @cached_property
+    def log_limits(self) -> dict[str, LogLimit]:
+        limits = self._data.find(BotConfigKey.LOG_LIMITS, {})
+        return _validate(BotConfigKey.LOG_LIMITS, DictOfStrLogLimitValidator, limits)
+
+    @cached_property
+    def thread_pool_size(self) -> int | None:
+        if (size := self._data.find(BotConfigKey.THREAD_POOL_SIZE)) is None:
+            return None
+        return _validate(BotConfigKey.THREAD_POOL_SIZE, IntValidator, size, _at_least(1))
+
+    @cached_property
+    def process_pool_size(self) -> int | None:
+        if (size := self._data.find(BotConfigKey.PROCESS_POOL_SIZE)) is None:
+            return None
+        return _validate(BotConfigKey.PROCESS_POOL_SIZE, IntValidator, size, _at_least(1))
+
+    @cached_property
+    def loop_monitor(self) -> bool | None:
+        """Whether to monitor the event loop, `None` leaves it to `Lux`, which monitors it outside production."""
+        if (enabled := self._data.find(BotConfigKey.LOOP_MONITOR)) is None:
+            return None
+        return _validate(BotConfigKey.LOOP_MONITOR, BoolValidator, enabled)
+
+    @cached_property
+    def loop_block_threshold(self) -> float:
+        threshold = self._data.find(BotConfigKey.LOOP_BLOCK_THRESHOLD, DEFAULT_LOOP_BLOCK_THRESHOLD)
+        return _validate(BotConfigKey.LOOP_BLOCK_THRESHOLD, FloatValidator, threshold, _positive)
+
+    @cached_property
+    def trace_sample_rate(self) -> float | None:
+        """Share of interactions traced, `None` leaves it to `Lux`, which traces every one outside production only."""
+        if (rate := self._data.find(BotConfigKey.TRACE_SAMPLE_RATE)) is None:
+            return None
+        return _validate(BotConfigKey.TRACE_SAMPLE_RATE, FloatValidator, rate, _share)
+
+    @property
+    def trace_file(self) -> Path | None:
+        return Path(path) if (path := self._data.find(BotConfigKey.TRACE_FILE)) is not None else None
+
+    @cached_property
+    def trace_buffer_size(self) -> int:
+        size = self._data.find(BotConfigKey.TRACE_BUFFER_SIZE, DEFAULT_TRACE_BUFFER_SIZE)
+        return _validate(BotConfigKey.TRACE_BUFFER_SIZE, IntValidator, size, _at_least(1))
+
+    @cached_property
+    def resume_gateway_sessions(self) -> bool:
+        enabled = self._data.find(BotConfigKey.RESUME_GATEWAY_SESSIONS, False)
+        return _validate(BotConfigKey.RESUME_GATEWAY_SESSIONS, BoolValidator, enabled)
+
+    @cached_property
+    def gateway_session_save_interval(self) -> float:
+        interval = self._data.find(BotConfigKey.GATEWAY_SESSION_SAVE_INTERVAL, DEFAULT_GATEWAY_SESSION_SAVE_INTERVAL)
+        return _validate(BotConfigKey.GATEWAY_SESSION_SAVE_INTERVAL, FloatValidator, interval, _positive)
+
+    @cached_property
+    def persistence_backend(self) -> str | None:
+        """Backend of `Lux.persistence`, one of `PERSISTENCE_BACKENDS`, `None` disables persistence."""
+        if (backend := self._data.find(BotConfigKey.PERSISTENCE_BACKEND)) is None:
+            return None
+
+        if (backend := str(backend)) not in PERSISTENCE_BACKENDS:
+            message = f"Invalid persistence backend '{backend}'."
+            default_logger.error(message)
+            raise ValueError(message)
+        return backend
+
+    @property
+    def persistence_url(self) -> str | None:
+        """Database file of the `sqlite` backend, connection string of the `mongodb` backend."""
+        return str(url) if (url := self._data.find(BotConfigKey.PERSISTENCE_URL)) is not None else None
+
+    @property
+    def persistence_database(self) -> str:
+        return str(self._data.find(BotConfigKey.PERSISTENCE_DATABASE, DEFAULT_PERSISTENCE_DATABASE))
+
+    @cached_property
+    def persistence_pool_size(self) -> int:
+        size = self._data.find(BotConfigKey.PERSISTENCE_POOL_SIZE, DEFAULT_PERSISTENCE_POOL_SIZE)
+        return _validate(BotConfigKey.PERSISTENCE_POOL_SIZE, IntValidator, size, _at_least(1))
+
+    @cached_property
+    def persistence_flush_interval(self) -> float:
+        interval = self._data.find(BotConfigKey.PERSISTENCE_FLUSH_INTERVAL, DEFAULT_PERSISTENCE_FLUSH_INTERVAL)
+        return _validate(BotConfigKey.PERSISTENCE_FLUSH_INTERVAL, FloatValidator, interval, _positive)
+
+    @cached_property
+    def persistence_batch_size(self) -> int:
+        size = self._data.find(BotConfigKey.PERSISTENCE_BATCH_SIZE, DEFAULT_PERSISTENCE_BATCH_SIZE)
+        return _validate(BotConfigKey.PERSISTENCE_BATCH_SIZE, IntValidator, size, _at_least(1))
+
+    @cached_property
+    def guild_config_cache_size(self) -> int:
+        size = self._data.find(BotConfigKey.GUILD_CONFIG_CACHE_SIZE, DEFAULT_GUILD_CONFIG_CACHE_SIZE)
+        return _validate(BotConfigKey.GUILD_CONFIG_CACHE_SIZE, IntValidator, size, _at_least(1))
+
+    @cached_property
+    def guild_config_cache_ttl(self) -> float | None:
+        """Seconds the overrides of a guild are kept, `None` keeps them until invalidated or evicted."""
+        if (ttl := self._data.find(BotConfigKey.GUILD_CONFIG_CACHE_TTL)) is None:
+            return None
+        return _validate(BotConfigKey.GUILD_CONFIG_CACHE_TTL, FloatValidator, ttl, _positive)
+
     @cached_property
     def test_guilds(self) -> list[int]:
         result = []
         for _ in self._data.find_all(BotConfigKey.TEST_GUILDS, []):
             result.extend(_)
-
-        try:
-            return ListOfIntValidator.validate_python(result)
-        except ValidationError as e:
-            default_logger.exception(
-                f"Failed while validation bot config data '{BotConfigKey.TEST_GUILDS}'.", exc_info=e
-            )
-            raise e
+        return _validate(BotConfigKey.TEST_GUILDS, ListOfIntValidator, result)
 
     @cached_property
-    def intents(self) -> Intents:
+    def intents(self) -> "Intents":
+        from disnake import Intents
+
         intent_type = str(self._data.find(BotConfigKey.INTENT_TYPE, Intents.default.__name__))
 
         if intent_type not in [Intents.default.__name__, Intents.all.__name__, Intents.none.__name__]:
@@ -160,39 +415,163 @@ class BotConfig:
 
         return intent | intent_modify
 
+    @cached_property
+    def member_cache_flags(self) -> "MemberCacheFlags":
+        from disnake import MemberCacheFlags
+
+        from_intents = MemberCacheFlags.from_intents.__name__
+        cache_type = str(self._data.find(BotConfigKey.MEMBER_CACHE_TYPE, from_intents))
+
+        if cache_type not in [from_intents, MemberCacheFlags.all.__name__, MemberCacheFlags.none.__name__]:
+            message = f"Invalid member cache type '{cache_type}'."
+            default_logger.error(message)
+            raise ValueError(message)
+
+        intents = self.intents
+        flags = (
+            MemberCacheFlags.from_intents(intents)
+            if cache_type == from_intents
+            else getattr(MemberCacheFlags, cache_type)()
+        )
+
+        def apply(values: dict[str, bool]) -> str | None:
+            for name, value in values.items():
+                if name not in MemberCacheFlags.VALID_FLAGS:
+                    return f"has no flag '{name}'"
+                setattr(flags, name, value)
+
+            # disnake refuses these too, checking here names the config key to fix.
+            for name, intent in MEMBER_CACHE_FLAG_INTENTS.items():
+                if getattr(flags, name) and not getattr(intents, intent):
+                    return f"flag '{name}' needs the intent '{intent}', which is not enabled"
+            return None
+
+        values = self._data.find(BotConfigKey.MEMBER_CACHE_FLAG, {})
+        _validate(BotConfigKey.MEMBER_CACHE_FLAG, DictOfStrBoolValidator, values, apply)
+        return flags
+
+    @cached_property
+    def max_messages(self) -> int | None:
+        """Messages kept in the message cache, `None` when it is disabled by setting 0."""
+        size = self._data.find(BotConfigKey.MAX_MESSAGES, DEFAULT_MAX_MESSAGES)
+        return _validate(BotConfigKey.MAX_MESSAGES, IntValidator, size, _at_least(0)) or None
+
+    @cached_property
+    def chunk_guilds_at_startup(self) -> bool | None:
+        """Whether to fetch guild members at startup, `None` leaves it to disnake, which follows intents."""
+        if (enabled := self._data.find(BotConfigKey.CHUNK_GUILDS_AT_STARTUP)) is None:
+            return None
+
+        def needs_members(enabled: bool) -> str | None:
+            return "needs the intent 'members', which is not enabled" if enabled and not self.intents.members else None
+
+        return _validate(BotConfigKey.CHUNK_GUILDS_AT_STARTUP, BoolValidator, enabled, needs_members)
+
+    @cached_property
+    def chunk_guild_member_limit(self) -> int | None:
+        """Guilds with more members are not chunked at startup, `None` chunks every guild."""
+        if (limit := self._data.find(BotConfigKey.CHUNK_GUILD_MEMBER_LIMIT)) is None:
+            return None
+        return _validate(BotConfigKey.CHUNK_GUILD_MEMBER_LIMIT, IntValidator, limit, _at_least(1))
 
 class CogConfig:
-    def __init__(self, data: RootConfigData) -> None:
+    def __init__(self, data: RootConfigData, path: Path | None = None, digest: bytes | None = None) -> None:
         self._data = data
+        self._path = path
+        # SHA-256 of the file content `data` was loaded from, the baseline of `ConfigWatcher`.
+        self._digest = digest
+        self._mode_globals = dict[bool, "MappingProxyType[str, Any]"]()
+        self._compiled_data = dict[bool, "MappingProxyType[str, Any]"]()
+        self._cog_data = dict[tuple[bool, str], dict[str, Any]]()
+        self._guild_data = dict[tuple[bool, str], dict[int, dict[str, Any]]]()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The lookup tables are rebuilt on demand, `MappingProxyType` can not be pickled for the worker processes.
+        return {"data": self._data, "path": self._path, "digest": self._digest}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc]
 
     @classmethod
     def default(cls) -> Self:
         return cls(RootConfigData())
 
     @classmethod
-    def load_from_path(cls, path: Path) -> Self:
-        return cls(RootConfigData.load_from_path(path))
+    def load_from_path(cls, path: Path, cache: "ConfigCache | None" = None) -> Self:
+        content = read_config_file(path)
+        return cls(RootConfigData.load_from_content(path, content, cache), path, sha256(content).digest())
 
-    @cached_property
-    def mode_global(self) -> dict[str, Any]:
-        data = self._data.mode.get(RootConfigKey.GLOBAL, {})
+    @property
+    def data(self) -> RootConfigData:
+        return self._data
+
+    @property
+    def path(self) -> Path | None:
+        return self._path
+
+    @property
+    def digest(self) -> bytes | None:
+        return self._digest
+
+    def _mode_global(self, production: bool) -> "MappingProxyType[str, Any]":
+        if (data := self._mode_globals.get(production)) is not None:
+            return data
 
         try:
-            return DictOfStrAnyValidator.validate_python(data)
+            data = DictOfStrAnyValidator.validate_python(self._data.modes[production].get(RootConfigKey.GLOBAL, {}))
         except ValidationError as e:
-            mode = RootConfigKey.PRODUCTION if is_production.get() else RootConfigKey.DEVELOPMENT
+            mode = RootConfigKey.PRODUCTION if production else RootConfigKey.DEVELOPMENT
             default_logger.exception(f"Failed while validation mode({mode}) global cog config data.", exc_info=e)
             raise e
 
+        self._mode_globals[production] = MappingProxyType(data)
+        return self._mode_globals[production]
+
+    def _compiled(self, production: bool) -> "MappingProxyType[str, Any]":
+        """GLOBAL, mode GLOBAL and mode layers flattened once per mode."""
+        if (data := self._compiled_data.get(production)) is None:
+            data = MappingProxyType(
+                self._data.root_global | self._mode_global(production) | self._data.modes[production]
+            )
+            self._compiled_data[production] = data
+        return data
+
+    @property
+    def mode_global(self) -> dict[str, Any]:
+        return dict(self._mode_global(is_production.get()))
+
+    @property
+    def resolved(self) -> "MappingProxyType[str, Any]":
+        return self._compiled(is_production.get())
+
     def get_data(self, cog_name: str) -> dict[str, Any]:
-        data = self._data.find(cog_name, {})
+        if (data := self._cog_data.get(key := (is_production.get(), cog_name))) is not None:
+            return data.copy()
 
         try:
-            return DictOfStrAnyValidator.validate_python(data)
+            data = DictOfStrAnyValidator.validate_python(self._data.compiled[key[0]].get(cog_name, {}))
         except ValidationError as e:
             default_logger.exception(f"Failed while validation cog config data '{cog_name}'.", exc_info=e)
             raise e
 
+        self._cog_data[key] = data
+        return data.copy()
+
+    def get_guild_data(self, cog_name: str, guild_id: int) -> dict[str, Any]:
+        """Overrides of the cog section for `guild_id`, from the `GUILDS` section of the mode."""
+        if (guilds := self._guild_data.get(key := (is_production.get(), cog_name))) is None:
+            try:
+                guilds = DictOfIntDictValidator.validate_python(
+                    self._data.compiled[key[0]].get(RootConfigKey.GUILDS, {}).get(cog_name, {})
+                )
+            except ValidationError as e:
+                default_logger.exception(
+                    f"Failed while validation cog config data '{RootConfigKey.GUILDS}.{cog_name}'.", exc_info=e
+                )
+                raise e
+            self._guild_data[key] = guilds
+        return guilds.get(guild_id, {}).copy()
+
     @overload
     def find(self, key: str, /) -> Any | None:
         ...
@@ -202,7 +581,7 @@ class CogConfig:
         ...
 
     def find(self, key: str, default: Any = None, /) -> Any:
-        return self._data.mode.get(key, self.mode_global.get(key, self._data.root_global.get(key, default)))
+        return self._compiled(is_production.get()).get(key, default)
 
     @overload
     def find_all(self, key: str) -> tuple[Any | None, Any | None, Any | None]:
@@ -215,8 +594,9 @@ class CogConfig:
         ...
 
     def find_all(self, key: str, default: Any = None) -> tuple[Any, Any, Any]:
+        production = is_production.get()
         return (
-            self._data.mode.get(key, default),
-            self.mode_global.get(key, default),
+            self._data.modes[production].get(key, default),
+            self._mode_global(production).get(key, default),
             self._data.root_global.get(key, default),
         )
@@ -0,0 +1,78 @@
+from hashlib import sha256
+from importlib.metadata import PackageNotFoundError, version
+from os import replace
+from pathlib import Path
+from pickle import HIGHEST_PROTOCOL, PickleError, dumps, loads
+from sys import version_info
+from typing import TYPE_CHECKING
+
+from .logger import default_logger
+
+if TYPE_CHECKING:
+    from .config import RootConfigData
+
+DEFAULT_CONFIG_CACHE_DIRECTORY = Path(".lux_cache")
+CONFIG_CACHE_SUFFIX = ".config.pickle"
+
+try:
+    LUX_VERSION = version("lux-discord")
+except PackageNotFoundError:
+    LUX_VERSION = "unknown"
+
+
+class ConfigCache:
+    """
+    On-disk cache of validated `RootConfigData`.
+
+    An entry is only used when the hash of the config file content, the lux version and the Python version all
+    match the ones it was stored with, so a stale entry is never returned.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CONFIG_CACHE_DIRECTORY) -> None:
+        self._directory = directory
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @staticmethod
+    def _key(content: bytes) -> str:
+        return sha256(content + f"\0{LUX_VERSION}\0{version_info.major}.{version_info.minor}".encode()).hexdigest()
+
+    def _entry_path(self, path: Path) -> Path:
+        return self._directory / (sha256(str(path.resolve()).encode()).hexdigest() + CONFIG_CACHE_SUFFIX)
+
+    def load(self, path: Path, content: bytes) -> "RootConfigData | None":
+        try:
+            key, data = loads((entry_path := self._entry_path(path)).read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, PickleError, EOFError, AttributeError, ImportError, TypeError, ValueError) as e:
+            default_logger.warning(f"Ignoring unreadable config cache entry '{entry_path}': {e}")
+            return None
+
+        if key != self._key(content):
+            default_logger.debug(f"Config cache entry for '{path}' is stale.")
+            return None
+
+        default_logger.debug(f"Using config cache entry for '{path}'.")
+        return data
+
+    def store(self, path: Path, content: bytes, data: "RootConfigData") -> None:
+        entry_path = self._entry_path(path)
+        temporary_path = entry_path.with_suffix(".tmp")
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_bytes(dumps((self._key(content), data), protocol=HIGHEST_PROTOCOL))
+            replace(temporary_path, entry_path)
+        except OSError as e:
+            default_logger.warning(f"Failed while writing config cache entry '{entry_path}': {e}")
+
+    def clear(self) -> int:
+        count = 0
+
+        for entry_path in self._directory.glob(f"*{CONFIG_CACHE_SUFFIX}"):
+            entry_path.unlink(missing_ok=True)
+            count += 1
+        return count
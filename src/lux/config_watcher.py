@@ -0,0 +1,83 @@
+from asyncio import sleep, to_thread
+from hashlib import sha256
+from typing import TYPE_CHECKING
+
+from .config import CogConfig
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any, Mapping
+
+    from .bot import Lux
+
+DEFAULT_CONFIG_WATCH_INTERVAL = 2.0
+_MISSING: "Any" = object()
+
+
+def changed_keys(old: "Mapping[str, Any]", new: "Mapping[str, Any]") -> set[str]:
+    return {key for key in old.keys() | new.keys() if old.get(key, _MISSING) != new.get(key, _MISSING)}
+
+
+class ConfigWatcher:
+    """Poll the cog config file and hand changed data to `Lux.apply_cog_config`."""
+
+    def __init__(
+        self, bot: "Lux", path: "Path", interval: float = DEFAULT_CONFIG_WATCH_INTERVAL, digest: bytes | None = None
+    ) -> None:
+        self._bot = bot
+        self._path = path
+        self._interval = interval
+        self._signature: tuple[int, int] | None = None
+        # Digest of the content the running config was loaded from, an edit made before the first check is applied.
+        self._digest = digest
+
+    @property
+    def path(self) -> "Path":
+        return self._path
+
+    def _read(self) -> tuple[tuple[int, int], bytes] | None:
+        stat = self._path.stat()
+
+        if (signature := (stat.st_mtime_ns, stat.st_size)) == self._signature:
+            return None
+        return signature, sha256(self._path.read_bytes()).digest()
+
+    async def check(self) -> bool:
+        if not (result := await to_thread(self._read)):
+            return False
+
+        self._signature, digest = result
+        if digest == self._digest:
+            return False
+
+        # Without the digest of the loaded content, the first read only records the state the bot was started with.
+        if self._digest is None:
+            self._digest = digest
+            return False
+
+        self._bot.logger.info(f"Detected change in cog config file '{self._path}'.")
+        try:
+            cog_config = await to_thread(CogConfig.load_from_path, self._path)
+        except Exception:
+            # Already logged while loading, keep the current config until the file is fixed.
+            self._bot.logger.warning("Keep using the current cog config.")
+            self._digest = digest
+            return False
+
+        # The file may have changed again since it was hashed, what was loaded is the new baseline.
+        self._digest = cog_config.digest or digest
+        await self._bot.apply_cog_config(cog_config)
+        return True
+
+    async def run(self) -> None:
+        logger = self._bot.logger
+        logger.info(f"Watching cog config file '{self._path}'.")
+
+        while not self._bot.is_closed():
+            try:
+                await self.check()
+            except FileNotFoundError:
+                logger.warning(f"Cog config file '{self._path}' does not exist. Keep using the current cog config.")
+            except Exception as e:
+                logger.exception("Failed while checking cog config file.", exc_info=e)
+            await sleep(self._interval)
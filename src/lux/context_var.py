@@ -6,8 +6,10 @@ if TYPE_CHECKING:
 
     from .bot import Lux
     from .env import Env
+    from .tracing import Span
 
 is_production: "ContextVar[bool]" = ContextVar("is_production")
 env: "ContextVar[Env]" = ContextVar("env")
 bot: "ContextVar[Lux]" = ContextVar("bot")
 interaction: "ContextVar[AppCmdInter]" = ContextVar("interaction")
+current_span: "ContextVar[Span | None]" = ContextVar("current_span", default=None)
@@ -0,0 +1,109 @@
+from asyncio import get_running_loop, shield, wait_for
+from contextvars import copy_context
+from functools import partial, wraps
+from importlib import import_module
+from time import perf_counter
+from typing import TYPE_CHECKING, overload
+
+from .context_var import bot, interaction
+from .tracing import trace
+
+if TYPE_CHECKING:
+    from typing import Any, Awaitable, Callable, ParamSpec, TypeVar
+
+    _P = ParamSpec("_P")
+    _R = TypeVar("_R")
+
+# Discord invalidates an interaction that has not been responded to within 3 seconds.
+DEFAULT_DEFER_AFTER = 2.0
+_DURATION_SMOOTHING = 0.2
+_average_durations = dict[str, float]()
+
+
+def _call_in_process(module: str, qualname: str, *args: "Any", **kwargs: "Any") -> "Any":
+    # Decorated functions are replaced by their wrapper, so the original is looked up again in the worker process.
+    target: "Any" = import_module(module)
+    for name in qualname.split("."):
+        target = getattr(target, name)
+    return target.__wrapped__(*args, **kwargs)
+
+
+def _record_duration(key: str, duration: float) -> None:
+    previous = _average_durations.get(key, duration)
+    _average_durations[key] = previous + (duration - previous) * _DURATION_SMOOTHING
+
+
+async def _wait(key: str, future: "Awaitable[_R]", defer_after: float | None) -> "_R":
+    if defer_after is None or (inter := interaction.get(None)) is None or inter.response.is_done():
+        return await future
+
+    if _average_durations.get(key, 0.0) < defer_after:
+        try:
+            return await wait_for(shield(future), defer_after)
+        except TimeoutError:
+            pass
+
+    if not inter.response.is_done():
+        bot.get().logger.debug(f"Deferring interaction while waiting for '{key}'.")
+        await inter.response.defer()
+    return await future
+
+
+async def run_offloaded(
+    key: str, call: "Callable[[], _R]", *, process: bool = False, defer_after: float | None = DEFAULT_DEFER_AFTER
+) -> "_R":
+    """
+    Run `call` on the thread pool (or process pool) of the current `Lux`.
+
+    When a command is being handled and has not been responded to, the interaction is deferred as soon as the call is
+    expected to, or does, take longer than `defer_after` seconds. The expectation is a moving average kept per `key`.
+    """
+    bot_ = bot.get()
+    start = perf_counter()
+
+    with trace(f"offload {key}", process=process):
+        if process:
+            future = get_running_loop().run_in_executor(bot_.process_pool, call)
+        else:
+            # The context is copied so context variables, such as the interaction and span, stay set in the thread.
+            future = get_running_loop().run_in_executor(bot_.thread_pool, partial(copy_context().run, call))
+
+        try:
+            return await _wait(key, future, defer_after)
+        finally:
+            _record_duration(key, perf_counter() - start)
+
+
+@overload
+def offload(func: "Callable[_P, _R]", /) -> "Callable[_P, Awaitable[_R]]":
+    ...
+
+
+@overload
+def offload(
+    *, process: bool = False, defer_after: float | None = DEFAULT_DEFER_AFTER
+) -> "Callable[[Callable[_P, _R]], Callable[_P, Awaitable[_R]]]":
+    ...
+
+
+def offload(func: "Any" = None, /, *, process: bool = False, defer_after: float | None = DEFAULT_DEFER_AFTER) -> "Any":
+    """
+    Turn a blocking function into a coroutine function running it with `run_offloaded`.
+
+    With `process=True` the function has to be defined at module level, and its arguments and result picklable.
+    """
+
+    def decorator(func: "Callable[_P, _R]") -> "Callable[_P, Awaitable[_R]]":
+        key = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        async def wrapper(*args: "_P.args", **kwargs: "_P.kwargs") -> "_R":
+            if process:
+                call = partial(_call_in_process, func.__module__, func.__qualname__, *args, **kwargs)
+            else:
+                call = partial(func, *args, **kwargs)
+            return await run_offloaded(key, call, process=process, defer_after=defer_after)
+
+        return wrapper
+
+    return decorator if func is None else decorator(func)
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from graphlib import CycleError, TopologicalSorter
+from importlib import import_module
+from importlib.abc import Loader
+from importlib.machinery import ModuleSpec
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logging import Logger
+    from types import ModuleType
+    from typing import Iterable
+
+# Module level name an extension uses to declare the extensions whose `setup` must run before its own.
+DEPENDENCIES_ATTRIBUTE = "DEPENDENCIES"
+
+
+class ExtensionLoader(Loader):
+    """
+    Wrap the loader of an extension module to time its import, or to hand over a module that has already been
+    imported (or failed to) on a worker thread so only `setup` is left to run.
+    """
+
+    def __init__(
+        self,
+        spec: ModuleSpec,
+        module: "ModuleType | None" = None,
+        error: Exception | None = None,
+        duration: float = 0.0,
+    ) -> None:
+        self._spec = spec
+        self._module = module
+        self._error = error
+        self.duration = duration
+
+    @property
+    def preimported(self) -> bool:
+        return self._module is not None or self._error is not None
+
+    def wrap(self) -> ModuleSpec:
+        spec = ModuleSpec(self._spec.name, self, origin=self._spec.origin)
+        spec.submodule_search_locations = self._spec.submodule_search_locations
+        # Without a location the module gets no `__file__`, which reloading needs to find it.
+        spec.has_location = self._spec.has_location
+        return spec
+
+    def create_module(self, spec: ModuleSpec) -> "ModuleType | None":
+        if self._module is not None:
+            return self._module
+        return self._spec.loader.create_module(self._spec) if self._spec.loader else None
+
+    def exec_module(self, module: "ModuleType") -> None:
+        # Restore the real spec and loader, so nothing else ever sees this wrapper.
+        module.__spec__ = self._spec
+        module.__loader__ = self._spec.loader
+
+        if self._error is not None:
+            raise self._error
+        if self._module is not None:
+            return
+
+        assert self._spec.loader is not None
+        start = perf_counter()
+        self._spec.loader.exec_module(module)
+        self.duration = perf_counter() - start
+
+
+def _import(name: str) -> "ImportResult":
+    start = perf_counter()
+    try:
+        return import_module(name), None, perf_counter() - start
+    except Exception as e:
+        return None, e, perf_counter() - start
+
+
+ImportResult = tuple["ModuleType | None", Exception | None, float]
+
+
+def import_extensions(names: "Iterable[str]", workers: int) -> dict[str, ImportResult]:
+    names = list(names)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lux-extension-import") as executor:
+        return dict(zip(names, executor.map(_import, names)))
+
+
+def order_by_dependencies(names: list[str], modules: "dict[str, ModuleType | None]", logger: "Logger") -> list[str]:
+    sorter = TopologicalSorter[str]()
+
+    for name in names:
+        dependencies = getattr(modules.get(name), DEPENDENCIES_ATTRIBUTE, ())
+        sorter.add(name, *(dependency for dependency in dependencies if dependency in modules))
+
+    try:
+        return list(sorter.static_order())
+    except CycleError as e:
+        logger.warning(f"Extension dependency cycle {e.args[1]}, using directory order.")
+        return names
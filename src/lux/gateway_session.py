@@ -0,0 +1,73 @@
+from json import JSONDecodeError, dumps, loads
+from os import replace
+from typing import TYPE_CHECKING, NamedTuple
+
+from .config_cache import DEFAULT_CONFIG_CACHE_DIRECTORY
+from .logger import default_logger
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+DEFAULT_GATEWAY_SESSION_DIRECTORY = DEFAULT_CONFIG_CACHE_DIRECTORY / "gateway_sessions"
+# Discord ends the session of a connection closed with 1000 or 1001, any other code leaves it resumable.
+RESUMABLE_CLOSE_CODE = 4000
+# Most guilds Discord returns in one page of the guilds of the bot.
+GUILD_PAGE_SIZE = 200
+
+
+class GatewaySession(NamedTuple):
+    session_id: str
+    sequence: int
+    resume_url: str
+    user_id: int
+    # Set from READY, which a resumed session does not receive.
+    application_id: int | None
+    shard_count: int
+    saved_at: float
+
+
+class GatewaySessionStore:
+    """
+    Last known gateway session of each shard, so the next run can resume it instead of identifying again.
+
+    Every shard has its own file, clusters running shards of the same bot in other processes do not overwrite each
+    other's sessions.
+    """
+
+    def __init__(self, directory: "Path" = DEFAULT_GATEWAY_SESSION_DIRECTORY) -> None:
+        self._directory = directory
+        self._saved = dict[int, GatewaySession]()
+
+    @property
+    def directory(self) -> "Path":
+        return self._directory
+
+    def _path(self, shard_id: int) -> "Path":
+        return self._directory / f"shard{shard_id}.json"
+
+    def load(self, shard_id: int) -> GatewaySession | None:
+        path = self._path(shard_id)
+
+        try:
+            return GatewaySession(**loads(path.read_text()))
+        except FileNotFoundError:
+            return None
+        except (OSError, JSONDecodeError, TypeError) as e:
+            default_logger.warning(f"Ignoring unreadable gateway session '{path}': {e}")
+            return None
+
+    def save(self, shard_id: int, session: GatewaySession) -> None:
+        # Sessions that did not move since the last save, `saved_at` aside, are not written again.
+        if (saved := self._saved.get(shard_id)) is not None and saved[:-1] == session[:-1]:
+            return
+
+        path = self._path(shard_id)
+        temporary_path = path.with_suffix(".tmp")
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_text(dumps(session._asdict()))
+            replace(temporary_path, path)
+        except OSError as e:
+            default_logger.warning(f"Failed while writing gateway session '{path}': {e}")
+        else:
+            self._saved[shard_id] = session
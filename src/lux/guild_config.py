@@ -0,0 +1,107 @@
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import TYPE_CHECKING
+
+from .cache import AsyncCache, CacheSettings
+from .config import DEFAULT_GUILD_CONFIG_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from logging import Logger
+    from typing import Any, Callable
+
+    from .config import CogConfig
+
+
+class GuildConfigProvider(ABC):
+    """Base class of external sources of per-guild overrides, applied on top of the guild sections of the cog config."""
+
+    @abstractmethod
+    async def load(self, guild_id: int) -> "dict[str, dict[str, Any]]":
+        """Overrides of `guild_id` by cog name, cogs without any may be left out."""
+
+
+class _GuildEntry:
+    __slots__ = ("guild_id", "cog_config", "provided", "views")
+
+    def __init__(self, guild_id: int, cog_config: "CogConfig", provided: "dict[str, dict[str, Any]]") -> None:
+        self.guild_id = guild_id
+        self.cog_config = cog_config
+        self.provided = provided
+        # Resolved config of each cog, with the config it was resolved from.
+        self.views = dict[str, tuple["Any", "Any"]]()
+
+    def overrides(self, cog_name: str) -> "dict[str, Any]":
+        return self.cog_config.get_guild_data(cog_name, self.guild_id) | self.provided.get(cog_name, {})
+
+
+class GuildConfigs:
+    """
+    Cog configs resolved per guild: the cog section, its guild section on top, and the provider overrides on top.
+
+    The guilds used most recently are kept in an LRU, a lookup of a kept guild is a couple of dict lookups. A view is
+    resolved again when the config of its cog changed, `invalidate` drops a guild whose provider overrides changed.
+    """
+
+    def __init__(
+        self,
+        cog_config: "CogConfig",
+        logger: "Logger",
+        provider: GuildConfigProvider | None = None,
+        settings: CacheSettings = CacheSettings(DEFAULT_GUILD_CONFIG_CACHE_SIZE),
+    ) -> None:
+        self._cog_config = cog_config
+        self._logger = logger
+        self._provider = provider
+        self._cache = AsyncCache(settings)
+
+    @property
+    def cache(self) -> AsyncCache:
+        return self._cache
+
+    @property
+    def cog_config(self) -> "CogConfig":
+        return self._cog_config
+
+    @cog_config.setter
+    def cog_config(self, cog_config: "CogConfig") -> None:
+        self._cog_config = cog_config
+        self._cache.clear()
+
+    @property
+    def provider(self) -> GuildConfigProvider | None:
+        return self._provider
+
+    @provider.setter
+    def provider(self, provider: GuildConfigProvider | None) -> None:
+        self._provider = provider
+        self._cache.clear()
+
+    async def _load(self, guild_id: int) -> _GuildEntry:
+        cog_config = self._cog_config
+        if (provider := self._provider) is None:
+            return _GuildEntry(guild_id, cog_config, {})
+
+        try:
+            provided = await provider.load(guild_id)
+        except Exception as e:
+            self._logger.exception(f"Failed while loading config overrides of guild {guild_id}.", exc_info=e)
+            raise e
+        return _GuildEntry(guild_id, cog_config, provided)
+
+    async def view(
+        self, guild_id: int, cog_name: str, base: "Any", resolve: "Callable[[dict[str, Any]], Any]"
+    ) -> "Any":
+        """
+        Config of `cog_name` for `guild_id`, `resolve` turns the overrides into it when `base`, the config of the cog,
+        is not the one the kept view was resolved from.
+        """
+        entry: _GuildEntry = await self._cache.get_or_call(guild_id, partial(self._load, guild_id))
+        if (view := entry.views.get(cog_name)) is None or view[0] is not base:
+            view = entry.views[cog_name] = (base, resolve(entry.overrides(cog_name)))
+        return view[1]
+
+    def invalidate(self, guild_id: int) -> None:
+        self._cache.invalidate(guild_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -0,0 +1,192 @@
+import sys
+from ast import Import, ImportFrom, parse, walk
+from asyncio import sleep, to_thread
+from graphlib import CycleError, TopologicalSorter
+from hashlib import sha256
+from importlib.util import resolve_name
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from .extension_loader import order_by_dependencies
+
+if TYPE_CHECKING:
+    from logging import Logger
+    from types import ModuleType
+
+    from .bot import Lux
+
+DEFAULT_HOT_RELOAD_INTERVAL = 1.0
+
+
+class _ModuleFile:
+    __slots__ = ("path", "stat", "digest", "imports")
+
+    def __init__(self, path: Path, stat: tuple[float, int], digest: bytes, imports: set[str]) -> None:
+        self.path = path
+        # Modification time and size, the file is only hashed again when they change.
+        self.stat = stat
+        self.digest = digest
+        self.imports = imports
+
+
+def _imported_names(module: "ModuleType", source: bytes) -> set[str]:
+    """Every module name `source` imports, parent packages included, whether or not it exists."""
+    package = module.__name__ if hasattr(module, "__path__") else module.__name__.rpartition(".")[0]
+    names = set[str]()
+
+    for node in walk(parse(source)):
+        if isinstance(node, Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ImportFrom):
+            try:
+                base = resolve_name("." * node.level + (node.module or ""), package) if node.level else node.module
+            except ImportError:
+                continue
+            if base:
+                # `from package import name` may import the module `package.name`.
+                names.add(base)
+                names.update(f"{base}.{alias.name}" for alias in node.names)
+
+    return {".".join(parts[:end]) for name in names if (parts := name.split(".")) for end in range(1, len(parts) + 1)}
+
+
+class HotReloader:
+    """
+    Reload what changed in the loaded extensions, and only that.
+
+    The local modules each extension imports (those of the same top-level packages) are tracked with a hash of their
+    file. When some change, they and the modules importing them are reloaded in place, imported modules first, the
+    extensions among them set up again in `DEPENDENCIES` order, and only the application commands that differ
+    afterwards are synced. Other modules of the same packages are not imported again.
+    """
+
+    def __init__(self, bot: "Lux", interval: float = DEFAULT_HOT_RELOAD_INTERVAL, logger: "Logger | None" = None):
+        self._bot = bot
+        self._interval = interval
+        self._logger = logger or bot.logger
+        self._files = dict[str, _ModuleFile]()
+
+    def _roots(self) -> set[str]:
+        return {name.partition(".")[0] for name in self._bot.extensions}
+
+    def _track(self, name: str, roots: set[str]) -> "_ModuleFile | None":
+        if (module := sys.modules.get(name)) is None or not (file := getattr(module, "__file__", None)):
+            return None
+        if name.partition(".")[0] not in roots:
+            return None
+
+        path = Path(file)
+        stat = path.stat()
+        if (known := self._files.get(name)) is not None and known.stat == (stat.st_mtime, stat.st_size):
+            return known
+
+        source = path.read_bytes()
+        digest = sha256(source).digest()
+        if known is not None and known.digest == digest:
+            known.stat = (stat.st_mtime, stat.st_size)
+            return known
+
+        try:
+            imports = {name for name in _imported_names(module, source) if name.partition(".")[0] in roots}
+        except SyntaxError:
+            # Reloading reports the error, the imports are read again once it is fixed.
+            imports = known.imports if known is not None else set()
+        return _ModuleFile(path, (stat.st_mtime, stat.st_size), digest, imports)
+
+    def scan(self) -> set[str]:
+        """Update the tracked modules from the loaded extensions, returning those whose content changed."""
+        roots = self._roots()
+        files = dict[str, _ModuleFile]()
+        changed = set[str]()
+        pending = list(self._bot.extensions)
+
+        while pending:
+            if (name := pending.pop()) in files:
+                continue
+            try:
+                if (file := self._track(name, roots)) is None:
+                    continue
+            except OSError:
+                continue
+
+            if (known := self._files.get(name)) is not None and known.digest != file.digest:
+                changed.add(name)
+            files[name] = file
+            pending.extend(file.imports)
+
+        self._files = files
+        return changed
+
+    def dependents(self, names: set[str]) -> set[str]:
+        """`names` and every tracked module importing one of them, directly or not."""
+        importers = dict[str, set[str]]()
+        for name, file in self._files.items():
+            for imported in file.imports:
+                importers.setdefault(imported, set()).add(name)
+
+        result = set(names)
+        pending = list(names)
+        while pending:
+            for importer in importers.get(pending.pop(), ()):
+                if importer not in result:
+                    result.add(importer)
+                    pending.append(importer)
+        return result
+
+    def import_order(self, names: set[str]) -> list[str]:
+        """`names`, each after the tracked modules it imports."""
+        sorter = TopologicalSorter[str]()
+        for name in names:
+            # A module refers to its parent packages for their namespace, it does not need them reloaded first.
+            imports = self._files[name].imports if name in self._files else set[str]()
+            sorter.add(name, *(imported for imported in imports & names if not f"{name}.".startswith(f"{imported}.")))
+
+        try:
+            return list(sorter.static_order())
+        except CycleError as e:
+            self._logger.warning(f"Import cycle {e.args[1]}, reloading modules by name.")
+            return sorted(names)
+
+    async def reload(self, changed: set[str]) -> None:
+        bot = self._bot
+        start = perf_counter()
+        affected = self.dependents(changed)
+        modules = [module for name in self.import_order(affected) if (module := sys.modules.get(name)) is not None]
+        extensions = order_by_dependencies(
+            [name for name in bot.extensions if name in affected], dict(bot.extensions), self._logger
+        )
+
+        # Re-adding cogs would schedule a sync overwriting every command, only the changed ones are synced below.
+        flags = bot._command_sync_flags
+        sync_on_cog_actions, flags.sync_on_cog_actions = flags.sync_on_cog_actions, False
+        try:
+            reloaded = bot.reload_extension_modules(extensions, modules)
+        finally:
+            flags.sync_on_cog_actions = sync_on_cog_actions
+        reload_duration = perf_counter() - start
+
+        start = perf_counter()
+        synced = await bot.sync_changed_commands() if sync_on_cog_actions else 0
+        sync_duration = perf_counter() - start
+        await to_thread(self.scan)
+
+        self._logger.info(
+            f"Changed {', '.join(sorted(changed))}: reloaded {reloaded}/{len(extensions)} extensions and "
+            f"{len(modules)} modules in {reload_duration * 1000:.1f} ms, "
+            f"synced {synced} commands in {sync_duration * 1000:.1f} ms."
+        )
+
+    async def run(self) -> None:
+        start = perf_counter()
+        await to_thread(self.scan)
+        self._logger.info(f"Watching {len(self._files)} modules, hashed in {(perf_counter() - start) * 1000:.1f} ms.")
+
+        while not self._bot.is_closed():
+            await sleep(self._interval)
+            try:
+                # Reading and hashing files is left to a thread, so a large package does not block the event loop.
+                if changed := await to_thread(self.scan):
+                    await self.reload(changed)
+            except Exception as e:
+                self._logger.exception("Failed while reloading changed modules.", exc_info=e)
@@ -0,0 +1,149 @@
+from hashlib import sha256
+from json import JSONDecodeError, dumps, loads
+from os import replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from disnake import ApplicationCommandType
+from disnake.app_commands import application_command_factory
+
+from .config_cache import DEFAULT_CONFIG_CACHE_DIRECTORY
+from .logger import default_logger
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from disnake.app_commands import APIApplicationCommand
+    from disnake.ext.commands import InvokableApplicationCommand
+
+    from .bot import Lux
+
+DEFAULT_EXTENSION_MANIFEST_PATH = DEFAULT_CONFIG_CACHE_DIRECTORY / "extension_manifest.json"
+
+
+def _is_submodule(parent: str, child: str) -> bool:
+    return parent == child or child.startswith(parent + ".")
+
+
+def source_hash(name: str) -> str | None:
+    """Hash the source of extension `name`, resolved relative to the working directory like `search_directory` does."""
+    if (path := Path(*name.split("."))).is_dir():
+        files = sorted(path.rglob("*.py"))
+    elif (path := path.with_suffix(".py")).is_file():
+        files = [path]
+    else:
+        return None
+
+    digest = sha256()
+    for file in files:
+        digest.update(str(file).encode() + b"\0" + file.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+class LazyApplicationCommand:
+    """
+    Stand-in for an application command of an extension that has not been imported yet.
+
+    It only carries what command sync needs, `Lux` imports the extension when the command is used.
+    """
+
+    __slots__ = ("extension", "body", "guild_ids", "auto_sync")
+
+    def __init__(self, extension: str, body: "APIApplicationCommand", guild_ids: tuple[int, ...] | None) -> None:
+        self.extension = extension
+        self.body = body
+        self.guild_ids = guild_ids
+        self.auto_sync = True
+
+    @property
+    def name(self) -> str:
+        return self.body.name
+
+    @property
+    def qualified_name(self) -> str:
+        return self.body.name
+
+    @property
+    def type(self) -> ApplicationCommandType:
+        return self.body.type
+
+    @classmethod
+    def from_entry(cls, extension: str, entry: dict[str, "Any"]) -> "LazyApplicationCommand":
+        # The factory expects an API payload, the ids are never sent back to Discord.
+        body = application_command_factory({**entry["body"], "id": 0, "application_id": 0, "version": 0})
+        return cls(extension, body, tuple(guild_ids) if (guild_ids := entry["guild_ids"]) is not None else None)
+
+
+class ExtensionManifest:
+    """
+    Cached application commands of each extension, keyed by extension name and invalidated by source hash.
+
+    An extension is only loaded lazily when its commands are all it registers, listeners would never fire otherwise.
+    """
+
+    def __init__(self, path: Path = DEFAULT_EXTENSION_MANIFEST_PATH) -> None:
+        self._path = path
+        self._entries = dict[str, dict[str, "Any"]]()
+        self._dirty = False
+
+        try:
+            self._entries = loads(path.read_text())
+        except FileNotFoundError:
+            pass
+        except (OSError, JSONDecodeError) as e:
+            default_logger.warning(f"Ignoring unreadable extension manifest '{path}': {e}")
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def lazy_commands(self, name: str) -> list[LazyApplicationCommand] | None:
+        """Stand-in commands of extension `name`, or `None` if it has to be loaded eagerly."""
+        if not (entry := self._entries.get(name)) or not entry["lazy"] or entry["hash"] != source_hash(name):
+            return None
+
+        try:
+            return [LazyApplicationCommand.from_entry(name, command) for command in entry["commands"]]
+        except (KeyError, TypeError, ValueError) as e:
+            default_logger.warning(f"Ignoring invalid extension manifest entry '{name}': {e}")
+            return None
+
+    def record(self, name: str, bot: "Lux") -> None:
+        commands: list["InvokableApplicationCommand"] = [
+            command
+            for command in bot.application_commands_iterator()
+            if not isinstance(command, LazyApplicationCommand) and _is_submodule(name, command.callback.__module__)
+        ]
+        listeners = [listener for listeners in bot.extra_events.values() for listener in listeners]
+        has_listeners = any(_is_submodule(name, listener.__module__) for listener in listeners) or any(
+            cog.get_listeners() for cog in bot.cogs.values() if _is_submodule(name, cog.__module__)
+        )
+
+        entry = {
+            "hash": source_hash(name),
+            "lazy": bool(commands) and not has_listeners,
+            "commands": [
+                {
+                    "body": command.body.to_dict(),
+                    "guild_ids": list(command.guild_ids) if command.guild_ids is not None else None,
+                }
+                for command in commands
+            ],
+        }
+
+        if self._entries.get(name) != entry:
+            self._entries[name] = entry
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        temporary_path = self._path.with_suffix(".tmp")
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_text(dumps(self._entries))
+            replace(temporary_path, self._path)
+            self._dirty = False
+        except OSError as e:
+            default_logger.warning(f"Failed while writing extension manifest '{self._path}': {e}")
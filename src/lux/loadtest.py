@@ -0,0 +1,267 @@
+from asyncio import Semaphore, create_task, gather, sleep
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import count as counter
+from json import loads
+from random import Random
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from disnake import ApplicationCommandInteraction, ClientUser, InteractionType, OptionType
+from disnake.ext.commands import InvokableSlashCommand
+from disnake.webhook.async_ import AsyncWebhookAdapter, async_context
+
+from .logger import default_logger
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from pathlib import Path
+
+    from disnake import Option
+    from disnake.http import Route
+
+    from .bot import Lux
+
+LOCAL_APPLICATION_ID = 1
+LOCAL_BOT_USER_ID = 1
+DEFAULT_LOADTEST_USERS = 1000
+_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _user_payload(user_id: int) -> dict[str, Any]:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None, "global_name": None}
+
+
+class LocalDiscord(AsyncWebhookAdapter):
+    """
+    In-process stand-in for the Discord HTTP API, answering the requests commands make while handling interactions.
+
+    Interaction responses go through the webhook adapter, everything else through `Lux.http`, both are replaced. Any
+    request creating, editing or fetching a message gets a message back, other requests get nothing.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._message_ids = counter(1)
+        self.requests = Counter[str]()
+
+    def _respond(self, route: "Route", payload: dict[str, Any] | None) -> Any:
+        self.requests[f"{route.method} {route.path}"] += 1
+
+        # Followups are sent to the webhook itself, interaction callbacks return nothing.
+        webhook_message = route.path.startswith("/webhooks/") and not route.path.endswith("/callback")
+        if route.method == "DELETE" or not (webhook_message or "/messages" in route.path):
+            return None
+
+        return {
+            "id": str(next(self._message_ids)),
+            "channel_id": str(getattr(route, "channel_id", None) or 0),
+            "author": _user_payload(LOCAL_BOT_USER_ID) | {"bot": True},
+            "content": "",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "components": [],
+            "pinned": False,
+            "type": 0,
+            "flags": 0,
+        } | (payload or {})
+
+    async def request(self, route: "Route", session: Any, *, payload: dict[str, Any] | None = None, **_: Any) -> Any:
+        return self._respond(route, payload)
+
+    def install(self, bot: "Lux") -> None:
+        async def request(route: "Route", **kwargs: Any) -> Any:
+            return self._respond(route, kwargs.get("json"))
+
+        bot.http.request = request  # type: ignore[method-assign]
+        state = bot._connection
+        state.application_id = LOCAL_APPLICATION_ID
+        state.user = ClientUser(state=state, data=_user_payload(LOCAL_BOT_USER_ID) | {"bot": True})
+        # Tasks copy the context they are created in, every interaction handled after this uses the stand-in.
+        async_context.set(self)
+
+
+def _option_value(option: "Option") -> Any:
+    if option.choices:
+        return option.choices[0].value
+    if option.type is OptionType.string:
+        return "test"
+    if option.type is OptionType.integer:
+        return int(option.min_value) if option.min_value is not None else 1
+    if option.type is OptionType.number:
+        return float(option.min_value) if option.min_value is not None else 1.0
+    if option.type is OptionType.boolean:
+        return True
+    # Users, channels, roles and attachments would need resolved data, they are left out.
+    return None
+
+
+def _command_data(name: str, options: list["Option"]) -> list[dict[str, Any]]:
+    """Data of every leaf command below `name`, with a value for each option that can be synthesized."""
+    if any(option.type in (OptionType.sub_command, OptionType.sub_command_group) for option in options):
+        return [
+            {"name": name, "type": 1, "options": [data | {"type": option.type.value}]}
+            for option in options
+            if option.type in (OptionType.sub_command, OptionType.sub_command_group)
+            for data in _command_data(option.name, option.options)
+        ]
+
+    values = list[dict[str, Any]]()
+    for option in options:
+        if (value := _option_value(option)) is not None:
+            values.append({"name": option.name, "type": option.type.value, "value": value})
+        elif option.required:
+            default_logger.warning(f"Skip command '{name}', its option '{option.name}' can not be synthesized.")
+            return []
+    return [{"name": name, "type": 1, "options": values}]
+
+
+def synthesize_payloads(bot: "Lux", commands: "list[str] | None" = None) -> list[dict[str, Any]]:
+    """One interaction payload per slash command (and subcommand) of `bot`, or of `commands` only."""
+    payloads = list[dict[str, Any]]()
+
+    for command_id, command in enumerate(bot.application_commands, 1):
+        if not isinstance(command, InvokableSlashCommand) or (commands and command.name not in commands):
+            continue
+        for data in _command_data(command.name, command.body.options):
+            payloads.append({"type": InteractionType.application_command.value, "data": {"id": str(command_id)} | data})
+    return payloads
+
+
+def load_payloads(path: "Path") -> list[dict[str, Any]]:
+    """Read recorded `INTERACTION_CREATE` payloads, one JSON object per line."""
+    return [loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+class LoadTestReport:
+    def __init__(self, bot: "Lux", sent: int, elapsed: float, failures: Counter[str], requests: Counter[str]) -> None:
+        self.sent = sent
+        self.elapsed = elapsed
+        self.throughput = sent / elapsed if elapsed else 0.0
+        self.requests = dict(requests)
+        self.commands = {
+            name: {
+                "invocations": entry.invocations,
+                "errors": entry.errors + failures[name],
+                "latency": {str(q): entry.latency.quantile(q) for q in _QUANTILES},
+                "first_response": {str(q): entry.first_response.quantile(q) for q in _QUANTILES},
+            }
+            for name, entry in bot.metrics.commands.items()
+        }
+        self.errors = sum(command["errors"] for command in self.commands.values()) + sum(
+            count for name, count in failures.items() if name not in self.commands
+        )
+        self.loop_lag = None
+        if (monitor := bot.loop_monitor) is not None:
+            self.loop_lag = {str(q): monitor.lag.quantile(q) for q in _QUANTILES} | {"blocks": monitor.blocks}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "errors": self.errors,
+            "commands": self.commands,
+            "requests": self.requests,
+            "loop_lag": self.loop_lag,
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"Sent {self.sent} interactions in {self.elapsed:.2f}s, {self.throughput:.1f}/s, "
+            f"{self.errors} errors ({self.errors / self.sent if self.sent else 0.0:.1%}).",
+            f"{'command':<24} {'count':>7} {'error':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'ttfr95':>7}",
+        ]
+        for name, command in sorted(self.commands.items(), key=lambda item: -item[1]["invocations"]):
+            latency = command["latency"]
+            lines.append(
+                f"{name[:24]:<24} {command['invocations']:>7} {command['errors']:>6} "
+                + " ".join(f"{latency[str(q)] * 1000:>7.1f}" for q in _QUANTILES)
+                + f" {command['first_response']['0.95'] * 1000:>7.1f}"
+            )
+        if self.loop_lag is not None:
+            lines.append(
+                f"Event loop lag p99 {self.loop_lag['0.99'] * 1000:.1f} ms, blocked {self.loop_lag['blocks']} times."
+            )
+        return "\n".join(lines)
+
+
+class LoadTest:
+    """
+    Replay interaction payloads against `bot` at a fixed rate (or as fast as possible) with bounded concurrency.
+
+    Payloads are turned into interactions the way the gateway does and handed to `Lux.on_application_command`.
+    Synthetic payloads are sent by a pool of `users` users, recorded ones by whoever sent them.
+    """
+
+    def __init__(self, bot: "Lux", discord: LocalDiscord, *, users: int = DEFAULT_LOADTEST_USERS, seed: int = 0):
+        self._bot = bot
+        self._discord = discord
+        self._users = users
+        self._random = Random(seed)
+        self._ids = counter(1 << 40)
+        self._failures = Counter[str]()
+
+    def _interaction(self, payload: dict[str, Any]) -> ApplicationCommandInteraction:
+        data = {
+            "application_id": str(LOCAL_APPLICATION_ID),
+            "channel_id": "1",
+            "locale": "en-US",
+            "version": 1,
+            "app_permissions": "0",
+        } | payload
+        if "user" not in data and "member" not in data:
+            data["user"] = _user_payload(self._random.randrange(self._users) + 2)
+        # Every replay is a new interaction, with its own id and token.
+        interaction_id = next(self._ids)
+        data |= {"id": str(interaction_id), "token": f"token{interaction_id}"}
+        return ApplicationCommandInteraction(data=data, state=self._bot._connection)
+
+    async def _send(self, payload: dict[str, Any]) -> None:
+        name = payload.get("data", {}).get("name", "unknown")
+        try:
+            inter = self._interaction(payload)
+            if inter.type is InteractionType.application_command_autocomplete:
+                await self._bot.on_application_command_autocomplete(inter)
+            else:
+                await self._bot.on_application_command(inter)
+        except Exception as e:
+            # Command errors are handled by `Lux`, this is anything escaping dispatch itself.
+            if not self._failures:
+                default_logger.exception(f"Failed while dispatching '{name}'.", exc_info=e)
+            self._failures[name] += 1
+
+    async def run(
+        self, payloads: list[dict[str, Any]], *, count: int, rate: float = 0.0, concurrency: int = 50
+    ) -> LoadTestReport:
+        if not payloads:
+            raise ValueError("No interaction payloads to send.")
+
+        self._bot.metrics.clear()
+        self._failures.clear()
+        self._discord.requests.clear()
+        semaphore = Semaphore(concurrency)
+        tasks = set["Task[None]"]()
+        start = perf_counter()
+
+        def done(task: "Task[None]") -> None:
+            tasks.discard(task)
+            semaphore.release()
+
+        for index in range(count):
+            if rate and (delay := start + index / rate - perf_counter()) > 0:
+                await sleep(delay)
+            await semaphore.acquire()
+
+            task = create_task(self._send(payloads[index % len(payloads)]))
+            tasks.add(task)
+            task.add_done_callback(done)
+
+        await gather(*tasks)
+        return LoadTestReport(self._bot, count, perf_counter() - start, self._failures, self._discord.requests)
@@ -1,4 +1,13 @@
-from logging import Formatter, StreamHandler, getLogger
+from atexit import register
+from json import dumps
+from logging import WARNING, Filter, Formatter, Handler, LogRecord, StreamHandler, getLogger
+from logging.handlers import QueueHandler, QueueListener
+from queue import Empty, Full, Queue
+from random import random
+from threading import Lock
+from time import monotonic
+
+from .context_var import interaction
 
 try:
     import colorlog  # type: ignore
@@ -7,6 +16,177 @@ except ImportError:
 
 default_fmt = "{asctime} | {levelname:^10} | {name:^10} | {message}"
 default_name = "lux"
+# Records logged while the queue is full are dropped instead of blocking the event loop.
+DEFAULT_LOG_QUEUE_SIZE = 10_000
+# Seconds stopping the listener waits for a free slot of a full queue, before dropping the oldest records instead.
+LOG_STOP_TIMEOUT = 1.0
+INTERACTION_FIELDS = ("interaction_id", "command", "guild_id", "channel_id", "user_id")
+
+
+class InteractionContextFilter(Filter):
+    """Attach the fields of the current interaction, it has to run on the thread that logged the record."""
+
+    def filter(self, record: LogRecord) -> bool:
+        if (inter := interaction.get(None)) is not None:
+            record.interaction_id = inter.id
+            record.command = inter.data.name
+            record.guild_id = inter.guild_id
+            record.channel_id = inter.channel_id
+            record.user_id = inter.author.id
+        return True
+
+
+class _LoggerLimit:
+    __slots__ = ("rate", "burst", "sample", "tokens", "updated_at", "dropped")
+
+    def __init__(self, rate: float, burst: float, sample: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.sample = sample
+        self.tokens = burst
+        self.updated_at = monotonic()
+        self.dropped = 0
+
+
+class RateLimitFilter(Filter):
+    """
+    Per-logger token bucket rate limit. Records below WARNING are also sampled, so a noisy logger can be thinned out
+    without losing its warnings and errors. A limit applies to the logger it is set on and all of its children.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._limits = dict[str, _LoggerLimit]()
+        self._resolved = dict[str, _LoggerLimit | None]()
+
+    def set_limit(self, name: str, rate: float, burst: float | None = None, sample: float = 1.0) -> None:
+        self._limits[name] = _LoggerLimit(rate, burst if burst is not None else max(rate, 1.0), sample)
+        self._resolved.clear()
+
+    def remove_limit(self, name: str) -> None:
+        self._limits.pop(name, None)
+        self._resolved.clear()
+
+    def dropped(self) -> dict[str, int]:
+        return {name: limit.dropped for name, limit in self._limits.items()}
+
+    def _resolve(self, name: str) -> _LoggerLimit | None:
+        while True:
+            if (limit := self._limits.get(name)) is not None or "." not in name:
+                return limit
+            name = name.rpartition(".")[0]
+
+    def filter(self, record: LogRecord) -> bool:
+        if (limit := self._resolved.get(record.name, ...)) is ...:
+            limit = self._resolved[record.name] = self._resolve(record.name)
+        if limit is None:
+            return True
+
+        if record.levelno < WARNING and limit.sample < 1.0 and random() >= limit.sample:
+            limit.dropped += 1
+            return False
+
+        now = monotonic()
+        limit.tokens = min(limit.burst, limit.tokens + (now - limit.updated_at) * limit.rate)
+        limit.updated_at = now
+        if limit.tokens < 1.0:
+            limit.dropped += 1
+            return False
+
+        limit.tokens -= 1.0
+        return True
+
+
+class _BoundedQueueListener(QueueListener):
+    def __init__(self, owner: "BoundedQueueHandler", queue: Queue, *handlers: Handler) -> None:
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self._owner = owner
+
+    def enqueue_sentinel(self) -> None:
+        # `QueueListener` adds the sentinel without waiting, `Full` would escape `stop` right when logging is busiest.
+        try:
+            return self.queue.put(self._sentinel, timeout=LOG_STOP_TIMEOUT)
+        except Full:
+            pass
+
+        while True:
+            try:
+                return self.queue.put_nowait(self._sentinel)
+            except Full:
+                try:
+                    self.queue.get_nowait()
+                except Empty:
+                    continue
+                self._owner.dropped += 1
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hand records to a background listener writing them with `handlers`, dropping them when its bounded queue is full.
+
+    The listener thread is started by the first record, importing lux starts no thread.
+    """
+
+    def __init__(self, queue: Queue, *handlers: Handler) -> None:
+        super().__init__(queue)
+        self.dropped = 0
+        self.listener = _BoundedQueueListener(self, queue, *handlers)
+        self._listening = False
+        self._listener_lock = Lock()
+
+    def start(self) -> None:
+        with self._listener_lock:
+            if not self._listening:
+                self.listener.start()
+                self._listening = True
+
+    def stop(self) -> None:
+        """
+        Write the queued records and stop the listener thread, a later record starts it again. The oldest records are
+        dropped when the listener does not free a slot of a full queue within `LOG_STOP_TIMEOUT`.
+        """
+        with self._listener_lock:
+            if self._listening:
+                self.listener.stop()
+                self._listening = False
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        if not self._listening:
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+
+class JsonFormatter(Formatter):
+    """Format records as one JSON object per line, with the interaction fields when there is one."""
+
+    def format(self, record: LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data |= {field: value for field in INTERACTION_FIELDS if (value := getattr(record, field, None)) is not None}
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return dumps(data, default=str)
+
+
+_exception_formatter = Formatter()
 
 if colorlog:
     default_handler = colorlog.StreamHandler()
@@ -17,6 +197,17 @@ else:
     default_formatter = Formatter(default_fmt, style="{")
     default_logger = getLogger(default_name)
 
+interaction_context_filter = InteractionContextFilter()
+rate_limit_filter = RateLimitFilter()
+default_queue_handler = BoundedQueueHandler(Queue(DEFAULT_LOG_QUEUE_SIZE), default_handler)
+default_queue_handler.addFilter(interaction_context_filter)
+default_queue_handler.addFilter(rate_limit_filter)
+
 default_logger.propagate = False
 default_handler.setFormatter(default_formatter)
-default_logger.addHandler(default_handler)
+default_logger.addHandler(default_queue_handler)
+register(default_queue_handler.stop)
+
+
+def use_json_formatter() -> None:
+    default_handler.setFormatter(JsonFormatter())
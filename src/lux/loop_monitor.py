@@ -0,0 +1,142 @@
+from asyncio import current_task, get_running_loop, sleep
+from collections import deque
+from sys import _current_frames
+from threading import Event, Thread, get_ident
+from time import monotonic, perf_counter, time
+from traceback import format_stack
+from typing import TYPE_CHECKING, NamedTuple
+from weakref import WeakKeyDictionary
+
+from .config import DEFAULT_LOOP_BLOCK_THRESHOLD
+from .metrics import Histogram
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop, Task
+    from logging import Logger
+
+    from disnake import Interaction
+
+DEFAULT_LOOP_MONITOR_INTERVAL = 0.1
+DEFAULT_BLOCK_REPORT_LIMIT = 20
+
+
+class BlockReport(NamedTuple):
+    started_at: float
+    command: str | None
+    stack: str
+    # Known once the loop runs again, `None` while it is still blocked.
+    duration: float | None = None
+
+
+class LoopMonitor:
+    """
+    Measure how late the event loop wakes up a sleeping task, and let a watchdog thread capture the stack of the loop
+    thread whenever it has not woken up for `threshold` seconds.
+
+    The loop only runs one cheap task every `interval` seconds, the watchdog thread sleeps in between its checks.
+    """
+
+    def __init__(
+        self,
+        logger: "Logger",
+        interval: float = DEFAULT_LOOP_MONITOR_INTERVAL,
+        threshold: float = DEFAULT_LOOP_BLOCK_THRESHOLD,
+        report_limit: int = DEFAULT_BLOCK_REPORT_LIMIT,
+    ) -> None:
+        self._logger = logger
+        self._interval = interval
+        self._threshold = threshold
+        self._lag = Histogram()
+        self._max_lag = 0.0
+        self._blocks = 0
+        self._reports = deque[BlockReport](maxlen=report_limit)
+        self._commands = WeakKeyDictionary["Task", str]()
+        self._heartbeat = monotonic()
+        self._loop_thread_id: int | None = None
+        self._loop: "AbstractEventLoop | None" = None
+        self._stopped = Event()
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def lag(self) -> Histogram:
+        return self._lag
+
+    @property
+    def max_lag(self) -> float:
+        return self._max_lag
+
+    @property
+    def blocks(self) -> int:
+        return self._blocks
+
+    @property
+    def reports(self) -> list[BlockReport]:
+        return list(self._reports)
+
+    def track(self, inter: "Interaction") -> None:
+        """Tag the current task with the command of `inter`, block reports name it when the task blocks the loop."""
+        if (task := current_task()) is not None:
+            self._commands[task] = inter.data.name
+
+    def _current_command(self) -> str | None:
+        try:
+            task = current_task(self._loop)
+            return self._commands.get(task) if task is not None else None
+        except RuntimeError:
+            # The task registry of the loop changed size while it was read from this thread.
+            return None
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+
+        while not self._stopped.wait(self._threshold / 2):
+            heartbeat = self._heartbeat
+            if heartbeat == reported_heartbeat or monotonic() - heartbeat < self._threshold:
+                continue
+
+            if (frame := _current_frames().get(self._loop_thread_id)) is None:  # type: ignore[arg-type]
+                continue
+            reported_heartbeat = heartbeat
+            stack = "".join(format_stack(frame))
+            del frame
+
+            command = self._current_command()
+            self._blocks += 1
+            self._reports.append(BlockReport(time() - (monotonic() - heartbeat), command, stack))
+            self._logger.warning(
+                f"Event loop blocked for more than {self._threshold}s"
+                + (f" while handling command '{command}'" if command else "")
+                + f", at:\n{stack}"
+            )
+
+    def _record(self, lag: float) -> None:
+        now = monotonic()
+        blocked, self._heartbeat = now - self._heartbeat, now
+        self._lag.observe(lag)
+        self._max_lag = max(self._max_lag, lag)
+
+        if self._reports and (report := self._reports[-1]).duration is None:
+            self._reports[-1] = report._replace(duration=blocked)
+            self._logger.warning(f"Event loop was blocked for {blocked:.3f}s.")
+
+    async def run(self) -> None:
+        self._loop = get_running_loop()
+        self._loop_thread_id = get_ident()
+        self._heartbeat = monotonic()
+        self._stopped.clear()
+        Thread(target=self._watch, name="lux-loop-watchdog", daemon=True).start()
+        self._logger.info(f"Monitoring event loop lag, blocks longer than {self._threshold}s are reported.")
+
+        try:
+            while True:
+                start = perf_counter()
+                await sleep(self._interval)
+                self._record(max(perf_counter() - start - self._interval, 0.0))
+        finally:
+            self._stopped.set()
+
+    def stop(self) -> None:
+        self._stopped.set()
@@ -0,0 +1,153 @@
+from array import array
+from itertools import chain, islice
+from mmap import PAGESIZE
+from pathlib import Path
+from sys import getsizeof
+from tracemalloc import Filter, is_tracing, take_snapshot
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .cog import GeneralCog
+
+if TYPE_CHECKING:
+    from typing import Iterable, Iterator
+
+    from disnake import Guild
+
+    from .bot import Lux
+
+# Objects measured per cache, the size of the others is extrapolated from them.
+SAMPLE_SIZE = 200
+_PLAIN_TYPES = (str, bytes, int, float, array)
+_PLAIN_CONTAINERS = (tuple, list, set, frozenset)
+
+
+class CacheUsage(NamedTuple):
+    name: str
+    count: int
+    # Estimated from a sample, objects shared with other caches (such as the user of a member) are not counted.
+    size: int
+
+
+def _attribute_values(obj: Any) -> "Iterator[Any]":
+    if (attributes := getattr(obj, "__dict__", None)) is not None:
+        yield from attributes.values()
+
+    for klass in type(obj).__mro__:
+        slots = vars(klass).get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name in ("__dict__", "__weakref__"):
+                continue
+            if name.startswith("__") and not name.endswith("__"):
+                name = f"_{klass.__name__.lstrip('_')}{name}"
+            yield getattr(obj, name, None)
+
+
+def _plain_size(value: Any) -> int:
+    """Size of `value` if it is plain data, with the plain data it contains."""
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, _PLAIN_TYPES):
+        return getsizeof(value)
+    if isinstance(value, dict):
+        value = chain(value.keys(), value.values(), [value])
+    elif isinstance(value, _PLAIN_CONTAINERS):
+        value = chain(value, [value])
+    else:
+        return 0
+    return sum(getsizeof(item) for item in value if isinstance(item, (*_PLAIN_TYPES, *_PLAIN_CONTAINERS, dict)))
+
+
+def object_size(obj: Any) -> int:
+    """Estimated bytes held by `obj` alone, itself and the plain data of its attributes."""
+    size = getsizeof(obj)
+    if (attributes := getattr(obj, "__dict__", None)) is not None:
+        size += getsizeof(attributes)
+    return size + sum(_plain_size(value) for value in _attribute_values(obj))
+
+
+def estimate(name: str, objects: "Iterable[Any]", count: int) -> CacheUsage:
+    if not (sample := list(islice(objects, SAMPLE_SIZE))):
+        return CacheUsage(name, count, 0)
+    return CacheUsage(name, count, sum(map(object_size, sample)) * count // len(sample))
+
+
+def _per_guild(name: str, guilds: "list[Guild]", attribute: str) -> CacheUsage:
+    caches = [getattr(guild, attribute) for guild in guilds]
+    return estimate(name, chain.from_iterable(cache.values() for cache in caches), sum(map(len, caches)))
+
+
+def disnake_caches(bot: "Lux") -> list[CacheUsage]:
+    """Object counts and estimated sizes of the caches kept by disnake."""
+    state = bot._connection
+    guilds = list(state._guilds.values())
+    messages = state._messages or ()
+
+    return [
+        estimate("guilds", guilds, len(guilds)),
+        _per_guild("members", guilds, "_members"),
+        estimate("users", list(state._users.values()), len(state._users)),
+        _per_guild("channels", guilds, "_channels"),
+        _per_guild("threads", guilds, "_threads"),
+        _per_guild("roles", guilds, "_roles"),
+        _per_guild("voice states", guilds, "_voice_states"),
+        estimate("private channels", state._private_channels.values(), len(state._private_channels)),
+        estimate("emojis", state._emojis.values(), len(state._emojis)),
+        estimate("stickers", state._stickers.values(), len(state._stickers)),
+        estimate("messages", messages, len(messages)),
+    ]
+
+
+def lux_caches(bot: "Lux") -> list[CacheUsage]:
+    """Entry counts and estimated sizes of the `GeneralCog` caches, document and guild config caches, rate limiters."""
+    cogs = [cog for cog in bot.cogs.values() if isinstance(cog, GeneralCog)]
+    caches = [cache._entries for cog in cogs for cache in cog.caches.values()]
+    if (persistence := bot.persistence) is not None:
+        caches.extend(store.cache._entries for store in persistence.stores.values())
+    caches.append(bot.guild_configs.cache._entries)
+    limiters = [limiter for cog in cogs for limiter in cog.rate_limiters.values()]
+
+    # A rate limiter keeps a float per key, in a dict and a slot of its timing wheel.
+    limiter_size = sum(
+        getsizeof(limiter._states)
+        + sum(map(getsizeof, limiter._wheel))
+        + sum(getsizeof(key) + getsizeof(state) for key, state in islice(limiter._states.items(), 1)) * len(limiter)
+        for limiter in limiters
+    )
+    cache_usage = estimate("lux caches", chain.from_iterable(cache.values() for cache in caches), sum(map(len, caches)))
+
+    return [
+        cache_usage._replace(size=cache_usage.size + sum(map(getsizeof, caches))),
+        CacheUsage("lux rate limits", sum(map(len, limiters)), limiter_size),
+    ]
+
+
+def resident_memory() -> int | None:
+    """Resident set size of this process in bytes, `None` where `/proc` is not available."""
+    try:
+        return int(Path("/proc/self/statm").read_text().split()[1]) * PAGESIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def top_allocations(limit: int) -> list[str] | None:
+    """The `limit` source lines holding the most memory, `None` when `tracemalloc` is not tracing."""
+    if not is_tracing():
+        return None
+
+    snapshot = take_snapshot().filter_traces(
+        (Filter(False, "<frozen importlib._bootstrap>"), Filter(False, "<frozen importlib._bootstrap_external>"))
+    )
+    lines = list[str]()
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        source = f"{'/'.join(Path(frame.filename).parts[-2:])}:{frame.lineno}"
+        lines.append(f"{source} {format_size(stat.size)} in {stat.count} blocks")
+    return lines
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
@@ -0,0 +1,245 @@
+from abc import ABC, abstractmethod
+from asyncio import start_server, wait_for
+from bisect import bisect_left
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from disnake import InteractionResponse
+
+if TYPE_CHECKING:
+    from asyncio import Server, StreamReader, StreamWriter
+    from typing import Any, Callable, Iterable
+
+    from disnake import Interaction
+
+# Upper bounds in seconds, roughly 1-2.5-5 steps from 1 ms to 60 s. Anything slower lands in the `+Inf` bucket.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)  # fmt: skip
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, observing a value never allocates."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the `q` quantile by interpolating inside the bucket it falls in."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if cumulative + count >= rank and count:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                if index == len(LATENCY_BUCKETS):
+                    return lower
+                return lower + (LATENCY_BUCKETS[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return LATENCY_BUCKETS[-1]
+
+
+class CommandMetrics:
+    __slots__ = ("invocations", "errors", "shed", "latency", "first_response")
+
+    def __init__(self) -> None:
+        self.invocations = 0
+        self.errors = 0
+        # Interactions turned away by admission control, they are not counted as invocations.
+        self.shed = 0
+        self.latency = Histogram()
+        self.first_response = Histogram()
+
+
+class Metrics:
+    """Dispatch metrics of application commands, kept per command and per cog."""
+
+    def __init__(self) -> None:
+        self.commands = dict[str, CommandMetrics]()
+        self.cogs = dict[str, CommandMetrics]()
+        # Current values read when rendering, by metric name.
+        self.gauges = dict[str, "Callable[[], float]"]()
+
+    def _entries(self, command: str, cog: str | None) -> "Iterable[CommandMetrics]":
+        if (entry := self.commands.get(command)) is None:
+            entry = self.commands[command] = CommandMetrics()
+        yield entry
+
+        if cog is not None:
+            if (entry := self.cogs.get(cog)) is None:
+                entry = self.cogs[cog] = CommandMetrics()
+            yield entry
+
+    def record(self, command: str, cog: str | None, duration: float) -> None:
+        for entry in self._entries(command, cog):
+            entry.invocations += 1
+            entry.latency.observe(duration)
+
+    def record_first_response(self, command: str, cog: str | None, delay: float) -> None:
+        for entry in self._entries(command, cog):
+            entry.first_response.observe(delay)
+
+    def record_error(self, command: str, cog: str | None) -> None:
+        for entry in self._entries(command, cog):
+            entry.errors += 1
+
+    def record_shed(self, command: str, cog: str | None) -> None:
+        for entry in self._entries(command, cog):
+            entry.shed += 1
+
+    def clear(self) -> None:
+        self.commands.clear()
+        self.cogs.clear()
+
+
+class TimedInteractionResponse(InteractionResponse):
+    """`InteractionResponse` calling `on_first_response` once the interaction has been responded to."""
+
+    __slots__ = ("_on_first_response",)
+
+    def __init__(self, parent: "Interaction", on_first_response: "Callable[[], None]") -> None:
+        self._on_first_response: "Callable[[], None] | None" = on_first_response
+        super().__init__(parent)
+
+    def _responded(self) -> None:
+        # A response that failed leaves the interaction unanswered, the next one is the first.
+        if self.is_done() and (on_first_response := self._on_first_response) is not None:
+            self._on_first_response = None
+            on_first_response()
+
+    async def defer(self, *args: "Any", **kwargs: "Any") -> None:
+        try:
+            await super().defer(*args, **kwargs)
+        finally:
+            self._responded()
+
+    async def send_message(self, *args: "Any", **kwargs: "Any") -> None:
+        try:
+            await super().send_message(*args, **kwargs)
+        finally:
+            self._responded()
+
+    async def edit_message(self, *args: "Any", **kwargs: "Any") -> None:
+        try:
+            await super().edit_message(*args, **kwargs)
+        finally:
+            self._responded()
+
+    async def send_modal(self, *args: "Any", **kwargs: "Any") -> None:
+        try:
+            await super().send_modal(*args, **kwargs)
+        finally:
+            self._responded()
+
+
+def time_first_response(inter: "Interaction", on_first_response: "Callable[[float], None]") -> bool:
+    """
+    Make `inter.response` a `TimedInteractionResponse`, returning whether it is. disnake offers no hook for the
+    response, it caches `inter.response` in the private `_cs_response` slot, which later versions may not have.
+    """
+    start = perf_counter()
+    response = TimedInteractionResponse(inter, lambda: on_first_response(perf_counter() - start))
+    try:
+        inter._cs_response = response  # type: ignore[attr-defined]
+    except AttributeError:
+        return False
+    return inter.response is response
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_family(lines: list[str], prefix: str, label: str, entries: "dict[str, CommandMetrics]") -> None:
+    for name in ("invocations", "errors", "shed"):
+        lines.append(f"# TYPE {prefix}_{name}_total counter")
+        lines.extend(f'{prefix}_{name}_total{{{label}="{_escape(k)}"}} {getattr(v, name)}' for k, v in entries.items())
+
+    for name in ("latency", "first_response"):
+        metric = f"{prefix}_{name}_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+
+        for key, value in entries.items():
+            histogram: Histogram = getattr(value, name)
+            labels = f'{label}="{_escape(key)}"'
+            cumulative = 0
+            for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+
+def render_prometheus(metrics: Metrics) -> str:
+    lines = list[str]()
+    _render_family(lines, "lux_command", "command", metrics.commands)
+    _render_family(lines, "lux_cog", "cog", metrics.cogs)
+    for name, gauge in metrics.gauges.items():
+        lines.append(f"# TYPE lux_{name} gauge")
+        lines.append(f"lux_{name} {gauge()}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter(ABC):
+    """Base class of metrics exporters, `Lux` starts them after initialization and stops them on close."""
+
+    @abstractmethod
+    async def start(self, metrics: Metrics) -> None:
+        ...
+
+    async def stop(self) -> None:
+        return None
+
+
+class PrometheusExporter(MetricsExporter):
+    """Serve metrics in the Prometheus text format on `http://{host}:{port}/metrics`."""
+
+    def __init__(self, port: int, host: str = DEFAULT_METRICS_HOST) -> None:
+        self._host = host
+        self._port = port
+        self._metrics: Metrics | None = None
+        self._server: "Server | None" = None
+
+    async def _handle(self, reader: "StreamReader", writer: "StreamWriter") -> None:
+        try:
+            request_line = await wait_for(reader.readline(), 5)
+            while await wait_for(reader.readline(), 5) not in (b"\r\n", b"\n", b""):
+                pass
+
+            if request_line.split(b" ")[1:2] in ([b"/metrics"], [b"/"]) and self._metrics is not None:
+                status, body = "200 OK", render_prometheus(self._metrics).encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, metrics: Metrics) -> None:
+        self._metrics = metrics
+        self._server = await start_server(self._handle, self._host, self._port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
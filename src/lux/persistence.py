@@ -0,0 +1,384 @@
+from abc import ABC, abstractmethod
+from asyncio import Event, Lock, create_task, sleep, to_thread
+from copy import deepcopy
+from json import dumps, loads
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from .cache import AsyncCache, CacheSettings
+from .config import DEFAULT_PERSISTENCE_BATCH_SIZE, DEFAULT_PERSISTENCE_FLUSH_INTERVAL, DEFAULT_PERSISTENCE_POOL_SIZE
+from .logger import default_logger
+from .tracing import trace
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from logging import Logger
+    from sqlite3 import Connection
+    from typing import Callable, Iterable, TypeVar
+
+    from .config import BotConfig
+
+    _R = TypeVar("_R")
+
+Document = dict[str, Any]
+DEFAULT_SQLITE_PATH = Path("lux.sqlite3")
+
+
+class PersistenceBackend(ABC):
+    """Base class of persistence backends, storing JSON-like documents by collection and key."""
+
+    async def connect(self) -> None:
+        return None
+
+    @abstractmethod
+    async def load(self, collection: str, key: str) -> Document | None:
+        ...
+
+    @abstractmethod
+    async def write(self, collection: str, documents: dict[str, Document | None]) -> None:
+        """Store `documents` in one batch, deleting those that are `None`."""
+
+    async def close(self) -> None:
+        return None
+
+
+class MemoryBackend(PersistenceBackend):
+    """Documents kept in this process only, for tests and local runs."""
+
+    def __init__(self) -> None:
+        self.collections = dict[str, dict[str, Document]]()
+        self.batches = 0
+
+    async def load(self, collection: str, key: str) -> Document | None:
+        document = self.collections.get(collection, {}).get(key)
+        return deepcopy(document) if document is not None else None
+
+    async def write(self, collection: str, documents: dict[str, Document | None]) -> None:
+        stored = self.collections.setdefault(collection, {})
+        for key, document in documents.items():
+            if document is None:
+                stored.pop(key, None)
+            else:
+                stored[key] = deepcopy(document)
+        self.batches += 1
+
+
+class SQLiteBackend(PersistenceBackend):
+    """
+    Documents as JSON in one table of a SQLite database, for local runs.
+
+    SQLite writes one transaction at a time, so there is a single connection, used by one thread at a time.
+    """
+
+    def __init__(self, path: Path = DEFAULT_SQLITE_PATH) -> None:
+        self._path = path
+        self._connection: "Connection | None" = None
+        self._lock = Lock()
+
+    def _connect(self) -> "Connection":
+        # Imported here, most bots never use this backend.
+        from sqlite3 import connect
+
+        connection = connect(self._path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents "
+            "(collection TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (collection, key)) "
+            "WITHOUT ROWID"
+        )
+        return connection
+
+    async def _run(self, func: "Callable[..., _R]", *args: Any) -> "_R":
+        async with self._lock:
+            return await to_thread(func, *args)
+
+    async def connect(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = await self._run(self._connect)
+
+    def _load(self, collection: str, key: str) -> Document | None:
+        assert self._connection is not None
+        query = "SELECT value FROM documents WHERE collection = ? AND key = ?"
+        row = self._connection.execute(query, (collection, key)).fetchone()
+        return loads(row[0]) if row is not None else None
+
+    async def load(self, collection: str, key: str) -> Document | None:
+        return await self._run(self._load, collection, key)
+
+    def _write(self, collection: str, documents: dict[str, Document | None]) -> None:
+        assert self._connection is not None
+        # Encoded in the thread as well, large batches would block the event loop.
+        upserts = [(collection, key, dumps(document)) for key, document in documents.items() if document is not None]
+        deletes = [(collection, key) for key, document in documents.items() if document is None]
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO documents VALUES (?, ?, ?) "
+                "ON CONFLICT (collection, key) DO UPDATE SET value = excluded.value",
+                upserts,
+            )
+            self._connection.executemany("DELETE FROM documents WHERE collection = ? AND key = ?", deletes)
+
+    async def write(self, collection: str, documents: dict[str, Document | None]) -> None:
+        await self._run(self._write, collection, documents)
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+
+
+class MongoBackend(PersistenceBackend):
+    """
+    Documents in MongoDB, a collection each, through one pooled Motor client.
+
+    The beanie `document_models` added before connecting are initialized on the same client, so cogs can use beanie
+    documents without opening a client of their own.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        database: str,
+        pool_size: int = DEFAULT_PERSISTENCE_POOL_SIZE,
+        document_models: "Iterable[type]" = (),
+    ) -> None:
+        self._url = url
+        self._database = database
+        self._pool_size = pool_size
+        self._client: Any = None
+        self.document_models = list(document_models)
+
+    @property
+    def database(self) -> Any:
+        if self._client is None:
+            raise RuntimeError("The MongoDB backend is not connected.")
+        return self._client[self._database]
+
+    async def connect(self) -> None:
+        try:
+            from beanie import init_beanie
+            from motor.motor_asyncio import AsyncIOMotorClient
+        except ImportError as e:
+            default_logger.exception("The MongoDB backend needs the 'mongodb' extra.", exc_info=e)
+            raise e
+
+        self._client = AsyncIOMotorClient(self._url, maxPoolSize=self._pool_size)
+        if self.document_models:
+            await init_beanie(database=self.database, document_models=self.document_models)
+
+    async def load(self, collection: str, key: str) -> Document | None:
+        if (document := await self.database[collection].find_one({"_id": key})) is not None:
+            del document["_id"]
+        return document
+
+    async def write(self, collection: str, documents: dict[str, Document | None]) -> None:
+        from pymongo import DeleteOne, ReplaceOne
+
+        requests = [
+            DeleteOne({"_id": key}) if document is None else ReplaceOne({"_id": key}, document, upsert=True)
+            for key, document in documents.items()
+        ]
+        await self.database[collection].bulk_write(requests, ordered=False)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def backend_from_config(bot_config: "BotConfig") -> PersistenceBackend | None:
+    if (backend := bot_config.persistence_backend) is None:
+        return None
+    if backend == "memory":
+        return MemoryBackend()
+    if backend == "sqlite":
+        return SQLiteBackend(Path(url) if (url := bot_config.persistence_url) else DEFAULT_SQLITE_PATH)
+
+    if (url := bot_config.persistence_url) is None:
+        message = "The MongoDB backend needs 'persistence_url'."
+        default_logger.error(message)
+        raise ValueError(message)
+    return MongoBackend(url, bot_config.persistence_database, bot_config.persistence_pool_size)
+
+
+class DocumentStore:
+    """
+    Documents of one collection by key, read through a cache and written behind.
+
+    A write lands in the cache at once and is queued, only the latest one of each key is kept. `Persistence` flushes
+    the queue in one batch every interval, once it holds a batch worth of documents, and when `Lux` closes. Documents
+    are shared with the cache, change them with `set` or `update` rather than in place.
+    """
+
+    def __init__(self, persistence: "Persistence", collection: str, cache: AsyncCache) -> None:
+        self._persistence = persistence
+        self._collection = collection
+        self._cache = cache
+        self._pending = dict[str, Document | None]()
+        # The batch being written, reads of its keys must not load what the backend held before it.
+        self._writing = dict[str, Document | None]()
+        self._flush_lock = Lock()
+        self._flush_scheduled = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def collection(self) -> str:
+        return self._collection
+
+    @property
+    def cache(self) -> AsyncCache:
+        return self._cache
+
+    async def get(self, key: str | int) -> Document | None:
+        key = str(key)
+        if key in self._pending:
+            return self._pending[key]
+        if key in self._writing:
+            return self._writing[key]
+        return await self._cache.get_or_call(key, lambda: self._persistence.load(self._collection, key))
+
+    def set(self, key: str | int, document: Document | None) -> None:
+        """Queue `document` to be written, or the deletion of `key` if it is `None`."""
+        key = str(key)
+        self._pending[key] = document
+        self._cache.set(key, document)
+
+        if len(self._pending) >= self._persistence.batch_size and not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._persistence.schedule_flush(self)
+
+    def delete(self, key: str | int) -> None:
+        self.set(key, None)
+
+    async def update(self, key: str | int, **changes: Any) -> Document:
+        """Merge `changes` into the document of `key`, creating it if needed."""
+        document = (await self.get(key) or {}) | changes
+        self.set(key, document)
+        return document
+
+    async def flush(self) -> int:
+        # One batch at a time, so an older batch can not overwrite a newer one.
+        async with self._flush_lock:
+            self._flush_scheduled = False
+            if not self._pending:
+                return 0
+
+            self._writing, self._pending = self._pending, {}
+            try:
+                await self._persistence.write(self._collection, self._writing)
+            except Exception:
+                # Kept for the next flush, unless written again meanwhile.
+                self._pending = self._writing | self._pending
+                raise
+            finally:
+                written, self._writing = len(self._writing), {}
+            return written
+
+
+class Persistence:
+    """One backend connection shared by every cog, and the document stores written behind to it."""
+
+    def __init__(
+        self,
+        backend: PersistenceBackend,
+        flush_interval: float = DEFAULT_PERSISTENCE_FLUSH_INTERVAL,
+        batch_size: int = DEFAULT_PERSISTENCE_BATCH_SIZE,
+        logger: "Logger | None" = None,
+    ) -> None:
+        self._backend = backend
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._logger = logger or default_logger
+        self._stores = dict[str, DocumentStore]()
+        self._connected = Event()
+        self._connect_error: BaseException | None = None
+        self._closed = False
+        self._flush_tasks = set["Task[None]"]()
+
+    @property
+    def backend(self) -> PersistenceBackend:
+        return self._backend
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def stores(self) -> dict[str, DocumentStore]:
+        return self._stores
+
+    def documents(self, collection: str, cache_settings: CacheSettings = CacheSettings()) -> DocumentStore:
+        """The store of `collection`, its cache created with `cache_settings` on first use."""
+        if (store := self._stores.get(collection)) is None:
+            store = self._stores[collection] = DocumentStore(self, collection, AsyncCache(cache_settings))
+        return store
+
+    async def _wait_connected(self) -> None:
+        await self._connected.wait()
+        if self._connect_error is not None:
+            raise self._connect_error
+
+    async def load(self, collection: str, key: str) -> Document | None:
+        await self._wait_connected()
+        with trace(f"persistence load {collection}"):
+            return await self._backend.load(collection, key)
+
+    async def write(self, collection: str, documents: dict[str, Document | None]) -> None:
+        await self._wait_connected()
+        await self._backend.write(collection, documents)
+
+    async def _flush_store(self, store: DocumentStore) -> int:
+        try:
+            return await store.flush()
+        except Exception as e:
+            self._logger.exception(f"Failed while writing collection '{store.collection}'.", exc_info=e)
+            return 0
+
+    def schedule_flush(self, store: DocumentStore) -> None:
+        task = create_task(self._flush_store(store))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> int:
+        """Write what every store has queued, returning how many documents were written."""
+        written = 0
+        for store in list(self._stores.values()):
+            written += await self._flush_store(store)
+        return written
+
+    async def connect(self) -> None:
+        start = perf_counter()
+        try:
+            await self._backend.connect()
+        except Exception as e:
+            self._connect_error = e
+            self._logger.exception(f"Failed while connecting '{self._backend.__class__.__name__}'.", exc_info=e)
+        else:
+            self._logger.info(
+                f"Connected '{self._backend.__class__.__name__}' in {(perf_counter() - start) * 1000:.1f} ms."
+            )
+        finally:
+            self._connected.set()
+
+    async def run(self) -> None:
+        await self.connect()
+        while not self._closed and self._connect_error is None:
+            await sleep(self._flush_interval)
+            await self.flush()
+
+    async def close(self) -> None:
+        self._closed = True
+        # Flushes scheduled by full batches, they never raise.
+        for task in list(self._flush_tasks):
+            await task
+
+        if self._connected.is_set() and self._connect_error is None:
+            written = await self.flush()
+            self._logger.info(f"Wrote {written} pending documents before closing.")
+        elif pending := sum(map(len, self._stores.values())):
+            self._logger.warning(f"Dropping {pending} pending documents, the backend is not connected.")
+        await self._backend.close()
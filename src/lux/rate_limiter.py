@@ -0,0 +1,230 @@
+from abc import ABC, abstractmethod
+from enum import StrEnum
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+from disnake.ext.commands import BucketType, CommandOnCooldown, Cooldown, check
+from pydantic import ConfigDict, Field
+from pydantic.dataclasses import dataclass
+
+if TYPE_CHECKING:
+    from typing import Callable, TypeVar
+
+    from disnake import ApplicationCommandInteraction
+
+    _T = TypeVar("_T")
+
+# Key of a cog config section holding a table of rate limits, by name, overriding the decorator arguments.
+RATE_LIMITS_KEY = "rate_limits"
+DEFAULT_WHEEL_RESOLUTION = 1.0
+DEFAULT_WHEEL_SIZE = 512
+
+
+class RateLimitScope(StrEnum):
+    USER = "user"
+    GUILD = "guild"
+    CHANNEL = "channel"
+
+
+class RateLimitKind(StrEnum):
+    TOKEN_BUCKET = "token_bucket"
+    FIXED_WINDOW = "fixed_window"
+
+
+@dataclass(frozen=True, config=ConfigDict(defer_build=True))
+class RateLimit:
+    rate: int = Field(ge=1)
+    per: float = Field(gt=0)
+    scope: RateLimitScope = RateLimitScope.USER
+    kind: RateLimitKind = RateLimitKind.TOKEN_BUCKET
+
+
+_BUCKET_TYPES = {
+    RateLimitScope.USER: BucketType.user,
+    RateLimitScope.GUILD: BucketType.guild,
+    RateLimitScope.CHANNEL: BucketType.channel,
+}
+
+
+def scope_key(inter: "ApplicationCommandInteraction", scope: RateLimitScope) -> int:
+    if scope is RateLimitScope.GUILD:
+        # Direct messages are limited per user, like disnake does for guild buckets.
+        return inter.guild_id or inter.author.id
+    if scope is RateLimitScope.CHANNEL:
+        return inter.channel_id
+    return inter.author.id
+
+
+class RateLimiter(ABC):
+    """
+    Rate limit state of many keys, one float per key in a plain dict instead of an object per key.
+
+    Keys whose limit has fully recovered are dropped by a timing wheel, only the wheel slots that passed since the
+    previous hit are looked at. Keys due in a later round of the wheel are put back into their slot when it comes up.
+    """
+
+    __slots__ = ("_settings", "_resolution", "_states", "_wheel", "_tick")
+
+    def __init__(
+        self, settings: RateLimit, resolution: float = DEFAULT_WHEEL_RESOLUTION, wheel_size: int = DEFAULT_WHEEL_SIZE
+    ) -> None:
+        self._settings = settings
+        self._resolution = resolution
+        self._states = dict[int, float]()
+        self._wheel = [list[int]() for _ in range(wheel_size)]
+        # Set by the first hit, `now` is not required to come from `monotonic`.
+        self._tick = -1
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @property
+    def settings(self) -> RateLimit:
+        return self._settings
+
+    @abstractmethod
+    def _hit(self, key: int, state: float | None, now: float) -> float:
+        ...
+
+    @abstractmethod
+    def _expires_at(self, state: float) -> float:
+        ...
+
+    def _schedule(self, key: int, expires_at: float) -> None:
+        # Never in a slot that already passed, it would only be looked at a round later.
+        tick = max(int(expires_at / self._resolution), self._tick + 1)
+        self._wheel[tick % len(self._wheel)].append(key)
+
+    def _advance(self, now: float) -> None:
+        if (target := int(now / self._resolution)) <= self._tick:
+            return
+        previous, self._tick = self._tick, target
+        if previous < 0:
+            return
+
+        wheel, states = self._wheel, self._states
+        # Past one round every slot has been looked at, later ticks would find them empty. Keys not expired yet are
+        # scheduled again from `target`, however many rounds the jump skipped.
+        for tick in range(previous + 1, min(target, previous + len(wheel)) + 1):
+            keys, wheel[tick % len(wheel)] = wheel[tick % len(wheel)], []
+
+            for key in keys:
+                if (state := states.get(key)) is None:
+                    continue
+                if (expires_at := self._expires_at(state)) <= now:
+                    del states[key]
+                else:
+                    self._schedule(key, expires_at)
+
+    def hit(self, key: int, now: float | None = None) -> float:
+        """Count one use by `key`, return 0 if it is allowed, otherwise the seconds until it would be."""
+        now = monotonic() if now is None else now
+        self._advance(now)
+
+        state = self._states.get(key)
+        retry_after = self._hit(key, state, now)
+        # A key is in the wheel once, it is rescheduled when its slot comes up before it expired.
+        if state is None:
+            self._schedule(key, self._expires_at(self._states[key]))
+        return retry_after
+
+    def reset(self, key: int) -> None:
+        """Forget the uses of `key`, searching the wheel for it rather than keeping the slot of every key."""
+        if self._states.pop(key, None) is None:
+            return
+        for keys in self._wheel:
+            if key in keys:
+                keys.remove(key)
+                return
+
+    def clear(self) -> None:
+        self._states.clear()
+        self._wheel = [list[int]() for _ in self._wheel]
+
+
+class TokenBucket(RateLimiter):
+    """
+    Allow bursts of `rate` uses, refilled continuously over `per` seconds.
+
+    The state is the time the bucket will be full again (GCRA), so refilling needs no second value.
+    """
+
+    __slots__ = ()
+
+    def _hit(self, key: int, state: float | None, now: float) -> float:
+        settings = self._settings
+        interval = settings.per / settings.rate
+        full_at = now if state is None or state < now else state
+
+        if (wait := full_at - now - (settings.per - interval)) > 0:
+            return wait
+        self._states[key] = full_at + interval
+        return 0.0
+
+    def _expires_at(self, state: float) -> float:
+        return state
+
+
+class FixedWindow(RateLimiter):
+    """
+    Allow `rate` uses per window of `per` seconds, windows are aligned to multiples of `per`.
+
+    The state packs the window and the count into one float, `window * (rate + 1) + count`.
+    """
+
+    __slots__ = ()
+
+    def _hit(self, key: int, state: float | None, now: float) -> float:
+        settings = self._settings
+        window = now // settings.per
+        base = window * (settings.rate + 1)
+        count = state - base if state is not None and state >= base else 0.0
+
+        if count >= settings.rate:
+            return (window + 1) * settings.per - now
+        self._states[key] = base + count + 1
+        return 0.0
+
+    def _expires_at(self, state: float) -> float:
+        settings = self._settings
+        return (state // (settings.rate + 1) + 1) * settings.per
+
+
+def make_rate_limiter(settings: RateLimit) -> RateLimiter:
+    return (TokenBucket if settings.kind is RateLimitKind.TOKEN_BUCKET else FixedWindow)(settings)
+
+
+def rate_limit(
+    name: str | None = None,
+    *,
+    rate: int,
+    per: float,
+    scope: RateLimitScope | str = RateLimitScope.USER,
+    kind: RateLimitKind | str = RateLimitKind.TOKEN_BUCKET,
+) -> "Callable[[_T], _T]":
+    """
+    Limit how often an application command can be used per user, guild or channel.
+
+    The arguments are the defaults of the limit `name` (the qualified command name if omitted), the `rate_limits`
+    table of the cog config section overrides them, for example `rate_limits = { search = { rate = 10 } }`.
+    Exceeding the limit raises `CommandOnCooldown`, like disnake cooldowns.
+    """
+    defaults = RateLimit(rate, per, RateLimitScope(scope), RateLimitKind(kind))
+    fallback = dict[str, RateLimiter]()
+
+    def predicate(inter: "ApplicationCommandInteraction") -> bool:
+        command = inter.application_command
+        limit_name = name or command.qualified_name
+        cog: Any = command.cog
+
+        if (get_rate_limiter := getattr(cog, "get_rate_limiter", None)) is not None:
+            limiter: RateLimiter = get_rate_limiter(limit_name, defaults)
+        elif (limiter := fallback.get(limit_name)) is None:  # type: ignore[assignment]
+            limiter = fallback[limit_name] = make_rate_limiter(defaults)
+
+        settings = limiter.settings
+        if retry_after := limiter.hit(scope_key(inter, settings.scope)):
+            raise CommandOnCooldown(Cooldown(settings.rate, settings.per), retry_after, _BUCKET_TYPES[settings.scope])
+        return True
+
+    return check(predicate)
@@ -0,0 +1,389 @@
+from abc import ABC, abstractmethod
+from asyncio import Event, TimeoutError, create_task, wait_for
+from datetime import datetime, timedelta, timezone
+from enum import StrEnum
+from heapq import heappop, heappush
+from itertools import count
+from random import uniform
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any
+
+from .logger import default_logger
+from .metrics import Histogram
+
+if TYPE_CHECKING:
+    from asyncio import Task
+    from datetime import tzinfo
+    from logging import Logger
+    from typing import Awaitable, Callable, TypeVar
+
+    from .tracing import Tracer
+
+    _F = TypeVar("_F", bound=Callable[..., Any])
+
+# Missed slots looked at when a job is late, a job later than this many slots only catches up on this many.
+MAX_MISSED_RUNS = 1000
+# Years a cron expression is searched for a matching minute, `0 0 30 2 *` never matches.
+_CRON_SEARCH_YEARS = 5
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class MissedRunPolicy(StrEnum):
+    # Runs are missed when a job is so late its next slot already passed, or when it is running `max_concurrency`
+    # times already.
+    SKIP = "skip"
+    COALESCE = "coalesce"
+    CATCH_UP = "catch_up"
+
+
+class Trigger(ABC):
+    """Base class of job triggers, they give the time (from `time`) of the slot after `previous`."""
+
+    @abstractmethod
+    def next_run(self, previous: float | None, now: float) -> float | None:
+        ...
+
+
+class IntervalTrigger(Trigger):
+    def __init__(self, seconds: float) -> None:
+        if seconds <= 0:
+            raise ValueError(f"Interval must be positive, got {seconds}.")
+        self.seconds = seconds
+
+    def next_run(self, previous: float | None, now: float) -> float | None:
+        # Slots follow each other from the first one, however long runs take, so they do not drift.
+        return (now if previous is None else previous) + self.seconds
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds}s"
+
+
+class OnceTrigger(Trigger):
+    def __init__(self, at: float) -> None:
+        self.at = at
+
+    def next_run(self, previous: float | None, now: float) -> float | None:
+        return self.at if previous is None else None
+
+    def __repr__(self) -> str:
+        return f"at {datetime.fromtimestamp(self.at).isoformat(timespec='seconds')}"
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> frozenset[int]:
+    values = set[int]()
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = map(int, part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step else start
+        if not low <= start <= end <= high or (step and int(step) < 1):
+            raise ValueError(f"Invalid cron field '{field}'.")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+class CronTrigger(Trigger):
+    """
+    Cron expression, `minute hour day month weekday`, with `*`, lists, ranges and steps. Weekdays start with Sunday
+    as 0 (or 7) and, as in cron, a day matches if either the day or the weekday does when both are restricted.
+    """
+
+    def __init__(self, expression: str, tz: "tzinfo" = timezone.utc) -> None:
+        if len(fields := expression.split()) != 5:
+            raise ValueError(f"Cron expression '{expression}' must have 5 fields.")
+
+        self.expression = expression
+        self._tz = tz
+        minutes, hours, days, months, weekdays = (
+            _parse_cron_field(field, low, high) for field, (low, high) in zip(fields, _CRON_FIELDS)
+        )
+        self._minutes, self._hours, self._days, self._months = minutes, hours, days, months
+        self._weekdays = frozenset(day % 7 for day in weekdays)
+        self._any_day, self._any_weekday = fields[2] == "*", fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day, weekday = moment.day in self._days, (moment.weekday() + 1) % 7 in self._weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_run(self, previous: float | None, now: float) -> float | None:
+        start = datetime.fromtimestamp(now if previous is None else previous, self._tz)
+        moment = start.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+        # Whole months, days and hours are skipped at once, only the minutes of a matching hour are walked.
+        while moment.year <= start.year + _CRON_SEARCH_YEARS:
+            if moment.month not in self._months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self._hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self._minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        return None
+
+    def __repr__(self) -> str:
+        return f"cron '{self.expression}'"
+
+
+def make_trigger(
+    every: float | None = None, cron: str | None = None, at: "datetime | float | None" = None
+) -> Trigger:
+    if sum(value is not None for value in (every, cron, at)) != 1:
+        raise ValueError("Exactly one of 'every', 'cron' and 'at' must be given.")
+    if every is not None:
+        return IntervalTrigger(every)
+    if cron is not None:
+        return CronTrigger(cron)
+    return OnceTrigger(at.timestamp() if isinstance(at, datetime) else at)  # type: ignore[arg-type]
+
+
+class JobStats:
+    __slots__ = ("runs", "failures", "missed", "duration", "last_run", "last_error")
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.failures = 0
+        self.missed = 0
+        self.duration = Histogram()
+        self.last_run: float | None = None
+        self.last_error: str | None = None
+
+
+class Job:
+    """
+    A callback run by `Scheduler` on the slots of its trigger.
+
+    Each run starts up to `jitter` seconds after its slot, at random, so jobs sharing slots do not all start at once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        callback: "Callable[[], Awaitable[Any]]",
+        trigger: Trigger,
+        *,
+        jitter: float = 0.0,
+        max_concurrency: int = 1,
+        missed: MissedRunPolicy = MissedRunPolicy.COALESCE,
+        owner: str | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError(f"'max_concurrency' must be at least 1, got {max_concurrency}.")
+
+        self.name = name
+        self.callback = callback
+        self.trigger = trigger
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.missed = MissedRunPolicy(missed)
+        # Jobs of an owner (the cog that scheduled them) are cancelled with it.
+        self.owner = owner
+        self.stats = JobStats()
+        self.slot: float | None = None
+        self.next_run: float | None = None
+        self.pending = 0
+        self.cancelled = False
+        self.tasks = set["Task[None]"]()
+
+    @property
+    def running(self) -> int:
+        return len(self.tasks)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self.pending = 0
+        for task in list(self.tasks):
+            task.cancel()
+
+    def __repr__(self) -> str:
+        return f"<Job {self.name} {self.trigger!r}>"
+
+
+class Scheduler:
+    """
+    Run the jobs of every cog from one task and one heap of their next runs, instead of a sleeping task per job.
+    """
+
+    def __init__(self, tracer: "Tracer | None" = None, logger: "Logger | None" = None) -> None:
+        self._tracer = tracer
+        self._logger = logger or default_logger
+        self._jobs = dict[str, Job]()
+        self._heap = list[tuple[float, int, Job]]()
+        self._order = count()
+        self._wakeup = Event()
+        self._closed = False
+
+    @property
+    def jobs(self) -> dict[str, Job]:
+        return self._jobs
+
+    def _push(self, job: Job, now: float) -> None:
+        if (slot := job.trigger.next_run(job.slot, now)) is None:
+            # No slot left, the job is dropped once its runs are done.
+            job.next_run = None
+            self._drop_if_done(job)
+            return
+
+        job.slot = slot
+        job.next_run = slot + (uniform(0.0, job.jitter) if job.jitter > 0 else 0.0)
+        heappush(self._heap, (job.next_run, next(self._order), job))
+        self._wakeup.set()
+
+    def _drop_if_done(self, job: Job) -> None:
+        if job.next_run is None and not job.running and not job.pending and self._jobs.get(job.name) is job:
+            del self._jobs[job.name]
+
+    def add(self, job: Job) -> Job:
+        """Schedule `job`, replacing the job of the same name."""
+        if (previous := self._jobs.get(job.name)) is not None:
+            previous.cancel()
+        self._jobs[job.name] = job
+        self._push(job, time())
+        return job
+
+    def schedule(self, name: str, callback: "Callable[[], Awaitable[Any]]", **options: Any) -> Job:
+        """Schedule `callback` as the job `name`, see `make_trigger` and `Job` for the options."""
+        every, cron, at = options.pop("every", None), options.pop("cron", None), options.pop("at", None)
+        return self.add(Job(name, callback, make_trigger(every, cron, at), **options))
+
+    def cancel(self, name: str) -> bool:
+        if (job := self._jobs.pop(name, None)) is None:
+            return False
+        job.cancel()
+        return True
+
+    def cancel_owner(self, owner: str) -> int:
+        names = [name for name, job in self._jobs.items() if job.owner == owner]
+        for name in names:
+            self.cancel(name)
+        return len(names)
+
+    def _start(self, job: Job) -> None:
+        job.pending -= 1
+        task = create_task(self._run(job), name=f"lux job {job.name}")
+        job.tasks.add(task)
+        task.add_done_callback(lambda task: self._finish(job, task))
+
+    def _finish(self, job: Job, task: "Task[None]") -> None:
+        job.tasks.discard(task)
+        if job.cancelled:
+            return
+        if job.pending and job.running < job.max_concurrency:
+            self._start(job)
+        else:
+            self._drop_if_done(job)
+
+    async def _run(self, job: Job) -> None:
+        stats = job.stats
+        stats.last_run = time()
+        start = perf_counter()
+        scope = self._tracer.start(f"job {job.name}") if self._tracer is not None else None
+
+        try:
+            if scope is not None:
+                with scope:
+                    await job.callback()
+            else:
+                await job.callback()
+        except Exception as e:
+            stats.failures += 1
+            stats.last_error = f"{e.__class__.__name__}: {e}"
+            self._logger.exception(f"Job '{job.name}' failed.", exc_info=e)
+        finally:
+            stats.runs += 1
+            stats.duration.observe(perf_counter() - start)
+
+    def _fire(self, job: Job, now: float) -> None:
+        # Slots that passed while the job was waiting, the loop was blocked or the bot was busy. Jitter delays a run
+        # by up to `jitter`, a slot is only missed once that much time passed after it.
+        missed = 0
+        slot = job.slot
+        while (
+            missed < MAX_MISSED_RUNS
+            and (following := job.trigger.next_run(slot, now)) is not None
+            and following + job.jitter <= now
+        ):
+            missed += 1
+            slot = following
+        job.slot = slot
+
+        if not missed:
+            job.pending += 1
+        elif job.missed is MissedRunPolicy.SKIP:
+            job.stats.missed += missed + 1
+        elif job.missed is MissedRunPolicy.COALESCE:
+            job.pending += 1
+            job.stats.missed += missed
+        else:
+            job.pending += missed + 1
+
+        while job.pending and job.running < job.max_concurrency:
+            self._start(job)
+        # The runs that still have to wait for a running one.
+        if job.pending and job.missed is MissedRunPolicy.SKIP:
+            job.stats.missed += job.pending
+            job.pending = 0
+        elif job.pending > 1 and job.missed is MissedRunPolicy.COALESCE:
+            job.stats.missed += job.pending - 1
+            job.pending = 1
+
+        self._push(job, now)
+
+    async def run(self) -> None:
+        while not self._closed:
+            self._wakeup.clear()
+            now = time()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, job = heappop(self._heap)
+                if not job.cancelled:
+                    self._fire(job, now)
+
+            try:
+                await wait_for(self._wakeup.wait(), self._heap[0][0] - now if self._heap else None)
+            except TimeoutError:
+                pass
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        for job in self._jobs.values():
+            job.cancel()
+        self._jobs.clear()
+
+
+def scheduled(
+    *,
+    every: float | None = None,
+    cron: str | None = None,
+    at: "datetime | float | None" = None,
+    jitter: float = 0.0,
+    max_concurrency: int = 1,
+    missed: MissedRunPolicy = MissedRunPolicy.COALESCE,
+) -> "Callable[[_F], _F]":
+    """
+    Run an async `GeneralCog` method on a schedule while the cog is loaded, every `every` seconds, on the `cron`
+    expression or once `at` a time. The job is named after the cog and the method.
+    """
+    make_trigger(every, cron, at)
+    options = {
+        "every": every,
+        "cron": cron,
+        "at": at,
+        "jitter": jitter,
+        "max_concurrency": max_concurrency,
+        "missed": missed,
+    }
+
+    def decorator(func: "_F") -> "_F":
+        func.__lux_schedule__ = options  # type: ignore[attr-defined]
+        return func
+
+    return decorator
@@ -0,0 +1,248 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from functools import wraps
+from inspect import iscoroutinefunction
+from json import dumps
+from random import getrandbits, random
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any
+
+from .config import DEFAULT_TRACE_BUFFER_SIZE
+from .context_var import current_span
+from .logger import default_logger
+
+if TYPE_CHECKING:
+    from contextvars import Token
+    from pathlib import Path
+    from types import TracebackType
+    from typing import Callable, Iterable, TypeVar
+
+    _F = TypeVar("_F", bound=Callable[..., Any])
+
+
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "started_at", "start", "duration", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: int | None, attributes: dict[str, Any]) -> None:
+        self.trace = trace
+        self.name = name
+        self.span_id = getrandbits(64)
+        self.parent_id = parent_id
+        self.started_at = time()
+        self.start = perf_counter()
+        # `None` until the span ends.
+        self.duration: float | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: BaseException | None = None) -> None:
+        self.duration = perf_counter() - self.start
+        if error is not None:
+            self.error = f"{error.__class__.__name__}: {error}"
+        if self.parent_id is None:
+            self.trace.tracer.export(self.trace)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": f"{self.span_id:016x}",
+            "parent_id": f"{self.parent_id:016x}" if self.parent_id is not None else None,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """
+    Spans of one interaction, the first one is the root.
+
+    Spans still running when the root ends, such as those of tasks it did not wait for, are not exported.
+    """
+
+    __slots__ = ("tracer", "trace_id", "spans")
+
+    def __init__(self, tracer: "Tracer") -> None:
+        self.tracer = tracer
+        self.trace_id = getrandbits(128)
+        self.spans = list[Span]()
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration or 0.0
+
+    def start_span(self, name: str, parent_id: int | None, attributes: dict[str, Any]) -> Span:
+        span = Span(self, name, parent_id, attributes)
+        # Appending is atomic, spans of executor threads are added safely.
+        self.spans.append(span)
+        return span
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"trace_id": f"{self.trace_id:032x}", "spans": [span.to_dict() for span in self.spans]}
+
+    def format(self) -> str:
+        """The spans as a tree, with their start offset from the root and their duration in ms."""
+        root = self.root
+        depths = {root.span_id: 0}
+        lines = list[str]()
+
+        for span in sorted(self.spans, key=lambda span: span.start):
+            depth = depths[span.span_id] = depths.get(span.parent_id, 0) + 1 if span is not root else 0
+            duration = f"{span.duration * 1000:>8.1f}" if span.duration is not None else f"{'running':>8}"
+            error = f" ! {span.error}" if span.error else ""
+            lines.append(f"{(span.start - root.start) * 1000:>8.1f} {duration} {'  ' * depth}{span.name}{error}")
+        return "\n".join(lines)
+
+
+class SpanScope:
+    """
+    Context manager and decorator running code in a span, the child of the current span.
+
+    Without a current span, outside interactions or in traces that were not sampled, it does nothing.
+    """
+
+    __slots__ = ("_name", "_attributes", "_tracer", "_span", "_token")
+
+    def __init__(self, name: str, attributes: dict[str, Any], tracer: "Tracer | None" = None) -> None:
+        self._name = name
+        self._attributes = attributes
+        # Given for root spans only, which start a new trace.
+        self._tracer = tracer
+        self._span: Span | None = None
+        self._token: "Token[Span | None] | None" = None
+
+    def __enter__(self) -> Span | None:
+        if self._tracer is not None:
+            if self._tracer.sampled():
+                self._span = Trace(self._tracer).start_span(self._name, None, self._attributes)
+        elif (parent := current_span.get()) is not None:
+            self._span = parent.trace.start_span(self._name, parent.span_id, self._attributes)
+
+        if self._span is not None:
+            self._token = current_span.set(self._span)
+        return self._span
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: "TracebackType | None"
+    ) -> None:
+        if self._span is not None and self._token is not None:
+            current_span.reset(self._token)
+            self._span.end(exc)
+
+    async def __aenter__(self) -> Span | None:
+        return self.__enter__()
+
+    async def __aexit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: "TracebackType | None"
+    ) -> None:
+        self.__exit__(exc_type, exc, traceback)
+
+    def __call__(self, func: "_F") -> "_F":
+        name, attributes = self._name, self._attributes
+
+        # Every call gets its own scope, a scope only holds one span at a time.
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with SpanScope(name, attributes.copy()):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with SpanScope(name, attributes.copy()):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+
+def trace(name: str, **attributes: Any) -> SpanScope:
+    """
+    Time a block (`with trace("fetch"):`) or every call of a function (`@trace("fetch")`) as a span of the current
+    trace. Spans follow the context into tasks and `offload` threads, so they nest under the span that started them.
+    """
+    return SpanScope(name, attributes)
+
+
+class TraceExporter(ABC):
+    """Base class of trace exporters, `Tracer` hands them every finished trace on the event loop."""
+
+    @abstractmethod
+    def export(self, trace: Trace) -> None:
+        ...
+
+    def close(self) -> None:
+        return None
+
+
+class RingBufferExporter(TraceExporter):
+    """Keep the `size` most recent traces in memory."""
+
+    def __init__(self, size: int = DEFAULT_TRACE_BUFFER_SIZE) -> None:
+        self.traces = deque[Trace](maxlen=size)
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+    def slowest(self, limit: int) -> list[Trace]:
+        return sorted(self.traces, key=lambda trace: trace.duration, reverse=True)[:limit]
+
+
+class JsonLinesExporter(TraceExporter):
+    """Append every trace to `path` as a JSON object on its own line."""
+
+    def __init__(self, path: "Path") -> None:
+        self._path = path
+        # Writes land in the file buffer, the disk is only written to once it fills up.
+        self._file = path.open("a", encoding="utf-8")
+
+    def export(self, trace: Trace) -> None:
+        self._file.write(dumps(trace.to_dict(), default=str) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Tracer:
+    """Start traces for a `sample_rate` share of interactions and hand the finished ones to exporters."""
+
+    def __init__(self, sample_rate: float, exporters: "Iterable[TraceExporter]" = ()) -> None:
+        self.sample_rate = sample_rate
+        self._exporters = list(exporters)
+
+    @property
+    def exporters(self) -> list[TraceExporter]:
+        return self._exporters
+
+    def add_exporter(self, exporter: TraceExporter) -> None:
+        self._exporters.append(exporter)
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or (self.sample_rate > 0.0 and random() < self.sample_rate)
+
+    def start(self, name: str, **attributes: Any) -> SpanScope:
+        """Scope of the root span of a new trace, if this one is sampled."""
+        return SpanScope(name, attributes, self)
+
+    def export(self, trace: Trace) -> None:
+        for exporter in self._exporters:
+            try:
+                exporter.export(trace)
+            except Exception as e:
+                default_logger.exception(
+                    f"Failed while exporting trace to '{exporter.__class__.__name__}'.", exc_info=e
+                )
+
+    def close(self) -> None:
+        for exporter in self._exporters:
+            exporter.close()
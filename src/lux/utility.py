@@ -1,3 +1,6 @@
+from time import time
+from tracemalloc import is_tracing
+from tracemalloc import start as start_tracing
 from typing import TYPE_CHECKING
 
 from disnake import AppCmdInter
@@ -7,11 +10,15 @@ from disnake.utils import MISSING
 from .auto_complete import loaded_extension, unloaded_extension
 from .cog import GeneralCog
 from .context_var import interaction
+from .memory import disnake_caches, format_size, lux_caches, resident_memory, top_allocations
 
 if TYPE_CHECKING:
     from disnake import AllowedMentions, Embed, File, MessageFlags
     from disnake.ui import Components, MessageUIComponent, View
 
+    from .admission import AdmissionController
+    from .metrics import Metrics
+
 
 async def send_ephemeral(
     content: str | None = None,
@@ -72,3 +79,135 @@ class Development(GeneralCog):
         self.bot._logger.debug(f"Unloading extension '{name}'.")
         self.bot.unload_extension(name)
         await send_ephemeral(f"Unloaded extension `{name}`.")
+
+    @slash_command()
+    async def stats(self, inter: AppCmdInter):
+        return None
+
+    @stats.sub_command()
+    async def commands(self, inter: AppCmdInter, cog: bool = False, limit: int = 15):
+        metrics: "Metrics" = self.bot.metrics
+        entries = sorted(
+            (metrics.cogs if cog else metrics.commands).items(), key=lambda item: item[1].invocations, reverse=True
+        )[:limit]
+
+        if not entries:
+            return await send_ephemeral("No command has been used yet.")
+
+        lines = [f"{'name':<24} {'count':>7} {'error':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'ttfr95':>7}"]
+        for name, entry in entries:
+            quantiles = (entry.latency.quantile(0.5), entry.latency.quantile(0.95), entry.latency.quantile(0.99))
+            lines.append(
+                f"{name[:24]:<24} {entry.invocations:>7} {entry.errors:>6} "
+                + " ".join(f"{value * 1000:>7.1f}" for value in (*quantiles, entry.first_response.quantile(0.95)))
+            )
+        await send_ephemeral("Latency in ms.\n```\n" + "\n".join(lines) + "\n```")
+
+    @stats.sub_command()
+    async def admission(self, inter: AppCmdInter, limit: int = 10):
+        admission: "AdmissionController" = self.bot.admission
+        stats, settings = admission.stats, admission.settings
+        lines = [
+            f"Running {admission.active}/{settings.max_concurrency or 'unlimited'}, "
+            f"queued {admission.depth}/{settings.queue_size}.",
+            f"Admitted {stats.admitted}, {stats.queued} after waiting (p50 {stats.wait.quantile(0.5) * 1000:.1f} ms, "
+            f"p99 {stats.wait.quantile(0.99) * 1000:.1f} ms).",
+            "Shed " + ", ".join(f"{count} ({reason})" for reason, count in stats.shed.items()) + ".",
+        ]
+        if waiting := admission.waiting[:limit]:
+            rows = [f"{'command':<24} {'priority':>8} {'waited':>7}"]
+            rows.extend(f"{name[:24]:<24} {priority:>8} {waited * 1000:>7.1f}" for name, priority, waited in waiting)
+            lines.append("```\n" + "\n".join(rows) + "\n```")
+        await send_ephemeral("\n".join(lines))
+
+    @stats.sub_command()
+    async def loop(self, inter: AppCmdInter, stacks: int = 1):
+        if (monitor := self.bot.loop_monitor) is None:
+            return await send_ephemeral("The event loop is not monitored, set `loop_monitor = true` to enable it.")
+
+        lag = monitor.lag
+        lines = [
+            f"Lag in ms: p50 {lag.quantile(0.5) * 1000:.1f}, p99 {lag.quantile(0.99) * 1000:.1f}, "
+            f"max {monitor.max_lag * 1000:.1f} over {lag.count} samples.",
+            f"Blocked longer than {monitor.threshold}s: {monitor.blocks} times.",
+        ]
+        for report in reversed(monitor.reports[-stacks:] if stacks > 0 else []):
+            duration = f"{report.duration:.3f}s" if report.duration is not None else "still blocked"
+            lines.append(f"<t:{int(report.started_at)}:T> {report.command or 'no command'}, {duration}")
+            # Only the innermost frames fit in a message, they are the ones doing the blocking.
+            lines.append(f"```\n{report.stack[-1500 // max(stacks, 1):]}\n```")
+        await send_ephemeral("\n".join(lines)[:2000])
+
+    @stats.sub_command()
+    async def cache(self, inter: AppCmdInter):
+        caches = [
+            (f"{cog_name}.{name}", cache)
+            for cog_name, cog in self.bot.cogs.items()
+            if isinstance(cog, GeneralCog)
+            for name, cache in cog.caches.items()
+        ]
+
+        if not caches:
+            return await send_ephemeral("No cache has been used yet.")
+
+        lines = [f"{'name':<24} {'size':>9} {'hit':>7} {'miss':>7} {'shared':>6} {'evict':>6} {'expire':>6}"]
+        for name, cache in caches:
+            stats = cache.stats
+            lines.append(
+                f"{name[:24]:<24} {f'{len(cache)}/{cache.settings.maxsize}':>9} {stats.hits:>7} {stats.misses:>7} "
+                f"{stats.coalesced:>6} {stats.evictions:>6} {stats.expirations:>6}"
+            )
+        await send_ephemeral("```\n" + "\n".join(lines)[:1990] + "\n```")
+
+    @stats.sub_command()
+    async def memory(self, inter: AppCmdInter, top: int = 0):
+        usages = disnake_caches(self.bot) + lux_caches(self.bot)
+        lines = [f"{'cache':<18} {'count':>9} {'size':>10}"]
+        lines.extend(f"{usage.name:<18} {usage.count:>9} {format_size(usage.size):>10}" for usage in usages)
+        lines.append(f"{'total':<18} {'':>9} {format_size(sum(usage.size for usage in usages)):>10}")
+        if (resident := resident_memory()) is not None:
+            lines.append(f"{'resident':<18} {'':>9} {format_size(resident):>10}")
+        message = "Sizes are estimated from a sample of each cache.\n```\n" + "\n".join(lines) + "\n```"
+
+        if top > 0 and not is_tracing():
+            start_tracing()
+            message += "\nStarted tracing allocations, run this again later to see where memory is allocated."
+        elif top > 0:
+            # Taking a snapshot of a large heap takes a while, it is not done on the event loop.
+            allocations = await self.run_in_executor(top_allocations, top) or []
+            message += "\nTop allocations.\n```\n" + "\n".join(allocations)[: 1970 - len(message)] + "\n```"
+        await send_ephemeral(message)
+
+    @stats.sub_command()
+    async def jobs(self, inter: AppCmdInter, limit: int = 15):
+        jobs = sorted(self.bot.scheduler.jobs.values(), key=lambda job: job.stats.duration.sum, reverse=True)[:limit]
+        if not jobs:
+            return await send_ephemeral("No job is scheduled.")
+
+        now = time()
+        lines = [f"{'name':<24} {'runs':>6} {'fail':>5} {'miss':>5} {'p50':>7} {'p99':>7} {'next':>7}"]
+        for job in jobs:
+            stats, next_run = job.stats, f"{job.next_run - now:.0f}s" if job.next_run is not None else "-"
+            quantiles = (stats.duration.quantile(0.5), stats.duration.quantile(0.99))
+            lines.append(
+                f"{job.name[:24]:<24} {stats.runs:>6} {stats.failures:>5} {stats.missed:>5} "
+                + " ".join(f"{value * 1000:>7.1f}" for value in quantiles)
+                + f" {next_run:>7}"
+            )
+        await send_ephemeral("Run time in ms, busiest jobs first.\n```\n" + "\n".join(lines)[:1900] + "\n```")
+
+    @stats.sub_command()
+    async def traces(self, inter: AppCmdInter, limit: int = 3):
+        if (buffer := self.bot.trace_buffer) is None:
+            return await send_ephemeral("Interactions are not traced, set `trace_sample_rate` to enable it.")
+        if not (traces := buffer.slowest(limit)):
+            return await send_ephemeral("No interaction has been traced yet.")
+
+        # The slowest traces come first, the spans that do not fit in the message are cut off.
+        blocks = list[str]()
+        for trace in traces:
+            header = f"<t:{int(trace.root.started_at)}:T> `{trace.trace_id:032x}`\n```\n{'start':>8} {'ms':>8} span\n"
+            if (room := 2000 - sum(len(block) + 1 for block in blocks) - len(header) - 4) < 100:
+                break
+            blocks.append(f"{header}{trace.format()[:room]}\n```")
+        await send_ephemeral("\n".join(blocks))
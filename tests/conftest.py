@@ -0,0 +1,8 @@
+import pytest
+
+from lux.context_var import is_production
+
+
+@pytest.fixture(autouse=True)
+def development_mode() -> None:
+    is_production.set(False)
@@ -0,0 +1,51 @@
+from asyncio import CancelledError, create_task, gather, run, sleep
+
+import pytest
+
+from lux.cache import AsyncCache
+
+
+def test_followers_survive_cancelled_leader() -> None:
+    async def main() -> None:
+        cache = AsyncCache()
+        calls = list[int]()
+
+        async def call() -> int:
+            calls.append(len(calls))
+            await sleep(0.01)
+            return len(calls)
+
+        leader = create_task(cache.get_or_call("key", call))
+        await sleep(0)
+        followers = [create_task(cache.get_or_call("key", call)) for _ in range(3)]
+        await sleep(0)
+        leader.cancel()
+
+        # One follower takes the call over, the others wait for it.
+        assert await gather(*followers) == [2, 2, 2]
+        assert len(calls) == 2
+        with pytest.raises(CancelledError):
+            await leader
+
+    run(main())
+
+
+def test_cancelled_follower_does_not_cancel_the_call() -> None:
+    async def main() -> None:
+        cache = AsyncCache()
+
+        async def call() -> str:
+            await sleep(0.01)
+            return "value"
+
+        leader = create_task(cache.get_or_call("key", call))
+        await sleep(0)
+        follower = create_task(cache.get_or_call("key", call))
+        await sleep(0)
+        follower.cancel()
+
+        assert await leader == "value"
+        with pytest.raises(CancelledError):
+            await follower
+
+    run(main())
@@ -0,0 +1,33 @@
+from pathlib import Path
+from pickle import dumps, loads
+
+import pytest
+from click import BadParameter
+
+from lux.cli import parse_shard_ids
+from lux.config import CogConfig
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def test_parse_shard_ids() -> None:
+    assert parse_shard_ids(None, None, "0-3, 8") == [0, 1, 2, 3, 8]
+    assert parse_shard_ids(None, None, None) is None
+
+
+@pytest.mark.parametrize("value", ["3-1", "0-3,2", "1,1", "a", "1-"])
+def test_parse_shard_ids_rejects(value: str) -> None:
+    with pytest.raises(BadParameter):
+        parse_shard_ids(None, None, value)
+
+
+def test_cog_config_pickles_after_lookups() -> None:
+    # Worker processes receive the configs pickled, after the launcher already looked values up.
+    cog_config = CogConfig.load_from_path(EXAMPLES / "cog_config.toml")
+    cog_config.find("admission")
+    cog_config.get_data("Weather")
+
+    restored = loads(dumps(cog_config))
+    assert restored.path == cog_config.path
+    assert restored.digest == cog_config.digest
+    assert restored.get_data("Weather") == cog_config.get_data("Weather")
@@ -0,0 +1,120 @@
+from asyncio import run
+from typing import Any
+
+import pytest
+
+from lux import Lux
+from lux.config import BotConfig, CogConfig
+
+APPLICATION_ID = 42
+
+
+class FakeHTTP:
+    """Application command routes of `disnake.http.HTTPClient`, backed by a dict and counting every call."""
+
+    def __init__(self) -> None:
+        self.commands = dict[int | None, list[dict[str, Any]]]()
+        self.calls = list[str]()
+        self._next_id = 1
+
+    def _store(self, guild_id: int | None, payload: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        commands = list[dict[str, Any]]()
+        for command in payload:
+            self._next_id += 1
+            commands.append(
+                command | {"id": str(self._next_id), "application_id": str(APPLICATION_ID), "version": "1"}
+                | ({"guild_id": str(guild_id)} if guild_id is not None else {})
+            )
+        self.commands[guild_id] = commands
+        return commands
+
+    async def get_global_commands(self, application_id: int, with_localizations: bool = True) -> list[dict[str, Any]]:
+        self.calls.append("fetch")
+        return self.commands.get(None, [])
+
+    async def bulk_upsert_global_commands(self, application_id: int, payload: list[dict[str, Any]]):
+        self.calls.append("sync")
+        return self._store(None, payload)
+
+    def count(self, call: str) -> int:
+        return self.calls.count(call)
+
+
+def start(http: FakeHTTP, command_sync_cache: bool | None = True, description: str = "ping") -> dict[str, int]:
+    """Start a bot until its commands are prepared, then until it is ready, counting the calls of both phases."""
+    counts = dict[str, int]()
+
+    async def prepare() -> None:
+        # Outside production, commands are only synced to the test guilds.
+        bot = Lux(
+            production=True,
+            bot_config=BotConfig.default(),
+            cog_config=CogConfig.default(),
+            config_watch_interval=None,
+            hot_reload_interval=None,
+            command_sync_cache=command_sync_cache,
+        )
+
+        @bot.slash_command(name="ping", description=description)
+        async def ping(inter) -> None:
+            return None
+
+        bot._connection.http = http  # type: ignore[assignment]
+        bot._connection.application_id = APPLICATION_ID
+        bot._first_connect.set()
+        http.calls.clear()
+        await bot._prepare_application_commands()
+        counts.update(startup_fetch=http.count("fetch"), startup_sync=http.count("sync"))
+
+        http.calls.clear()
+        bot._ready.set()
+        await bot._verify_cached_commands()
+        counts.update(ready_fetch=http.count("fetch"), ready_sync=http.count("sync"))
+
+    run(prepare())
+    return counts
+
+
+@pytest.fixture
+def http(tmp_path, monkeypatch) -> FakeHTTP:
+    # The cache is written relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    return FakeHTTP()
+
+
+def test_unchanged_commands_are_not_fetched_at_startup(http: FakeHTTP) -> None:
+    assert start(http) == {"startup_fetch": 1, "startup_sync": 1, "ready_fetch": 0, "ready_sync": 0}
+    # The only fetch is the check against Discord once the bot is ready.
+    assert start(http) == {"startup_fetch": 0, "startup_sync": 0, "ready_fetch": 1, "ready_sync": 0}
+
+
+def test_cache_saves_startup_fetches(http: FakeHTTP) -> None:
+    start(http, command_sync_cache=None)
+    uncached = start(http, command_sync_cache=None)
+    start(http)
+    cached = start(http)
+    assert cached["startup_fetch"] < uncached["startup_fetch"]
+
+
+def test_changed_commands_are_synced(http: FakeHTTP) -> None:
+    start(http)
+    assert start(http, description="pong") == {"startup_fetch": 1, "startup_sync": 1, "ready_fetch": 0, "ready_sync": 0}
+
+
+def test_commands_changed_elsewhere_are_synced_again(http: FakeHTTP) -> None:
+    start(http)
+    http.commands[None] = []
+
+    assert start(http) == {"startup_fetch": 0, "startup_sync": 0, "ready_fetch": 1, "ready_sync": 1}
+    assert start(http)["ready_sync"] == 0
+
+
+def test_cache_is_opt_in(http: FakeHTTP, tmp_path) -> None:
+    start(http, command_sync_cache=None)
+    assert start(http, command_sync_cache=None) == {
+        "startup_fetch": 1,
+        "startup_sync": 0,
+        "ready_fetch": 0,
+        "ready_sync": 0,
+    }
+    assert not (tmp_path / ".lux_cache").exists()
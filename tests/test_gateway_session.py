@@ -0,0 +1,175 @@
+from asyncio import create_task, run, wait_for
+from json import loads
+from typing import Any
+
+import pytest
+from aiohttp import WSMsgType, web
+from disnake.ext.commands import CommandSyncFlags
+
+from lux import Lux
+from lux.config import BotConfig, CogConfig, RootConfigData, RootConfigDataValidator
+
+USER = {"id": "42", "username": "lux", "discriminator": "0", "avatar": None, "global_name": None, "bot": True}
+GUILD_ID = 1000
+CHANNEL_ID = 1001
+
+
+class FakeGateway:
+    """Gateway of Discord on a local port, with the HTTP routes a bot uses to connect and to fetch its guilds."""
+
+    def __init__(self) -> None:
+        # Last sequence of each session, by session id.
+        self.sessions = dict[str, int]()
+        self.log = list[tuple[Any, ...]]()
+        self.identified = 0
+        self.url = ""
+
+    async def start(self) -> web.AppRunner:
+        app = web.Application()
+        app.router.add_get("/", self.connect)
+        app.router.add_get("/resume", self.connect)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"ws://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"  # type: ignore[union-attr]
+        return runner
+
+    async def connect(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": 45000}, "s": None, "t": None})
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                break
+            data = loads(message.data)
+            if data["op"] == 1:
+                await ws.send_json({"op": 11, "d": None})
+            elif data["op"] == 2:
+                self.identified += 1
+                session_id = f"session{self.identified}"
+                self.sessions[session_id] = 1
+                self.log.append(("identify", session_id))
+                ready = {
+                    "v": 10,
+                    "user": USER,
+                    "guilds": [],
+                    "session_id": session_id,
+                    "resume_gateway_url": f"{self.url}/resume",
+                    "application": {"id": "7", "flags": 0},
+                }
+                await ws.send_json({"op": 0, "s": 1, "t": "READY", "d": ready})
+            elif data["op"] == 6:
+                session_id, sequence = data["d"]["session_id"], data["d"]["seq"]
+                self.log.append(("resume", session_id, sequence))
+                if session_id not in self.sessions:
+                    await ws.send_json({"op": 9, "d": False})
+                    continue
+                self.sessions[session_id] += 1
+                await ws.send_json({"op": 0, "s": self.sessions[session_id], "t": "RESUMED", "d": {}})
+        self.log.append(("close", ws.close_code))
+        return ws
+
+    def patch_http(self, bot: Lux) -> None:
+        http: Any = bot.http
+
+        async def request(route: Any, **kwargs: Any) -> Any:
+            return USER if route.path == "/users/@me" else []
+
+        async def get_bot_gateway(**kwargs: Any) -> Any:
+            return 1, self.url, {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1}
+
+        async def get_guilds(limit: int, before: Any = None, after: Any = None) -> Any:
+            return [{"id": str(GUILD_ID), "name": "guild"}] if after is None else []
+
+        async def get_guild(guild_id: int, with_counts: bool = True) -> Any:
+            everyone = {"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0}
+            return {"id": str(guild_id), "name": "guild", "owner_id": "1", "roles": [everyone], "member_count": 2}
+
+        async def get_all_guild_channels(guild_id: int) -> Any:
+            channel = {"id": str(CHANNEL_ID), "type": 0, "name": "general", "position": 0, "guild_id": str(guild_id)}
+            return [channel | {"permission_overwrites": []}]
+
+        async def get_member(guild_id: int, member_id: int) -> Any:
+            return {"user": USER, "roles": [], "joined_at": "2020-01-01T00:00:00+00:00", "deaf": False, "mute": False}
+
+        http.request, http.get_bot_gateway, http.get_guilds = request, get_bot_gateway, get_guilds
+        http.get_guild, http.get_all_guild_channels, http.get_member = get_guild, get_all_guild_channels, get_member
+
+
+async def run_bot(gateway: FakeGateway, resume_gateway_sessions: bool = True) -> tuple[Lux, int]:
+    """Connect a bot until it is ready and close it, returning it with how many times it dispatched `on_ready`."""
+    data = {
+        "GLOBAL": {"resume_gateway_sessions": resume_gateway_sessions},
+        "DEVELOPMENT": {"extension_directory": "extensions"},
+        "PRODUCTION": {},
+    }
+    bot = Lux(
+        production=False,
+        owner_id=1,
+        bot_config=BotConfig(RootConfigData(RootConfigDataValidator.validate_python(data))),
+        cog_config=CogConfig.default(),
+        disable_debug_extra_init=True,
+        config_watch_interval=None,
+        hot_reload_interval=None,
+        command_sync_flags=CommandSyncFlags.none(),
+        guild_ready_timeout=0.1,
+    )
+    gateway.patch_http(bot)
+    ready = list[None]()
+
+    async def on_ready() -> None:
+        ready.append(None)
+
+    bot.add_listener(on_ready, "on_ready")
+    bot.init()
+    await bot.login("token")
+    connection = create_task(bot.connect())
+    await wait_for(bot.wait_until_ready(), 5)
+    await bot.close()
+    await wait_for(connection, 5)
+    return bot, len(ready)
+
+
+@pytest.fixture
+def gateway(tmp_path, monkeypatch) -> FakeGateway:
+    # Sessions are saved relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    return FakeGateway()
+
+
+def run_bots(gateway: FakeGateway, *runs: bool) -> list[tuple[Lux, int]]:
+    async def main() -> list[tuple[Lux, int]]:
+        runner = await gateway.start()
+        try:
+            return [await run_bot(gateway, resume_gateway_sessions) for resume_gateway_sessions in runs]
+        finally:
+            await runner.cleanup()
+
+    return run(main())
+
+
+def test_resumed_session_fetches_guilds(gateway: FakeGateway) -> None:
+    (_, _), (bot, ready) = run_bots(gateway, True, True)
+    assert gateway.log == [("identify", "session1"), ("close", 4000), ("resume", "session1", 1), ("close", 4000)]
+    assert ready == 1
+    assert bot.application_id == 7
+
+    assert (guild := bot.get_guild(GUILD_ID)) is not None
+    assert guild.get_channel(CHANNEL_ID) is not None
+    assert guild.me is not None
+
+
+def test_refused_session_identifies_again(gateway: FakeGateway) -> None:
+    run_bots(gateway, True)
+    gateway.sessions.clear()
+    gateway.log.clear()
+
+    [(bot, ready)] = run_bots(gateway, True)
+    assert gateway.log[:3] == [("resume", "session1", 1), ("close", 1000), ("identify", "session2")]
+    assert ready == 1
+
+
+def test_sessions_are_not_resumed_when_off(gateway: FakeGateway) -> None:
+    run_bots(gateway, True, False)
+    assert gateway.log[2:] == [("identify", "session2"), ("close", 1000)]
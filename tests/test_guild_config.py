@@ -0,0 +1,40 @@
+from asyncio import run
+from typing import Any
+
+from lux.config import CogConfig, RootConfigData, RootConfigDataValidator
+from lux.guild_config import GuildConfigProvider, GuildConfigs
+from lux.logger import default_logger
+
+GUILD_ID = 1234
+
+
+class Provider(GuildConfigProvider):
+    async def load(self, guild_id: int) -> dict[str, dict[str, Any]]:
+        return {"Weather": {"language": "de"}}
+
+
+def cog_config() -> CogConfig:
+    data = {
+        "DEVELOPMENT": {
+            "Weather": {"units": "metric", "guilds": ["kept"]},
+            "GUILDS": {"Weather": {str(GUILD_ID): {"units": "imperial"}}},
+        },
+    }
+    return CogConfig(RootConfigData(RootConfigDataValidator.validate_python(data)))
+
+
+def test_guild_overrides_do_not_touch_cog_settings() -> None:
+    config = cog_config()
+    assert config.get_data("Weather") == {"units": "metric", "guilds": ["kept"]}
+    assert config.get_guild_data("Weather", GUILD_ID) == {"units": "imperial"}
+    assert config.get_guild_data("Weather", GUILD_ID + 1) == {}
+    assert config.get_guild_data("Other", GUILD_ID) == {}
+
+
+def test_provider_overrides_apply_on_top() -> None:
+    config = cog_config()
+    guild_configs = GuildConfigs(config, default_logger, Provider())
+    base = config.get_data("Weather")
+
+    view = run(guild_configs.view(GUILD_ID, "Weather", base, lambda overrides: base | overrides))
+    assert view == {"units": "imperial", "guilds": ["kept"], "language": "de"}
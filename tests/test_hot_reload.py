@@ -0,0 +1,130 @@
+import sys
+from asyncio import run
+from typing import Any
+
+import pytest
+from disnake.ext.commands import CommandSyncFlags
+
+from lux import Lux
+from lux.config import BotConfig, CogConfig
+from lux.hot_reload import HotReloader
+
+APPLICATION_ID = 42
+PACKAGE = "hot_reload_extension"
+INIT = """
+from disnake.ext.commands import Cog, slash_command
+
+from .a import PING
+from .b import PONG
+
+
+class Commands(Cog):
+    @slash_command(description=PING)
+    async def ping(self, inter) -> None:
+        return None
+
+    @slash_command(description=PONG)
+    async def pong(self, inter) -> None:
+        return None
+
+
+def setup(bot) -> None:
+    bot.add_cog(Commands())
+"""
+
+
+class FakeHTTP:
+    """Global application command routes of `disnake.http.HTTPClient`, counting the commands sent one by one."""
+
+    def __init__(self) -> None:
+        self.commands = list[dict[str, Any]]()
+        self.upserted = list[str]()
+
+    def _store(self, command: dict[str, Any]) -> dict[str, Any]:
+        command = command | {"id": str(len(self.commands) + 1), "application_id": str(APPLICATION_ID), "version": "1"}
+        self.commands = [stored for stored in self.commands if stored["name"] != command["name"]] + [command]
+        return command
+
+    async def get_global_commands(self, application_id: int, with_localizations: bool = True) -> list[dict[str, Any]]:
+        return self.commands
+
+    async def bulk_upsert_global_commands(self, application_id: int, payload: list[dict[str, Any]]) -> Any:
+        return [self._store(command) for command in payload]
+
+    async def upsert_global_command(self, application_id: int, payload: dict[str, Any]) -> dict[str, Any]:
+        self.upserted.append(payload["name"])
+        return self._store(payload)
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch) -> Any:
+    directory = tmp_path / PACKAGE
+    directory.mkdir()
+    (directory / "__init__.py").write_text(INIT)
+    (directory / "a.py").write_text('PING = "ping"\n')
+    (directory / "b.py").write_text('PONG = "pong"\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    # A stale bytecode file of the same size and second could be imported instead of the edited source.
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    yield directory
+    for name in [name for name in sys.modules if name.partition(".")[0] == PACKAGE]:
+        del sys.modules[name]
+
+
+def start(http: FakeHTTP) -> tuple[Lux, HotReloader]:
+    # Outside production, commands are only synced to the test guilds.
+    bot = Lux(
+        production=True,
+        bot_config=BotConfig.default(),
+        cog_config=CogConfig.default(),
+        config_watch_interval=None,
+        hot_reload_interval=None,
+        command_sync_flags=CommandSyncFlags.all(),
+    )
+    bot._connection.http = http  # type: ignore[assignment]
+    bot._connection.application_id = APPLICATION_ID
+    # Loading the extension would schedule a full sync, as it does before the bot is ready.
+    bot._command_sync_flags.sync_on_cog_actions = False
+    bot.load_extension(PACKAGE)
+    bot._command_sync_flags.sync_on_cog_actions = True
+    reloader = HotReloader(bot)
+    reloader.scan()
+    return bot, reloader
+
+
+def test_unrelated_sibling_is_not_imported_again(package) -> None:
+    async def main() -> None:
+        bot, reloader = start(FakeHTTP())
+        sibling = sys.modules[f"{PACKAGE}.b"]
+        sibling.MARKER = object()
+
+        (package / "a.py").write_text('PING = "ping again"\n')
+        assert (changed := reloader.scan()) == {f"{PACKAGE}.a"}
+        await reloader.reload(changed)
+
+        assert sys.modules[f"{PACKAGE}.b"] is sibling
+        assert hasattr(sibling, "MARKER")
+        assert bot.get_slash_command("ping").description == "ping again"  # type: ignore[union-attr]
+        assert bot.get_slash_command("pong") is not None
+
+    run(main())
+
+
+def test_only_changed_commands_are_synced(package) -> None:
+    http = FakeHTTP()
+
+    async def main() -> None:
+        bot, reloader = start(http)
+        bot._first_connect.set()
+        await bot._prepare_application_commands()
+        bot._ready.set()
+
+        (package / "a.py").write_text('PING = "ping again"\n')
+        await reloader.reload(reloader.scan())
+
+    run(main())
+    assert http.upserted == ["ping"]
+    assert {command["name"]: command["description"] for command in http.commands} == {
+        "ping": "ping again",
+        "pong": "pong",
+    }
@@ -0,0 +1,18 @@
+from os import environ, pathsep
+from pathlib import Path
+from subprocess import run
+from sys import executable
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_import_time_budget() -> None:
+    # The budgets and forbidden imports live in the benchmark, which exits with 1 when one of them is exceeded.
+    pythonpath = pathsep.join(filter(None, (str(ROOT / "src"), environ.get("PYTHONPATH"))))
+    result = run(
+        [executable, str(ROOT / "benchmarks" / "import_time.py"), "3"],
+        capture_output=True,
+        text=True,
+        env=environ | {"PYTHONPATH": pythonpath},
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
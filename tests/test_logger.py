@@ -0,0 +1,54 @@
+from logging import Handler, LogRecord, getLogger
+from queue import Queue
+from threading import Event, Timer
+
+import pytest
+
+from lux import logger
+from lux.logger import BoundedQueueHandler
+
+
+class BlockingHandler(Handler):
+    """Handler writing nothing until `unblocked` is set, as a stalled stream would."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.unblocked = Event()
+        self.started = Event()
+        self.messages = list[str]()
+
+    def emit(self, record: LogRecord) -> None:
+        self.started.set()
+        self.unblocked.wait()
+        self.messages.append(record.getMessage())
+
+
+def fill(handler: BoundedQueueHandler, blocking: BlockingHandler, size: int) -> None:
+    test_logger = getLogger("lux.test_logger")
+    test_logger.addHandler(handler)
+    test_logger.propagate = False
+    try:
+        test_logger.warning("first")
+        # The listener holds the first record, the queue is full once `size` more are logged.
+        assert blocking.started.wait(5)
+        for index in range(size):
+            test_logger.warning(f"queued {index}")
+    finally:
+        test_logger.removeHandler(handler)
+    assert handler.queue.full()  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize("release_after", [0.1, 0.5])
+def test_stop_with_a_full_queue(monkeypatch, release_after: float) -> None:
+    monkeypatch.setattr(logger, "LOG_STOP_TIMEOUT", 0.3)
+    blocking = BlockingHandler()
+    handler = BoundedQueueHandler(Queue(3), blocking)
+    fill(handler, blocking, 3)
+
+    Timer(release_after, blocking.unblocked.set).start()
+    handler.stop()
+
+    # A listener catching up in time writes every record, one that does not loses the oldest to the sentinel.
+    dropped = 0 if release_after < logger.LOG_STOP_TIMEOUT else 1
+    assert handler.dropped == dropped
+    assert blocking.messages == ["first", *(f"queued {index}" for index in range(dropped, 3))]
@@ -0,0 +1,19 @@
+from disnake import Interaction
+
+from lux.metrics import TimedInteractionResponse, time_first_response
+
+
+class UnknownInteraction:
+    """An interaction of a disnake version keeping its response elsewhere."""
+
+    __slots__ = ("response",)
+
+
+def test_response_is_timed() -> None:
+    inter = Interaction.__new__(Interaction)
+    assert time_first_response(inter, lambda delay: None)
+    assert isinstance(inter.response, TimedInteractionResponse)
+
+
+def test_unknown_interaction_is_not_timed() -> None:
+    assert not time_first_response(UnknownInteraction(), lambda delay: None)  # type: ignore[arg-type]
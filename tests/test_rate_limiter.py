@@ -0,0 +1,48 @@
+from lux.rate_limiter import FixedWindow, RateLimit, RateLimiter, TokenBucket
+
+
+def scheduled(limiter: RateLimiter, key: int) -> int:
+    return sum(slot.count(key) for slot in limiter._wheel)
+
+
+def test_token_bucket_refills() -> None:
+    limiter = TokenBucket(RateLimit(2, 10))
+    assert limiter.hit(1, 0) == 0
+    assert limiter.hit(1, 0) == 0
+    assert limiter.hit(1, 0) == 5
+    assert limiter.hit(1, 5) == 0
+
+
+def test_fixed_window_resets_per_window() -> None:
+    limiter = FixedWindow(RateLimit(1, 10))
+    assert limiter.hit(1, 1) == 0
+    assert limiter.hit(1, 4) == 6
+    assert limiter.hit(1, 10) == 0
+
+
+def test_reset_key_is_scheduled_once() -> None:
+    limiter = TokenBucket(RateLimit(1, 10), resolution=1, wheel_size=8)
+    limiter.hit(1, 0)
+    limiter.reset(1)
+    assert scheduled(limiter, 1) == 0
+
+    assert limiter.hit(1, 1) == 0
+    assert scheduled(limiter, 1) == 1
+    limiter.hit(2, 12)
+    assert len(limiter) == 1
+    assert scheduled(limiter, 1) == 0
+
+
+def test_expiry_after_jump_of_several_rounds() -> None:
+    limiter = TokenBucket(RateLimit(1, 100.5), resolution=1, wheel_size=8)
+    limiter.hit(1, 0)
+    limiter.hit(2, 50)
+    # Twelve rounds of the wheel later, key 1 is due within the current tick.
+    limiter.hit(3, 100.2)
+    assert len(limiter) == 3
+
+    limiter.hit(3, 101)
+    assert len(limiter) == 2
+    assert scheduled(limiter, 1) == 0
+    limiter.hit(3, 151)
+    assert len(limiter) == 1